@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+benchmark_streamlit.py - Headless performance harness for generated dashboards.
+
+For each dataset type and data size this script generates the dashboard with
+generate_streamlit.py, builds the dataset with the DuckDB dialect of
+generate_sql_data.py, and runs the app twice with Streamlit's AppTest: a cold
+run (empty caches) and a warm run, each selecting every view of the app in turn. The app's session is replaced by a probe
+around the local DuckDB session (see data_access.py) that records, for every
+dashboard section, the execution time, peak Python memory (tracemalloc) and
+the number, rows and size of fetched result sets.
+
+The run fails (exit code 1) when a section exceeds THRESHOLDS, when the warm
+run fetches anything, or when the app raises.
+
+Usage:
+    uv run --project <SKILL_DIR> --extra dashboard python <SKILL_DIR>/scripts/benchmark_streamlit.py \
+        --output-dir /tmp/dashboard_benchmark
+
+    # One dataset, larger sizes, 50ms simulated warehouse latency per query
+    uv run --project <SKILL_DIR> --extra dashboard python <SKILL_DIR>/scripts/benchmark_streamlit.py \
+        --output-dir /tmp/dashboard_benchmark \
+        --dataset-types financial_fraud --sizes 10000,100000,1000000 --latency 0.05
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from generate_schema import SCHEMAS
+from generate_sql_data import DISTRIBUTIONS, compile_dataset_sql
+from generate_streamlit import generate_data_access, generate_streamlit_app
+
+# Limits per section of a cold run; --thresholds overrides any of them
+THRESHOLDS = {
+    "section_seconds": 5.0,     # wall time of one section
+    "section_memory_mb": 64.0,  # peak Python allocations while the section runs
+    "section_fetches": 16,      # result sets fetched by one section
+    "fetch_rows": 10_000,       # rows in the largest single fetch
+    "fetch_mb": 4.0,            # in-memory size of the largest single fetch
+    "warm_fetches": 0,          # result sets fetched by the whole warm run
+}
+
+DATABASE = "BENCH_DB"
+SCHEMA = "PUBLIC"
+
+
+class SectionProbe:
+    """Collects per-section timings, memory and fetch statistics for one app run."""
+
+    def __init__(self):
+        self.current = "setup"
+        self.sections = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, name: str) -> dict:
+        return self.sections.setdefault(name, {
+            "seconds": 0.0, "memory_mb": 0.0, "fetches": 0, "rows": 0,
+            "fetch_mb": 0.0, "max_fetch_rows": 0, "max_fetch_mb": 0.0,
+        })
+
+    @contextmanager
+    def section(self, name: str):
+        stats = self._stats(name)
+        previous, self.current = self.current, name
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats["seconds"] += time.perf_counter() - start
+            peak = (tracemalloc.get_traced_memory()[1] - baseline) / 1024 ** 2
+            stats["memory_mb"] = max(stats["memory_mb"], peak)
+            self.current = previous
+
+    def record_fetch(self, df):
+        """Attribute a fetched result set to the section running when it was requested."""
+        size = df.memory_usage(deep=True).sum() / 1024 ** 2
+        with self._lock:
+            stats = self._stats(self.current)
+            stats["fetches"] += 1
+            stats["rows"] += len(df)
+            stats["fetch_mb"] += size
+            stats["max_fetch_rows"] = max(stats["max_fetch_rows"], len(df))
+            stats["max_fetch_mb"] = max(stats["max_fetch_mb"], size)
+
+
+class ProbeResult:
+    """Deferred result that reports its fetch to the installed probe."""
+
+    def __init__(self, result, data_access, latency: float):
+        self._result = result
+        self._data_access = data_access
+        self._latency = latency
+
+    def to_pandas(self):
+        if self._latency:
+            time.sleep(self._latency)
+        df = self._result.to_pandas()
+        self._data_access.PROBE.record_fetch(df)
+        return df
+
+
+class ProbeSession:
+    """Stub session: the local DuckDB session plus simulated latency and fetch accounting.
+
+    The app caches its session across runs, so fetches are reported to
+    whichever probe is installed in data_access.PROBE at the time.
+    """
+
+    def __init__(self, data_access, data_dir: Path, latency: float):
+        self._session = data_access.LocalSession(data_dir)
+        self._data_access = data_access
+        self._latency = latency
+
+    def sql(self, query: str, params: list = None) -> ProbeResult:
+        return ProbeResult(self._session.sql(query, params), self._data_access, self._latency)
+
+    def table(self, name: str) -> ProbeResult:
+        return ProbeResult(self._session.table(name), self._data_access, self._latency)
+
+
+def build_data(dataset_type: str, size: int, seed: int, data_dir: Path) -> dict:
+    """Generate the dataset in DuckDB and write one Parquet file per table."""
+    import duckdb
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect()
+    con.execute(compile_dataset_sql(dataset_type, size, "duckdb", seed))
+    counts = {}
+    for table in SCHEMAS[dataset_type]["tables"]:
+        counts[table] = con.execute(f"SELECT COUNT(*) FROM {table.upper()}").fetchone()[0]
+        con.execute(f"COPY {table.upper()} TO '{(data_dir / f'{table}.parquet').as_posix()}' (FORMAT PARQUET)")
+    con.close()
+    return counts
+
+
+def generate_app(dataset_type: str, summary_tables: bool, app_dir: Path) -> Path:
+    """Write streamlit_app.py and data_access.py for the dataset type."""
+    config = {"dataset_type": dataset_type, "database": DATABASE, "schema": SCHEMA,
+              "summary_tables": summary_tables}
+    app_dir.mkdir(parents=True, exist_ok=True)
+    (app_dir / "streamlit_app.py").write_text(generate_streamlit_app(dataset_type, config, app_dir.parent))
+    (app_dir / "data_access.py").write_text(generate_data_access(dataset_type, config))
+    return app_dir / "streamlit_app.py"
+
+
+def run_app(app_file: Path, data_dir: Path, latency: float, timeout: float) -> dict:
+    """Run the app cold and warm under AppTest and return the probe statistics of each run."""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # Every generated app has its own data_access module; load this one
+    sys.modules.pop("data_access", None)
+    sys.path.insert(0, str(app_file.parent))
+    try:
+        data_access = importlib.import_module("data_access")
+    finally:
+        sys.path.pop(0)
+
+    runs = {}
+    data_access.connect = lambda: ProbeSession(data_access, data_dir, latency)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    at = AppTest.from_file(str(app_file), default_timeout=timeout)
+    views = None
+    for phase in ("cold", "warm"):
+        probe = SectionProbe()
+        data_access.PROBE = probe
+        exceptions, errors = [], []
+        start = time.perf_counter()
+        at.run()
+        # Only the selected view runs, so select each of the others in turn
+        views = views or list(at.radio(key="view").options)
+        first = at.radio(key="view").value
+        for view in [first] + [view for view in views if view != first]:
+            if view != first:
+                at.radio(key="view").set_value(view).run()
+            exceptions += [e.value for e in at.exception]
+            errors += [e.value for e in at.error]
+        runs[phase] = {
+            "seconds": time.perf_counter() - start,
+            "sections": probe.sections,
+            "exceptions": exceptions,
+            "errors": errors,
+        }
+    data_access.PROBE = None
+    return runs
+
+
+def check_thresholds(runs: dict, thresholds: dict) -> list:
+    """Return a description of every threshold the runs exceed."""
+    failures = []
+    for phase, run in runs.items():
+        for message in run["exceptions"] + run["errors"]:
+            failures.append(f"{phase}: {message}")
+    for name, stats in runs["cold"]["sections"].items():
+        checks = [
+            ("seconds", stats["seconds"], "section_seconds"),
+            ("memory MB", stats["memory_mb"], "section_memory_mb"),
+            ("fetches", stats["fetches"], "section_fetches"),
+            ("largest fetch rows", stats["max_fetch_rows"], "fetch_rows"),
+            ("largest fetch MB", stats["max_fetch_mb"], "fetch_mb"),
+        ]
+        for label, value, key in checks:
+            if value > thresholds[key]:
+                failures.append(f"cold {name}: {label} {value:,.2f} > {thresholds[key]:,}")
+    warm_fetches = sum(stats["fetches"] for stats in runs["warm"]["sections"].values())
+    if warm_fetches > thresholds["warm_fetches"]:
+        failures.append(f"warm: {warm_fetches} fetches > {thresholds['warm_fetches']}")
+    return failures
+
+
+def print_runs(runs: dict):
+    print(f"    {'section':<56} {'phase':<5} {'seconds':>8} {'mem MB':>7} {'fetches':>7} {'rows':>8} {'MB':>7}")
+    for phase, run in runs.items():
+        for name, stats in run["sections"].items():
+            print(f"    {name:<56} {phase:<5} {stats['seconds']:>8.3f} {stats['memory_mb']:>7.1f} "
+                  f"{stats['fetches']:>7} {stats['rows']:>8,} {stats['fetch_mb']:>7.3f}")
+        print(f"    {'(whole run, including session setup)':<56} {phase:<5} {run['seconds']:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generated Streamlit dashboards headlessly")
+    parser.add_argument("--output-dir", required=True, help="Directory for generated apps, data and the report")
+    parser.add_argument("--dataset-types", default=",".join(DISTRIBUTIONS),
+                        help="Comma-separated dataset types (default: all predefined types)")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated record counts")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the generated data")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per query round trip")
+    parser.add_argument("--raw", action="store_true", help="Query the raw tables instead of summary tables")
+    parser.add_argument("--thresholds", help="JSON file overriding entries of THRESHOLDS")
+    parser.add_argument("--timeout", type=float, default=300, help="AppTest timeout per run in seconds")
+    args = parser.parse_args()
+
+    thresholds = dict(THRESHOLDS)
+    if args.thresholds:
+        with open(args.thresholds, 'r') as f:
+            thresholds.update(json.load(f))
+
+    output_dir = Path(args.output_dir)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = {"thresholds": thresholds, "latency": args.latency, "summary_tables": not args.raw, "results": []}
+    failures = []
+
+    tracemalloc.start()
+    for dataset_type in args.dataset_types.split(","):
+        app_file = generate_app(dataset_type, not args.raw, output_dir / dataset_type / "streamlit_app")
+        for size in sizes:
+            print(f"{dataset_type} - {size:,} records")
+            data_dir = output_dir / dataset_type / f"data_{size}"
+            counts = build_data(dataset_type, size, args.seed, data_dir)
+            runs = run_app(app_file, data_dir, args.latency, args.timeout)
+            print_runs(runs)
+            run_failures = [f"{dataset_type} {size:,}: {failure}" for failure in check_thresholds(runs, thresholds)]
+            failures.extend(run_failures)
+            report["results"].append({"dataset_type": dataset_type, "size": size, "rows": counts,
+                                      "runs": runs, "failures": run_failures})
+            print("")
+    tracemalloc.stop()
+
+    report_file = output_dir / "benchmark_report.json"
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Written: {report_file}")
+
+    if failures:
+        print("")
+        print(f"FAILED - {len(failures)} threshold(s) exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("All runs within thresholds.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+build_features.py - Vectorized per-transaction features for fraud model training.
+
+Reads the transactions, merchants and fraud_labels tables of a financial_fraud
+dataset (the CSVs written by generate_data.py, or Parquet) and writes a Parquet
+feature table with one row per transaction:
+
+    txn_count_<w>, amount_sum_<w>  the customer's earlier transactions within the
+                                   last 5 minutes, 1 hour and 24 hours
+    seconds_since_prev             time since the customer's previous transaction
+    km_from_prev                   haversine distance from its location
+    merchant_risk_score            merchants.risk_score
+    is_fraud, fraud_type           from fraud_labels
+
+Transactions are sorted once by (customer, time). A window's start for every
+row is then a single searchsorted over a combined (customer, time) key, and
+counts and sums are differences of a running cumulative sum, so no feature
+needs a per-row or per-customer Python loop.
+
+Memory stays bounded by --chunk-rows: inputs are read in chunks, and when a
+table has more rows than one chunk, transactions are spilled to partitions by
+customer (so every customer's history lands in one partition) and the labels
+by transaction id, then each partition is processed on its own.
+
+Usage:
+    uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/build_features.py \
+        --input-dir ./output \
+        --output-dir ./output/training
+"""
+
+import argparse
+import math
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from detect_fraud_stream import EARTH_RADIUS_KM
+from generate_schema import SCHEMAS
+from table_files import CHUNK_ROWS, count_rows, find_table, read_chunks, typed_frame
+
+# Rolling windows: feature suffix -> width in seconds
+WINDOWS = {"5m": 300, "1h": 3600, "24h": 86400}
+
+INPUTS = {
+    "transactions": ["transaction_id", "customer_id", "merchant_id", "amount", "transaction_date",
+                     "location_lat", "location_lon"],
+    "merchants": ["merchant_id", "risk_score"],
+    "fraud_labels": ["transaction_id", "is_fraud", "fraud_type"],
+}
+
+
+# =============================================================================
+# INPUT
+# =============================================================================
+
+def typed_chunks(path: Path, table: str, chunk_rows: int):
+    """Yield typed chunks of the table's INPUTS columns."""
+    for df in read_chunks(path, INPUTS[table], chunk_rows):
+        yield typed_frame(df, SCHEMAS["financial_fraud"]["tables"][table])
+
+
+def read_table(path: Path, table: str, chunk_rows: int) -> pd.DataFrame:
+    return pd.concat(list(typed_chunks(path, table, chunk_rows)), ignore_index=True)
+
+
+# =============================================================================
+# FEATURE KERNELS
+# =============================================================================
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Vectorized great-circle distance in kilometres."""
+    lat1, lon1, lat2, lon2 = (np.radians(values) for values in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def transaction_features(transactions: pd.DataFrame) -> pd.DataFrame:
+    """Windowed and previous-transaction features for complete customer histories."""
+    codes, _ = pd.factorize(transactions["customer_id"])
+    seconds = transactions["transaction_date"].to_numpy("datetime64[s]").astype("int64")
+    order = np.lexsort((seconds, codes))
+    df = transactions.take(order).reset_index(drop=True)
+    codes, seconds = codes[order], seconds[order]
+    amount = df["amount"].to_numpy("float64")
+    lat, lon = df["location_lat"].to_numpy("float64"), df["location_lon"].to_numpy("float64")
+    n = len(df)
+    if n == 0:
+        return df.assign(**{f"{kind}_{label}": [] for label in WINDOWS for kind in ("txn_count", "amount_sum")},
+                         seconds_since_prev=[], km_from_prev=[])
+
+    # Customers occupy contiguous segments; `first` marks each segment's first row
+    first = np.ones(n, dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+
+    # One sorted key over (customer, time). Customers are spaced further apart
+    # than the widest window, so no window reaches into the previous customer.
+    elapsed = seconds - seconds.min()
+    key = codes.astype("int64") * (int(elapsed.max()) + max(WINDOWS.values()) + 1) + elapsed
+    index = np.arange(n)
+    cumulative = np.concatenate(([0.0], np.cumsum(amount)))
+    for label, width in WINDOWS.items():
+        start = np.searchsorted(key, key - width, side="left")
+        df[f"txn_count_{label}"] = (index - start).astype("int32")
+        df[f"amount_sum_{label}"] = np.round(cumulative[index] - cumulative[start], 2)
+
+    since = np.empty(n)
+    since[1:] = seconds[1:] - seconds[:-1]
+    since[first] = np.nan
+    df["seconds_since_prev"] = since
+
+    km = np.empty(n)
+    km[1:] = haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    km[first] = np.nan
+    df["km_from_prev"] = np.round(km, 3)
+    return df
+
+
+def join_features(features: pd.DataFrame, labels: pd.DataFrame, risk: pd.Series) -> pd.DataFrame:
+    """Add merchant risk and the fraud label to each transaction's features."""
+    features["merchant_risk_score"] = features["merchant_id"].map(risk).astype("float64")
+    return features.merge(labels, on="transaction_id", how="left")
+
+
+# =============================================================================
+# PARTITIONED PIPELINE
+# =============================================================================
+
+def spill(frames, key: str, partitions: int, directory: Path) -> Path:
+    """Route rows into `partitions` Parquet files by a stable hash of `key`."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    directory.mkdir(parents=True, exist_ok=True)
+    writers, schema = {}, None
+    try:
+        for df in frames:
+            table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            schema = table.schema
+            buckets = pd.util.hash_array(df[key].to_numpy(dtype=object)) % partitions
+            for bucket in np.unique(buckets):
+                if bucket not in writers:
+                    writers[bucket] = pq.ParquetWriter(directory / f"part-{bucket:05d}.parquet", schema)
+                writers[bucket].write_table(table.filter(pa.array(buckets == bucket)))
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return directory
+
+
+def read_part(directory: Path, partition: int) -> pd.DataFrame:
+    path = directory / f"part-{partition:05d}.parquet"
+    return pd.read_parquet(path) if path.exists() else None
+
+
+def write_part(df: pd.DataFrame, features_dir: Path, partition: int) -> int:
+    df.to_parquet(features_dir / f"part-{partition:05d}.parquet", index=False,
+                  coerce_timestamps="us", allow_truncated_timestamps=True)
+    return len(df)
+
+
+def build_features(input_dir: Path, output_dir: Path, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Write <output_dir>/features/part-*.parquet and return row and partition counts."""
+    paths = {table: find_table(input_dir, table) for table in INPUTS}
+    merchants = read_table(paths["merchants"], "merchants", chunk_rows)
+    risk = merchants.drop_duplicates("merchant_id").set_index("merchant_id")["risk_score"]
+
+    features_dir = output_dir / "features"
+    if features_dir.exists():
+        shutil.rmtree(features_dir)
+    features_dir.mkdir(parents=True)
+
+    partitions = max(1, math.ceil(count_rows(paths["transactions"]) / chunk_rows))
+    if partitions == 1:
+        features = transaction_features(read_table(paths["transactions"], "transactions", chunk_rows))
+        labels = read_table(paths["fraud_labels"], "fraud_labels", chunk_rows)
+        rows = write_part(join_features(features, labels, risk), features_dir, 0)
+        return {"rows": rows, "partitions": 1}
+
+    rows = 0
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp:
+        tmp = Path(tmp)
+        by_customer = spill(typed_chunks(paths["transactions"], "transactions", chunk_rows),
+                            "customer_id", partitions, tmp / "transactions")
+        labels_dir = spill(typed_chunks(paths["fraud_labels"], "fraud_labels", chunk_rows),
+                           "transaction_id", partitions, tmp / "fraud_labels")
+        # Features need whole customer histories; the label join needs matching
+        # transaction ids, so computed features are re-partitioned by transaction id
+        computed = (transaction_features(part) for part in
+                    (read_part(by_customer, i) for i in range(partitions)) if part is not None)
+        features_dir_tmp = spill(computed, "transaction_id", partitions, tmp / "features")
+        for partition in range(partitions):
+            features = read_part(features_dir_tmp, partition)
+            if features is None:
+                continue
+            labels = read_part(labels_dir, partition)
+            if labels is None:
+                labels = pd.DataFrame(columns=INPUTS["fraud_labels"])
+            rows += write_part(join_features(features, labels, risk), features_dir, partition)
+    return {"rows": rows, "partitions": partitions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-transaction fraud features as Parquet")
+    parser.add_argument("--input-dir", required=True,
+                        help="generate_data.py output directory (or a directory of table CSV/Parquet files)")
+    parser.add_argument("--output-dir", required=True, help="Directory for the features/ Parquet table")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="Rows per read chunk and target transactions per partition")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    print("Building transaction features...")
+    start = time.perf_counter()
+    summary = build_features(Path(args.input_dir), output_dir, args.chunk_rows)
+    seconds = time.perf_counter() - start
+    print(f"  Written: features/ ({summary['rows']:,} rows in {summary['partitions']} part(s))")
+    print(f"  {seconds:.2f}s ({summary['rows'] / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
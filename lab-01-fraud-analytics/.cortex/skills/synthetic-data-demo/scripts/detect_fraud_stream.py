@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+detect_fraud_stream.py - Streaming sliding-window fraud rules over transactions.
+
+Replays the transactions of a financial_fraud dataset (the CSV written by
+generate_data.py, or Parquet) in event-time order, or consumes a live stream of
+JSON lines on stdin, and evaluates three rules per event:
+
+    velocity           3+ transactions by one customer within 5 minutes
+    amount_spike       amount far above the customer's recent average
+    impossible_travel  haversine distance / time since the previous
+                       transaction faster than an airliner
+
+Each customer keeps fixed-size ring buffers (the last count-1 timestamps and
+the last `history` amounts with a running sum) plus its previous location, so
+every rule costs O(1) per event regardless of window length or stream size.
+Alerts are emitted as rows shaped like the ALERTS table.
+
+Rows are routed to partitions by a stable hash of customer_id, so several
+processes (--workers, or independent consumers with --partition I/N) can each
+own a disjoint set of customers without sharing state.
+
+Usage:
+    # Replay generated data and write alerts.csv
+    uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/detect_fraud_stream.py \
+        --input ./output/data/transactions.csv \
+        --output-dir ./output/alerts
+
+    # Live stream: one JSON transaction per line in, one JSON alert per line out
+    tail -f transactions.jsonl | uv run --project <SKILL_DIR> python \
+        <SKILL_DIR>/scripts/detect_fraud_stream.py --input - --partition 0/4
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+import uuid
+import zlib
+from array import array
+from datetime import datetime, timezone
+from multiprocessing import Pool
+from pathlib import Path
+
+from table_files import find_table, read_chunks
+
+# Rule parameters; --rules overrides any of them
+RULES = {
+    "velocity": {
+        "count": 3,                # transactions ...
+        "window_seconds": 300,     # ... within this many seconds
+    },
+    "amount_spike": {
+        "history": 20,             # amounts in the customer's rolling average
+        "min_history": 5,          # transactions seen before the rule applies
+        "multiplier": 4.0,         # alert when amount >= multiplier * average
+        "min_amount": 500.0,       # ignore spikes below this amount
+    },
+    "impossible_travel": {
+        "max_kmh": 900.0,          # faster than a commercial flight
+        "min_km": 100.0,           # ignore jitter between nearby locations
+    },
+}
+
+ALERT_TYPES = {
+    "velocity": "Velocity Alert",
+    "amount_spike": "Amount Spike",
+    "impossible_travel": "Impossible Travel",
+}
+
+# Column order of the ALERTS table (scripts/deploy_fraud_dataset.sql)
+ALERT_COLUMNS = [
+    "alert_id", "transaction_id", "account_id", "customer_id", "alert_timestamp", "alert_type",
+    "severity", "status", "description", "risk_score", "resolved_at", "resolved_by", "resolution_notes",
+]
+
+INPUT_COLUMNS = ["transaction_id", "account_id", "customer_id", "transaction_date",
+                 "amount", "location_lat", "location_lon"]
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+# =============================================================================
+# RULE ENGINE
+# =============================================================================
+
+class CustomerWindow:
+    """Sliding-window state of one customer, held in fixed-size ring buffers."""
+
+    __slots__ = ("times", "time_pos", "amounts", "amount_pos", "amount_sum",
+                 "seen", "last_time", "last_lat", "last_lon")
+
+    def __init__(self, time_slots: int, amount_slots: int):
+        self.times = array("d", [0.0]) * time_slots
+        self.time_pos = 0
+        self.amounts = array("d", [0.0]) * amount_slots
+        self.amount_pos = 0
+        self.amount_sum = 0.0
+        self.seen = 0
+        self.last_time = 0.0
+        self.last_lat = 0.0
+        self.last_lon = 0.0
+
+
+def make_alert(rule: str, severity: str, risk_score: float, description: str,
+               transaction_id: str, account_id: str, customer_id: str, seconds: float) -> dict:
+    """Build one ALERTS row for a transaction that triggered a rule."""
+    return {
+        "alert_id": str(uuid.uuid4()),
+        "transaction_id": transaction_id,
+        "account_id": account_id,
+        "customer_id": customer_id,
+        "alert_timestamp": datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None).isoformat(),
+        "alert_type": ALERT_TYPES[rule],
+        "severity": severity,
+        "status": "Open",
+        "description": description,
+        "risk_score": round(min(risk_score, 99.99), 2),
+        "resolved_at": "",
+        "resolved_by": "",
+        "resolution_notes": "",
+    }
+
+
+class RuleEngine:
+    """Evaluates the velocity, amount-spike and impossible-travel rules event by event."""
+
+    def __init__(self, rules: dict = None):
+        self.rules = {name: {**params, **(rules or {}).get(name, {})} for name, params in RULES.items()}
+        if self.rules["velocity"]["count"] < 2:
+            raise ValueError("velocity count must be at least 2")
+        self.windows = {}
+        self.events = 0
+        self.alerts = {rule: 0 for rule in RULES}
+
+    def run(self, events):
+        """Yield the alerts raised by each event.
+
+        `events` yields (transaction_id, account_id, customer_id, seconds, amount,
+        lat, lon) tuples, in event-time order per customer; `seconds` is the
+        transaction time as Unix seconds.
+        """
+        velocity = self.rules["velocity"]
+        spike = self.rules["amount_spike"]
+        travel = self.rules["impossible_travel"]
+        time_slots, window_seconds = velocity["count"] - 1, velocity["window_seconds"]
+        amount_slots, min_history = spike["history"], spike["min_history"]
+        multiplier, min_amount = spike["multiplier"], spike["min_amount"]
+        max_kmh, min_km = travel["max_kmh"], travel["min_km"]
+        windows, counts = self.windows, self.alerts
+        radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+
+        processed = 0
+        try:
+            for transaction_id, account_id, customer_id, seconds, amount, lat, lon in events:
+                processed += 1
+                window = windows.get(customer_id)
+                if window is None:
+                    window = windows[customer_id] = CustomerWindow(time_slots, amount_slots)
+                seen = window.seen
+
+                # Velocity: the slot about to be overwritten holds the event count-1 back
+                pos = window.time_pos
+                if seen >= time_slots:
+                    span = seconds - window.times[pos]
+                    if span <= window_seconds:
+                        counts["velocity"] += 1
+                        yield make_alert(
+                            "velocity", "High" if span < window_seconds / 5 else "Medium",
+                            60 + 30 * (1 - span / window_seconds),
+                            f"{velocity['count']} transactions within {span:.0f} seconds",
+                            transaction_id, account_id, customer_id, seconds)
+                window.times[pos] = seconds
+                window.time_pos = (pos + 1) % time_slots
+
+                # Amount spike against the average of the previous `history` amounts
+                if seen >= min_history and amount >= min_amount:
+                    average = window.amount_sum / (seen if seen < amount_slots else amount_slots)
+                    # A zero average (refunds, zero-amount history) has no meaningful ratio
+                    if average > 0 and amount >= multiplier * average:
+                        ratio = amount / average
+                        counts["amount_spike"] += 1
+                        yield make_alert(
+                            "amount_spike", "Critical" if ratio >= 20 else "High" if ratio >= 10 else "Medium",
+                            40 + 3 * ratio,
+                            f"Amount ${amount:,.2f} is {ratio:.1f}x the customer's recent average of ${average:,.2f}",
+                            transaction_id, account_id, customer_id, seconds)
+                pos = window.amount_pos
+                window.amount_sum += amount - window.amounts[pos]
+                window.amounts[pos] = amount
+                window.amount_pos = (pos + 1) % amount_slots
+
+                # Impossible travel: haversine speed from the previous location
+                if seen:
+                    lat1, lat2 = radians(window.last_lat), radians(lat)
+                    a = (sin((lat2 - lat1) / 2) ** 2
+                         + cos(lat1) * cos(lat2) * sin(radians(lon - window.last_lon) / 2) ** 2)
+                    km = 2 * EARTH_RADIUS_KM * asin(sqrt(min(a, 1.0)))
+                    if km >= min_km:
+                        hours = max(abs(seconds - window.last_time), 1.0) / 3600
+                        kmh = km / hours
+                        if kmh > max_kmh:
+                            counts["impossible_travel"] += 1
+                            yield make_alert(
+                                "impossible_travel", "Critical" if kmh > 5 * max_kmh else "High",
+                                50 + 25 * math.log10(kmh / max_kmh),
+                                f"{km:,.0f} km from the previous transaction in {hours * 60:,.1f} minutes "
+                                f"({kmh:,.0f} km/h)",
+                                transaction_id, account_id, customer_id, seconds)
+
+                window.last_time = seconds
+                window.last_lat = lat
+                window.last_lon = lon
+                window.seen = seen + 1
+        finally:
+            self.events += processed
+
+
+# =============================================================================
+# PARTITIONING
+# =============================================================================
+
+def partition_of(customer_id: str, partitions: int) -> int:
+    """Stable partition of a customer (Python's hash() differs per process)."""
+    return zlib.crc32(customer_id.encode("utf-8")) % partitions
+
+
+def parse_partition(value: str) -> tuple:
+    index, partitions = (int(part) for part in value.split("/"))
+    if not 0 <= index < partitions:
+        raise argparse.ArgumentTypeError(f"partition {value} is not of the form I/N with 0 <= I < N")
+    return index, partitions
+
+
+# =============================================================================
+# INPUT
+# =============================================================================
+
+def load_columns(path: Path) -> dict:
+    """Read the rule inputs of a transactions file as columns sorted by transaction time."""
+    import numpy as np
+    import pandas as pd
+
+    df = pd.concat(list(read_chunks(find_table(path), INPUT_COLUMNS)), ignore_index=True)
+    times = pd.to_datetime(df["transaction_date"], format="ISO8601")
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    seconds = times.astype("datetime64[ns]").to_numpy().astype("int64") / 1e9
+    order = np.argsort(seconds, kind="stable")
+
+    def column(name, fill):
+        if name not in df:
+            return np.full(len(df), fill, dtype=object)
+        return df[name].to_numpy() if fill is None else df[name].fillna(fill).to_numpy()
+
+    return {
+        "transaction_id": column("transaction_id", None)[order].astype(str),
+        "account_id": column("account_id", "")[order],
+        "customer_id": column("customer_id", None)[order].astype(str),
+        "seconds": seconds[order],
+        "amount": pd.to_numeric(df["amount"]).to_numpy("float64")[order],
+        "lat": pd.to_numeric(df["location_lat"]).to_numpy("float64")[order],
+        "lon": pd.to_numeric(df["location_lon"]).to_numpy("float64")[order],
+    }
+
+
+def split_columns(columns: dict, partitions: int) -> list:
+    """Split sorted columns into per-partition columns, keeping event-time order."""
+    import numpy as np
+    import pandas as pd
+
+    codes, customers = pd.factorize(columns["customer_id"])
+    customer_partition = np.array([partition_of(c, partitions) for c in customers], dtype="int64")
+    row_partition = customer_partition[codes]
+    parts = []
+    for index in range(partitions):
+        rows = np.flatnonzero(row_partition == index)
+        parts.append({name: values[rows] for name, values in columns.items()})
+    return parts
+
+
+def column_events(columns: dict):
+    """Event tuples from loaded columns (plain lists iterate fastest)."""
+    return zip(columns["transaction_id"].tolist(), columns["account_id"].tolist(),
+               columns["customer_id"].tolist(), columns["seconds"].tolist(),
+               columns["amount"].tolist(), columns["lat"].tolist(), columns["lon"].tolist())
+
+
+def stream_events(lines, partition: tuple = None):
+    """Event tuples from JSON lines shaped like generate_data.py transaction rows."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        row = {key.lower(): value for key, value in json.loads(line).items()}
+        customer_id = str(row["customer_id"])
+        if partition and partition_of(customer_id, partition[1]) != partition[0]:
+            continue
+        when = datetime.fromisoformat(str(row["transaction_date"]))
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        yield (str(row["transaction_id"]), row.get("account_id") or "", customer_id, when.timestamp(),
+               float(row["amount"]), float(row["location_lat"]), float(row["location_lon"]))
+
+
+def detect_partition(task: tuple) -> tuple:
+    """Worker entry point: run a fresh engine over one partition's columns."""
+    columns, rules = task
+    engine = RuleEngine(rules)
+    alerts = list(engine.run(column_events(columns)))
+    return alerts, engine.events, engine.alerts
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+
+def write_alerts(filepath: Path, alerts: list):
+    """Write alerts to CSV in ALERTS column order."""
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=ALERT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(alerts)
+    print(f"  Written: {filepath.name} ({len(alerts)} rows)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming sliding-window fraud rules over transactions")
+    parser.add_argument("--input", required=True,
+                        help="Transactions CSV/Parquet file, a generate_data.py output directory, "
+                             "or - for JSON lines on stdin")
+    parser.add_argument("--output-dir", help="Write alerts.csv here (default: JSON lines on stdout)")
+    parser.add_argument("--rules", help="JSON file overriding entries of RULES")
+    parser.add_argument("--partition", type=parse_partition,
+                        help="Only evaluate customers of partition I of N, e.g. 0/4")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for file input; customers are partitioned across them")
+    args = parser.parse_args()
+
+    rules = {}
+    if args.rules:
+        with open(args.rules, 'r') as f:
+            rules = json.load(f)
+
+    start = time.perf_counter()
+    if args.input == "-":
+        if args.output_dir:
+            parser.error("--output-dir needs file input; stream alerts are written to stdout")
+        engine = RuleEngine(rules)
+        for alert in engine.run(stream_events(sys.stdin, args.partition)):
+            print(json.dumps(alert), flush=True)
+        alerts, events, counts = None, engine.events, engine.alerts
+    else:
+        columns = load_columns(Path(args.input))
+        if args.partition:
+            columns = split_columns(columns, args.partition[1])[args.partition[0]]
+        loaded = time.perf_counter()
+        print(f"Loaded {len(columns['seconds']):,} transactions in {loaded - start:.2f}s", file=sys.stderr)
+        start = loaded
+        if args.workers > 1:
+            tasks = [(part, rules) for part in split_columns(columns, args.workers)]
+            with Pool(args.workers) as pool:
+                results = pool.map(detect_partition, tasks)
+            alerts = sorted((alert for result in results for alert in result[0]),
+                            key=lambda alert: alert["alert_timestamp"])
+            events = sum(result[1] for result in results)
+            counts = {rule: sum(result[2][rule] for result in results) for rule in RULES}
+        else:
+            alerts, events, counts = detect_partition((columns, rules))
+    seconds = time.perf_counter() - start
+
+    if alerts is not None:
+        if args.output_dir:
+            output_dir = Path(args.output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            write_alerts(output_dir / "alerts.csv", alerts)
+        else:
+            for alert in alerts:
+                print(json.dumps(alert))
+
+    print("", file=sys.stderr)
+    print(f"Evaluated {events:,} events in {seconds:.2f}s ({events / max(seconds, 1e-9):,.0f} events/s)",
+          file=sys.stderr)
+    for rule, count in counts.items():
+        print(f"  {ALERT_TYPES[rule]}: {count} alerts", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
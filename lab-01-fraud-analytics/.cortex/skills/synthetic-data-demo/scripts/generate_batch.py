@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+generate_batch.py - Generate many datasets from a manifest in one invocation.
+
+The non-interactive counterpart of ask_questions.sh + generate_data.py for
+scheduled jobs. A manifest lists datasets; `dataset_type` and `num_records`
+may be lists, which expand to one job per combination:
+
+    {
+      "defaults": {"format": "parquet", "seed": 42},
+      "datasets": [
+        {"dataset_type": ["financial_fraud", "logistics", "healthcare", "ecommerce"],
+         "num_records": [1000, 100000],
+         "output_dir": "nightly/{dataset_type}_{num_records}"}
+      ]
+    }
+
+Each job takes dataset_type, num_records, seed (random when omitted), format
+(csv or parquet), layout (flat or hive), output_dir and faker_pool. Relative output dirs are resolved against
+the manifest's directory.
+
+By default a job calls Faker for every value, so its output matches
+generate_data.py run with the same seed (dates aside, which are relative to
+the current time). faker_pool: N (or true for POOL_SIZE values) opts the job
+into FakerPool, which draws text values from N pre-generated values per
+provider and is several times faster. Pooled columns such as names and emails
+then have at most N distinct values, and the output no longer matches an
+unpooled run with the same seed.
+
+Jobs run on a pool of worker processes. Each worker imports Faker once and
+builds the FakerPool value pools the manifest asks for once, then reuses
+them for every job it runs. Largest jobs are started first so
+that the pool drains evenly. Every job also writes its
+synthetic_data_config.json next to its data, so validate_output.py and
+profile_data.py can run on it. The combined summary goes to stdout and to
+batch_summary.json.
+
+Usage:
+    uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/generate_batch.py \
+        --manifest ./nightly.json \
+        --jobs 4
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import generate_data
+from generate_data import FILE_FORMATS, GENERATORS, LAYOUTS, POOL_SIZE
+
+JOB_FIELDS = ("dataset_type", "num_records", "seed", "format", "layout", "output_dir", "faker_pool")
+
+
+def expand_manifest(manifest: dict, base_dir: Path) -> list:
+    """One job dict per dataset entry and dataset_type x num_records combination."""
+    defaults = manifest.get("defaults", {})
+    jobs = []
+    for entry in manifest.get("datasets", []):
+        entry = {**defaults, **entry}
+        unknown = set(entry) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown manifest field(s): {', '.join(sorted(unknown))}")
+        types = entry.get("dataset_type", "ecommerce")
+        sizes = entry.get("num_records", 1000)
+        for dataset_type, num_records in itertools.product(
+                types if isinstance(types, list) else [types], sizes if isinstance(sizes, list) else [sizes]):
+            if dataset_type not in GENERATORS:
+                raise ValueError(f"Unknown dataset type '{dataset_type}'")
+            file_format = entry.get("format", "csv")
+            if file_format not in FILE_FORMATS:
+                raise ValueError(f"Unknown format '{file_format}' (expected one of {', '.join(FILE_FORMATS)})")
+            layout = entry.get("layout", "flat")
+            if layout not in LAYOUTS:
+                raise ValueError(f"Unknown layout '{layout}' (expected one of {', '.join(LAYOUTS)})")
+            output_dir = entry.get("output_dir", "{dataset_type}_{num_records}")
+            output_dir = Path(output_dir.format(dataset_type=dataset_type, num_records=num_records,
+                                                format=file_format))
+            faker_pool = entry.get("faker_pool", 0)
+            faker_pool = POOL_SIZE if faker_pool is True else int(faker_pool or 0)
+            if faker_pool < 0:
+                raise ValueError(f"faker_pool must be a number of values, true or false, not {faker_pool}")
+            seed = entry.get("seed")
+            jobs.append({
+                "dataset_type": dataset_type,
+                "num_records": int(num_records),
+                "seed": random.randint(0, 2**31 - 1) if seed is None else int(seed),
+                "format": file_format,
+                "layout": layout,
+                "output_dir": str(output_dir if output_dir.is_absolute() else base_dir / output_dir),
+                "faker_pool": faker_pool,
+            })
+    targets = [job["output_dir"] for job in jobs]
+    duplicates = sorted({target for target in targets if targets.count(target) > 1})
+    if duplicates:
+        raise ValueError(f"Several jobs write to {', '.join(duplicates)}")
+    return jobs
+
+
+def warm_worker(pool_sizes: list):
+    """Process initializer: build the Faker value pools of every size the jobs use once per worker."""
+    for size in pool_sizes:
+        generate_data.use_faker_pools(size)
+
+
+def run_job(job: dict) -> dict:
+    """Generate one dataset and return its summary."""
+    output_dir = Path(job["output_dir"])
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / "synthetic_data_config.json", 'w') as f:
+        json.dump({"dataset_type": job["dataset_type"], "num_records": job["num_records"], "seed": job["seed"],
+                   "file_format": job["format"], "layout": job["layout"]}, f, indent=2)
+
+    generate_data.use_faker_pools(job["faker_pool"])
+    generate_data.seed_generators(job["seed"])
+    start = time.perf_counter()
+    # The per-table "Written:" lines of parallel jobs would interleave
+    with contextlib.redirect_stdout(io.StringIO()):
+        tables = GENERATORS[job["dataset_type"]](job["num_records"], output_dir, job["format"], job["layout"])
+    seconds = time.perf_counter() - start
+    rows = sum(tables.values())
+    # Stage utilization of the job's generate/encode/write pipeline (see write_pipeline.py)
+    with open(output_dir / "pipeline_metrics.json", 'r') as f:
+        pipeline = json.load(f)
+    return {**job, "status": "ok", "tables": tables, "rows": rows, "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / max(seconds, 1e-9)), "pipeline": pipeline, "worker": os.getpid()}
+
+
+def run_batch(jobs: list, workers: int) -> list:
+    """Run jobs largest-first on `workers` warm processes; results keep manifest order."""
+    pool_sizes = sorted({job["faker_pool"] for job in jobs} - {0})
+    order = sorted(range(len(jobs)), key=lambda i: -jobs[i]["num_records"])
+    results = [None] * len(jobs)
+
+    def finished(i, result):
+        results[i] = result
+        job = jobs[i]
+        status = f"{result['rows']:,} rows in {result['seconds']:.2f}s" if result["status"] == "ok" else "FAILED"
+        print(f"  [{sum(r is not None for r in results)}/{len(jobs)}] {job['dataset_type']} "
+              f"x {job['num_records']:,} -> {job['output_dir']}: {status}")
+
+    if workers <= 1:
+        warm_worker(pool_sizes)
+        for i in order:
+            try:
+                finished(i, run_job(jobs[i]))
+            except Exception as e:
+                finished(i, {**jobs[i], "status": "failed", "error": f"{type(e).__name__}: {e}"})
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_worker, initargs=(pool_sizes,)) as executor:
+        futures = {executor.submit(run_job, jobs[i]): i for i in order}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                finished(i, future.result())
+            except Exception as e:
+                finished(i, {**jobs[i], "status": "failed", "error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate several synthetic datasets from a manifest")
+    parser.add_argument("--manifest", required=True, help="Path to the batch manifest JSON file")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Datasets generated in parallel (default: CPU count)")
+    parser.add_argument("--summary", help="Combined summary path (default: <manifest dir>/batch_summary.json)")
+    args = parser.parse_args()
+
+    manifest_path = Path(args.manifest)
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    try:
+        jobs = expand_manifest(manifest, manifest_path.resolve().parent)
+    except ValueError as e:
+        parser.error(str(e))
+    if not jobs:
+        parser.error("The manifest lists no datasets")
+
+    workers = max(1, min(args.jobs, len(jobs)))
+    print(f"Generating {len(jobs)} dataset(s) on {workers} worker(s)...")
+    start = time.perf_counter()
+    results = run_batch(jobs, workers)
+    seconds = time.perf_counter() - start
+
+    rows = sum(result.get("rows", 0) for result in results)
+    summary = {"jobs": len(jobs), "workers": workers, "rows": rows, "seconds": round(seconds, 3),
+               "rows_per_second": round(rows / max(seconds, 1e-9)), "datasets": results}
+    summary_path = Path(args.summary) if args.summary else manifest_path.resolve().parent / "batch_summary.json"
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print("")
+    print("Summary:")
+    for result in results:
+        if result["status"] == "ok":
+            tables = ", ".join(f"{table} {count:,}" for table, count in result["tables"].items())
+            pooled = f", Faker pool {result['faker_pool']:,}" if result["faker_pool"] else ""
+            print(f"  {result['dataset_type']} x {result['num_records']:,} ({result['format']}, {result['layout']}, seed "
+                  f"{result['seed']}{pooled}): {tables}; bottleneck {result['pipeline']['bottleneck']}")
+    print(f"  Total: {rows:,} rows in {seconds:.2f}s ({summary['rows_per_second']:,} rows/s)")
+    print(f"  Written: {summary_path}")
+
+    failures = [result for result in results if result["status"] != "ok"]
+    if failures:
+        print("")
+        print(f"FAILED - {len(failures)} job(s):")
+        for result in failures:
+            print(f"  {result['dataset_type']} x {result['num_records']:,}: {result['error']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
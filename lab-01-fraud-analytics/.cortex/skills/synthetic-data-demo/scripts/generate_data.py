@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-generate_data.py - Generate synthetic CSV data with relational integrity.
+generate_data.py - Generate synthetic CSV or Parquet data with relational integrity.
 
 Usage:
     uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/generate_data.py \
@@ -9,30 +9,120 @@ Usage:
 """
 
 import argparse
+import csv
+import io
 import json
 import os
 import random
 import uuid
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
 
+import pandas as pd
 from faker import Faker
 
+from generate_schema import SCHEMAS, partition_column
+from table_files import typed_frame
+from write_pipeline import QUEUE_DEPTH, ChunkSink, WritePipeline
+
 fake = Faker()
 # Use random seeds for variety in data generation
 Faker.seed(None)
 random.seed()
 
+# Argument-free Faker providers that FakerPool serves from pre-generated values
+POOLED_PROVIDERS = ("first_name", "last_name", "name", "email", "phone_number", "street_address", "address",
+                    "city", "state_abbr", "country", "company", "word", "sentence")
+POOL_SIZE = 2_000
+POOL_SEED = 0
+
+FILE_FORMATS = ("csv", "parquet")
+# flat: data/<table>.<format>; hive: fact tables in data/<table>/date=YYYY-MM-DD/part-00000.<format>
+LAYOUTS = ("flat", "hive")
+
+# Fact-table records generated before a chunk is handed to the background writer
+CHUNK_RECORDS = 50_000
+# Hive Parquet: rows buffered per date partition before they are written as one
+# row group, and across all partitions before the largest buffers are flushed early
+ROW_GROUP_ROWS = 100_000
+PARTITION_BUFFER_ROWS = 500_000
+
+
+class FakerPool:
+    """Faker stand-in that draws text values from pools built once per process.
+
+    A Faker provider call costs several microseconds per value, and most of a
+    run's time goes into them. The pools are generated eagerly from their own
+    seeded Faker, so they have the same contents in every process, and values
+    are drawn with the module's `random`, so a seeded run stays reproducible.
+    Calls with arguments, and all other providers, go to the wrapped Faker.
+    """
+
+    def __init__(self, faker: Faker, size: int = POOL_SIZE):
+        self._faker = faker
+        source = Faker()
+        source.seed_instance(POOL_SEED)
+        self._pools = {name: [getattr(source, name)() for _ in range(size)] for name in POOLED_PROVIDERS}
+
+    def __getattr__(self, name):
+        method = getattr(self._faker, name)
+        pool = self._pools.get(name)
+        if pool is None:
+            return method
+
+        def draw(*args, **kwargs):
+            if args or kwargs:
+                return method(*args, **kwargs)
+            return pool[random.randrange(len(pool))]
+        return draw
+
+
+_faker_pools = {}  # size -> FakerPool, built at most once per process
+
+
+def use_faker_pools(size: int = POOL_SIZE):
+    """Serve POOLED_PROVIDERS from pools of `size` values, or from Faker itself when size is 0.
+
+    Pooled runs draw from `random` differently, so they are not reproducible
+    against unpooled runs with the same seed, and a pooled provider yields at
+    most `size` distinct values.
+    """
+    global fake
+    faker = fake._faker if isinstance(fake, FakerPool) else fake
+    if not size:
+        fake = faker
+        return
+    if size not in _faker_pools:
+        _faker_pools[size] = FakerPool(faker, size)
+    fake = _faker_pools[size]
+
+
+def seed_generators(seed: int = None):
+    """Seed Faker, random and new_id(); None draws fresh randomness.
 
-def generate_financial_fraud_data(num_records: int, output_dir: Path):
+    Dates stay relative to the current time, so only they differ between seeded runs.
+    """
+    Faker.seed(seed)
+    random.seed(seed)
+
+
+def new_id() -> str:
+    """Random UUID4 string from the module's `random`, so seeded runs repeat their keys."""
+    return str(uuid.UUID(int=random.getrandbits(128), version=4))
+
+
+def generate_financial_fraud_data(num_records: int, output_dir: Path, file_format: str = "csv",
+                                  layout: str = "flat"):
     """Generate financial fraud detection dataset."""
+    writer = DatasetWriter(output_dir, "financial_fraud", file_format, layout)
     
     # Generate customers (1/10 of transactions)
     num_customers = max(100, num_records // 10)
     customers = []
     for _ in range(num_customers):
         customers.append({
-            "customer_id": str(uuid.uuid4()),
+            "customer_id": new_id(),
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
             "email": fake.email(),
@@ -51,7 +141,7 @@ def generate_financial_fraud_data(num_records: int, output_dir: Path):
     merchants = []
     for _ in range(num_merchants):
         merchants.append({
-            "merchant_id": str(uuid.uuid4()),
+            "merchant_id": new_id(),
             "merchant_name": fake.company(),
             "category": random.choice(categories),
             "city": fake.city(),
@@ -59,6 +149,9 @@ def generate_financial_fraud_data(num_records: int, output_dir: Path):
             "risk_score": round(random.uniform(0.0, 1.0), 2),
         })
     
+    writer.write("customers", customers)
+    writer.write("merchants", merchants)
+    
     # Generate transactions
     transaction_types = ["purchase", "refund", "transfer"]
     channels = ["online", "in_store", "mobile", "atm"]
@@ -67,12 +160,18 @@ def generate_financial_fraud_data(num_records: int, output_dir: Path):
     transactions = []
     fraud_labels = []
     
-    for _ in range(num_records):
+    for record in range(num_records):
+        if record and record % CHUNK_RECORDS == 0:
+            # Hand the finished chunk to the background writer and start the next
+            writer.write("transactions", transactions)
+            writer.write("fraud_labels", fraud_labels)
+            transactions, fraud_labels = [], []
+        
         customer = random.choice(customers)
         merchant = random.choice(merchants)
         is_fraud = random.random() < 0.03  # 3% fraud rate
         
-        trans_id = str(uuid.uuid4())
+        trans_id = new_id()
         trans_date = fake.date_time_between(start_date="-1y", end_date="now")
         
         # Fraudulent transactions tend to be larger
@@ -101,7 +200,7 @@ def generate_financial_fraud_data(num_records: int, output_dir: Path):
             fraud_type = random.choice(["card_theft", "account_takeover", "identity_fraud", "friendly_fraud"])
         
         fraud_labels.append({
-            "label_id": str(uuid.uuid4()),
+            "label_id": new_id(),
             "transaction_id": trans_id,
             "is_fraud": is_fraud,
             "fraud_type": fraud_type,
@@ -109,32 +208,23 @@ def generate_financial_fraud_data(num_records: int, output_dir: Path):
             "flagged_date": (trans_date + timedelta(hours=random.randint(1, 72))).isoformat() if is_fraud else "",
         })
     
-    # Write CSVs
-    data_dir = output_dir / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    
-    write_csv(data_dir / "customers.csv", customers)
-    write_csv(data_dir / "merchants.csv", merchants)
-    write_csv(data_dir / "transactions.csv", transactions)
-    write_csv(data_dir / "fraud_labels.csv", fraud_labels)
+    writer.write("transactions", transactions)
+    writer.write("fraud_labels", fraud_labels)
     
-    return {
-        "customers": len(customers),
-        "merchants": len(merchants),
-        "transactions": len(transactions),
-        "fraud_labels": len(fraud_labels),
-    }
+    return writer.close()
 
 
-def generate_logistics_data(num_records: int, output_dir: Path):
+def generate_logistics_data(num_records: int, output_dir: Path, file_format: str = "csv",
+                            layout: str = "flat"):
     """Generate logistics and shipping dataset."""
+    writer = DatasetWriter(output_dir, "logistics", file_format, layout)
     
     # Generate warehouses
     num_warehouses = max(10, num_records // 500)
     warehouses = []
     for _ in range(num_warehouses):
         warehouses.append({
-            "warehouse_id": str(uuid.uuid4()),
+            "warehouse_id": new_id(),
             "warehouse_name": f"{fake.city()} Distribution Center",
             "address": fake.street_address(),
             "city": fake.city(),
@@ -151,7 +241,7 @@ def generate_logistics_data(num_records: int, output_dir: Path):
     for _ in range(num_routes):
         warehouse = random.choice(warehouses)
         routes.append({
-            "route_id": str(uuid.uuid4()),
+            "route_id": new_id(),
             "origin_warehouse_id": warehouse["warehouse_id"],
             "destination_city": fake.city(),
             "destination_country": fake.country(),
@@ -160,6 +250,9 @@ def generate_logistics_data(num_records: int, output_dir: Path):
             "transport_mode": random.choice(transport_modes),
         })
     
+    writer.write("warehouses", warehouses)
+    writer.write("routes", routes)
+    
     # Generate shipments
     priorities = ["standard", "express", "overnight"]
     shipments = []
@@ -170,9 +263,14 @@ def generate_logistics_data(num_records: int, output_dir: Path):
     now = datetime.now()
     six_months_ago = now - timedelta(days=180)
     
-    for _ in range(num_records):
+    for record in range(num_records):
+        if record and record % CHUNK_RECORDS == 0:
+            writer.write("shipments", shipments)
+            writer.write("deliveries", deliveries)
+            shipments, deliveries = [], []
+        
         route = random.choice(routes)
-        ship_id = str(uuid.uuid4())
+        ship_id = new_id()
         
         # Generate random date within range
         random_days = random.randint(0, 180)
@@ -212,7 +310,7 @@ def generate_logistics_data(num_records: int, output_dir: Path):
         actual_delivery = expected_delivery + timedelta(days=delay_days) if status != "lost" else None
         
         deliveries.append({
-            "delivery_id": str(uuid.uuid4()),
+            "delivery_id": new_id(),
             "shipment_id": ship_id,
             "actual_delivery": actual_delivery.isoformat() if actual_delivery else "",
             "delivery_status": status,
@@ -221,24 +319,16 @@ def generate_logistics_data(num_records: int, output_dir: Path):
             "delivery_notes": fake.sentence() if status in ["returned", "damaged"] else "",
         })
     
-    data_dir = output_dir / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    
-    write_csv(data_dir / "warehouses.csv", warehouses)
-    write_csv(data_dir / "routes.csv", routes)
-    write_csv(data_dir / "shipments.csv", shipments)
-    write_csv(data_dir / "deliveries.csv", deliveries)
+    writer.write("shipments", shipments)
+    writer.write("deliveries", deliveries)
     
-    return {
-        "warehouses": len(warehouses),
-        "routes": len(routes),
-        "shipments": len(shipments),
-        "deliveries": len(deliveries),
-    }
+    return writer.close()
 
 
-def generate_healthcare_data(num_records: int, output_dir: Path):
+def generate_healthcare_data(num_records: int, output_dir: Path, file_format: str = "csv",
+                             layout: str = "flat"):
     """Generate healthcare records dataset."""
+    writer = DatasetWriter(output_dir, "healthcare", file_format, layout)
     
     # Generate patients
     num_patients = max(100, num_records // 5)
@@ -248,7 +338,7 @@ def generate_healthcare_data(num_records: int, output_dir: Path):
     patients = []
     for _ in range(num_patients):
         patients.append({
-            "patient_id": str(uuid.uuid4()),
+            "patient_id": new_id(),
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
             "date_of_birth": fake.date_of_birth(minimum_age=1, maximum_age=90).isoformat(),
@@ -261,6 +351,8 @@ def generate_healthcare_data(num_records: int, output_dir: Path):
             "insurance_id": fake.bothify(text="???########"),
         })
     
+    writer.write("patients", patients)
+    
     # Generate visits
     visit_types = ["routine", "emergency", "follow_up", "specialist"]
     departments = ["Primary Care", "Emergency", "Cardiology", "Orthopedics", "Dermatology", "Pediatrics"]
@@ -283,9 +375,15 @@ def generate_healthcare_data(num_records: int, output_dir: Path):
     
     medications = ["Lisinopril", "Metformin", "Omeprazole", "Amoxicillin", "Ibuprofen", "Atorvastatin", "Albuterol", "Sertraline"]
     
-    for _ in range(num_records):
+    for record in range(num_records):
+        if record and record % CHUNK_RECORDS == 0:
+            writer.write("visits", visits)
+            writer.write("diagnoses", diagnoses)
+            writer.write("prescriptions", prescriptions)
+            visits, diagnoses, prescriptions = [], [], []
+        
         patient = random.choice(patients)
-        visit_id = str(uuid.uuid4())
+        visit_id = new_id()
         visit_date = fake.date_time_between(start_date="-1y", end_date="now")
         
         visits.append({
@@ -305,7 +403,7 @@ def generate_healthcare_data(num_records: int, output_dir: Path):
         for i in range(num_diagnoses):
             diag = random.choice(diagnosis_options)
             diagnoses.append({
-                "diagnosis_id": str(uuid.uuid4()),
+                "diagnosis_id": new_id(),
                 "visit_id": visit_id,
                 "icd_code": diag[0],
                 "diagnosis_name": diag[1],
@@ -316,7 +414,7 @@ def generate_healthcare_data(num_records: int, output_dir: Path):
         # 60% chance of prescription
         if random.random() < 0.6:
             prescriptions.append({
-                "prescription_id": str(uuid.uuid4()),
+                "prescription_id": new_id(),
                 "visit_id": visit_id,
                 "medication_name": random.choice(medications),
                 "dosage": f"{random.choice([5, 10, 20, 50, 100, 250, 500])}mg",
@@ -326,24 +424,17 @@ def generate_healthcare_data(num_records: int, output_dir: Path):
                 "prescribed_date": visit_date.date().isoformat(),
             })
     
-    data_dir = output_dir / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    
-    write_csv(data_dir / "patients.csv", patients)
-    write_csv(data_dir / "visits.csv", visits)
-    write_csv(data_dir / "diagnoses.csv", diagnoses)
-    write_csv(data_dir / "prescriptions.csv", prescriptions)
+    writer.write("visits", visits)
+    writer.write("diagnoses", diagnoses)
+    writer.write("prescriptions", prescriptions)
     
-    return {
-        "patients": len(patients),
-        "visits": len(visits),
-        "diagnoses": len(diagnoses),
-        "prescriptions": len(prescriptions),
-    }
+    return writer.close()
 
 
-def generate_ecommerce_data(num_records: int, output_dir: Path):
+def generate_ecommerce_data(num_records: int, output_dir: Path, file_format: str = "csv",
+                            layout: str = "flat"):
     """Generate e-commerce transactions dataset."""
+    writer = DatasetWriter(output_dir, "ecommerce", file_format, layout)
     
     # Generate customers
     num_customers = max(100, num_records // 5)
@@ -352,7 +443,7 @@ def generate_ecommerce_data(num_records: int, output_dir: Path):
     customers = []
     for _ in range(num_customers):
         customers.append({
-            "customer_id": str(uuid.uuid4()),
+            "customer_id": new_id(),
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
             "email": fake.email(),
@@ -381,7 +472,7 @@ def generate_ecommerce_data(num_records: int, output_dir: Path):
         subcategory = random.choice(categories[category])
         price = round(random.uniform(10, 500), 2)
         products.append({
-            "product_id": str(uuid.uuid4()),
+            "product_id": new_id(),
             "product_name": f"{fake.word().title()} {subcategory} {random.randint(100, 999)}",
             "category": category,
             "subcategory": subcategory,
@@ -392,6 +483,9 @@ def generate_ecommerce_data(num_records: int, output_dir: Path):
             "rating": round(random.uniform(2.5, 5.0), 1),
         })
     
+    writer.write("customers", customers)
+    writer.write("products", products)
+    
     # Generate orders
     statuses = ["pending", "shipped", "delivered", "cancelled"]
     shipping_methods = ["standard", "express", "overnight", "pickup"]
@@ -400,9 +494,14 @@ def generate_ecommerce_data(num_records: int, output_dir: Path):
     orders = []
     order_items = []
     
-    for _ in range(num_records):
+    for record in range(num_records):
+        if record and record % CHUNK_RECORDS == 0:
+            writer.write("orders", orders)
+            writer.write("order_items", order_items)
+            orders, order_items = [], []
+        
         customer = random.choice(customers)
-        order_id = str(uuid.uuid4())
+        order_id = new_id()
         order_date = fake.date_time_between(start_date="-1y", end_date="now")
         
         # Generate 1-5 items per order
@@ -416,7 +515,7 @@ def generate_ecommerce_data(num_records: int, output_dir: Path):
             subtotal += line_total
             
             order_items.append({
-                "item_id": str(uuid.uuid4()),
+                "item_id": new_id(),
                 "order_id": order_id,
                 "product_id": product["product_id"],
                 "quantity": quantity,
@@ -441,41 +540,198 @@ def generate_ecommerce_data(num_records: int, output_dir: Path):
             "payment_method": random.choice(payment_methods),
         })
     
-    data_dir = output_dir / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    
-    write_csv(data_dir / "customers.csv", customers)
-    write_csv(data_dir / "products.csv", products)
-    write_csv(data_dir / "orders.csv", orders)
-    write_csv(data_dir / "order_items.csv", order_items)
+    writer.write("orders", orders)
+    writer.write("order_items", order_items)
     
-    return {
-        "customers": len(customers),
-        "products": len(products),
-        "orders": len(orders),
-        "order_items": len(order_items),
-    }
+    return writer.close()
 
 
-def write_csv(filepath: Path, data: list):
-    """Write list of dicts to CSV file."""
-    if not data:
-        return
-    
-    import csv
-    
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=data[0].keys())
+GENERATORS = {
+    "financial_fraud": generate_financial_fraud_data,
+    "logistics": generate_logistics_data,
+    "healthcare": generate_healthcare_data,
+    "ecommerce": generate_ecommerce_data,
+    "custom": generate_ecommerce_data,  # Default to ecommerce for custom
+}
+
+
+class DatasetWriter:
+    """Streams a dataset's tables to <output_dir>/data as CSV or Parquet.
+
+    write() may be called repeatedly per table with consecutive chunks of rows.
+    Each chunk is encoded and written on a WritePipeline's background threads
+    while the caller generates the next one. With the "hive" layout, tables
+    with a partition_column() (the fact tables) are split by day into
+    <table>/date=YYYY-MM-DD/part-00000.<format>; each day's file is appended
+    to by every chunk, so the number of files does not grow with the data.
+    A chunk holds only a few rows per day, so Parquet day files buffer their
+    rows and write a row group once ROW_GROUP_ROWS have accumulated or at
+    close(); past PARTITION_BUFFER_ROWS buffered rows in total, the largest
+    buffers are written early to bound memory.
+    close() waits for the files, saves the pipeline's stage metrics to
+    pipeline_metrics.json and returns the row count of every table.
+    """
+
+    def __init__(self, output_dir: Path, dataset_type: str, file_format: str = "csv", layout: str = "flat",
+                 queue_depth: int = QUEUE_DEPTH):
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Unknown file format '{file_format}' (expected one of {', '.join(FILE_FORMATS)})")
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}' (expected one of {', '.join(LAYOUTS)})")
+        self.output_dir = output_dir
+        self.data_dir = output_dir / "data"
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.dataset_type = dataset_type
+        self.file_format = file_format
+        self.layout = layout
+        self.rows = {}
+        self.metrics = None
+        self._chunks = {}
+        self._partitions = {}
+        # Open Parquet writers and buffered row groups per file, only touched on the encode thread
+        self._parquet = {}
+        self._buffered = {}
+        self._buffered_rows = 0
+        self._pipeline = WritePipeline(queue_depth)
+
+    def write(self, table: str, data: list):
+        """Queue the next chunk of a table's rows; the list must not be modified afterwards."""
+        if table not in self.rows:
+            self._remove_previous(table)
+            self.rows[table] = 0
+            self._chunks[table] = 0
+        if not data:
+            return
+
+        table_def = SCHEMAS[self.dataset_type]["tables"][table]
+        column = partition_column(table_def) if self.layout == "hive" else None
+        if column:
+            days = self._partitions.setdefault(table, set())
+            encode = partial(self._encode_partitions, table, data, table_def, column, days)
+        elif self.file_format == "parquet":
+            encode = partial(self._encode_parquet, table, data, table_def)
+        else:
+            encode = partial(self._encode_csv, table, data, self._chunks[table] == 0)
+        self._pipeline.submit(encode)
+        self._chunks[table] += 1
+        self.rows[table] += len(data)
+
+    def close(self) -> dict:
+        """Wait for all files to be written, report them and return rows per table."""
+        self._pipeline.submit(self._finish_parquet)
+        self.metrics = self._pipeline.close()
+        for table, rows in self.rows.items():
+            if table in self._partitions:
+                print(f"  Written: {table}/ ({rows} rows in {len(self._partitions[table])} date partitions)")
+            elif rows:
+                print(f"  Written: {table}.{self.file_format} ({rows} rows)")
+
+        stages = self.metrics["stages"]
+        print(f"  Pipeline: {self.metrics['seconds']:.2f}s, "
+              + ", ".join(f"{name} {stage['utilization']:.0%} busy" for name, stage in stages.items())
+              + f" (bottleneck: {self.metrics['bottleneck']})")
+        with open(self.output_dir / "pipeline_metrics.json", 'w') as f:
+            json.dump(self.metrics, f, indent=2)
+        return dict(self.rows)
+
+    def _remove_previous(self, table: str):
+        """Drop the table's files from an earlier run, which readers could pick up instead."""
+        import shutil
+
+        for suffix in FILE_FORMATS:
+            (self.data_dir / f"{table}.{suffix}").unlink(missing_ok=True)
+        if (self.data_dir / table).is_dir():
+            shutil.rmtree(self.data_dir / table)
+
+    # Encoders: run on the pipeline's encode thread, return (path, bytes, final) triples
+
+    def _encode_csv(self, table: str, data: list, header: bool) -> list:
+        return [(self.data_dir / f"{table}.csv", encode_csv(data, header), False)]
+
+    def _encode_parquet(self, table: str, data: list, table_def: dict) -> list:
+        path = self.data_dir / f"{table}.parquet"
+        return [(path, self._parquet_chunk(path, typed_frame(pd.DataFrame(data), table_def)), False)]
+
+    def _encode_partitions(self, table: str, data: list, table_def: dict, column: str, days: set) -> list:
+        df = pd.DataFrame(data)
+        # Rows are routed in one groupby on the ISO date prefix, not one at a time
+        day_of_row = df[column].str[:10]
+        if self.file_format == "parquet":
+            df = typed_frame(df, table_def)
+        files = []
+        for day, part in df.groupby(day_of_row, sort=True):
+            path = self.data_dir / table / f"date={day}" / f"part-00000.{self.file_format}"
+            if self.file_format == "parquet":
+                if self._buffer_rows(path, part) >= ROW_GROUP_ROWS:
+                    files.append((path, self._flush_buffer(path), False))
+            else:
+                files.append((path, part.to_csv(index=False, header=day not in days).encode('utf-8'), False))
+            days.add(day)
+        # Bound memory: write the largest buffers as (smaller) row groups
+        while self._buffered_rows > PARTITION_BUFFER_ROWS:
+            path = max(self._buffered, key=lambda path: sum(len(t) for t in self._buffered[path]))
+            files.append((path, self._flush_buffer(path), False))
+        return files
+
+    def _buffer_rows(self, path: Path, df: pd.DataFrame) -> int:
+        """Hold a partition's rows for its next row group; return the rows now buffered for `path`."""
+        import pyarrow as pa
+
+        tables = self._buffered.setdefault(path, [])
+        tables.append(pa.Table.from_pandas(df, preserve_index=False))
+        self._buffered_rows += len(df)
+        return sum(len(t) for t in tables)
+
+    def _flush_buffer(self, path: Path) -> bytes:
+        import pyarrow as pa
+
+        tables = self._buffered.pop(path)
+        self._buffered_rows -= sum(len(t) for t in tables)
+        schema = self._parquet[path][1].schema if path in self._parquet else tables[0].schema
+        return self._parquet_chunk(path, pa.concat_tables([t.cast(schema) for t in tables]))
+
+    def _parquet_chunk(self, path: Path, df) -> bytes:
+        """Add a row group (from a DataFrame or Arrow table) to the Parquet file at `path`; return its bytes."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow = df if isinstance(df, pa.Table) else pa.Table.from_pandas(df, preserve_index=False)
+        if path not in self._parquet:
+            sink = ChunkSink()
+            writer = pq.ParquetWriter(sink, arrow.schema, coerce_timestamps="us", allow_truncated_timestamps=True)
+            self._parquet[path] = (sink, writer)
+        sink, writer = self._parquet[path]
+        writer.write_table(arrow.cast(writer.schema))
+        return sink.drain()
+
+    def _finish_parquet(self) -> list:
+        files = []
+        for path in list(self._buffered):
+            files.append((path, self._flush_buffer(path), False))
+        for path, (sink, writer) in self._parquet.items():
+            writer.close()
+            files.append((path, sink.drain(), True))
+        return files
+
+
+def encode_csv(data: list, header: bool = True) -> bytes:
+    """Encode a list of dicts as CSV bytes, as csv.DictWriter writes them to a file."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=data[0].keys())
+    if header:
         writer.writeheader()
-        writer.writerows(data)
-    
-    print(f"  Written: {filepath.name} ({len(data)} rows)")
+    writer.writerows(data)
+    return buffer.getvalue().encode('utf-8')
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Generate synthetic CSV data")
+    parser = argparse.ArgumentParser(description="Generate synthetic CSV or Parquet data")
     parser.add_argument("--config", required=True, help="Path to config JSON file")
     parser.add_argument("--output-dir", required=True, help="Output directory")
+    parser.add_argument("--format", choices=FILE_FORMATS,
+                        help="Table file format (default: config file_format, else csv)")
+    parser.add_argument("--layout", choices=LAYOUTS,
+                        help="flat files, or hive date partitions for fact tables (default: config layout, else flat)")
     args = parser.parse_args()
     
     # Load config
@@ -489,16 +745,11 @@ def main():
     print(f"Generating {dataset_type} dataset with {num_records} records...")
     print("")
     
-    generators = {
-        "financial_fraud": generate_financial_fraud_data,
-        "logistics": generate_logistics_data,
-        "healthcare": generate_healthcare_data,
-        "ecommerce": generate_ecommerce_data,
-        "custom": generate_ecommerce_data,  # Default to ecommerce for custom
-    }
-    
-    generator = generators.get(dataset_type, generate_ecommerce_data)
-    summary = generator(num_records, output_dir)
+    seed_generators(config.get('seed'))
+    generator = GENERATORS.get(dataset_type, generate_ecommerce_data)
+    file_format = args.format or config.get('file_format', 'csv')
+    layout = args.layout or config.get('layout', 'flat')
+    summary = generator(num_records, output_dir, file_format, layout)
     
     print("")
     print("Generation complete!")
@@ -20,6 +20,7 @@ SCHEMAS = {
         "tables": {
             "customers": {
                 "description": "Customer account information",
+                "categorical": ["city", "state", "country"],
                 "columns": [
                     ("customer_id", "VARCHAR(36)", "PRIMARY KEY", "Unique customer identifier"),
                     ("first_name", "VARCHAR(100)", "", "Customer first name"),
@@ -36,6 +37,7 @@ SCHEMAS = {
             },
             "merchants": {
                 "description": "Merchant/vendor information",
+                "categorical": ["category", "city", "country"],
                 "columns": [
                     ("merchant_id", "VARCHAR(36)", "PRIMARY KEY", "Unique merchant identifier"),
                     ("merchant_name", "VARCHAR(255)", "", "Business name"),
@@ -47,6 +49,8 @@ SCHEMAS = {
             },
             "transactions": {
                 "description": "Financial transactions",
+                "cluster_by": ["transaction_date"],
+                "categorical": ["currency", "transaction_type", "channel", "device_type"],
                 "columns": [
                     ("transaction_id", "VARCHAR(36)", "PRIMARY KEY", "Unique transaction identifier"),
                     ("customer_id", "VARCHAR(36)", "FOREIGN KEY → customers", "Customer who made the transaction"),
@@ -64,6 +68,8 @@ SCHEMAS = {
             },
             "fraud_labels": {
                 "description": "Fraud classification labels",
+                "cluster_by": ["transaction_id"],
+                "categorical": ["fraud_type"],
                 "columns": [
                     ("label_id", "VARCHAR(36)", "PRIMARY KEY", "Unique label identifier"),
                     ("transaction_id", "VARCHAR(36)", "FOREIGN KEY → transactions", "Associated transaction"),
@@ -86,6 +92,7 @@ SCHEMAS = {
         "tables": {
             "warehouses": {
                 "description": "Warehouse/distribution center information",
+                "categorical": ["city", "state", "country"],
                 "columns": [
                     ("warehouse_id", "VARCHAR(36)", "PRIMARY KEY", "Unique warehouse identifier"),
                     ("warehouse_name", "VARCHAR(255)", "", "Warehouse name"),
@@ -99,6 +106,7 @@ SCHEMAS = {
             },
             "routes": {
                 "description": "Shipping routes between locations",
+                "categorical": ["destination_city", "destination_country", "transport_mode"],
                 "columns": [
                     ("route_id", "VARCHAR(36)", "PRIMARY KEY", "Unique route identifier"),
                     ("origin_warehouse_id", "VARCHAR(36)", "FOREIGN KEY → warehouses", "Starting warehouse"),
@@ -111,6 +119,8 @@ SCHEMAS = {
             },
             "shipments": {
                 "description": "Individual shipment records",
+                "cluster_by": ["ship_date"],
+                "categorical": ["priority"],
                 "columns": [
                     ("shipment_id", "VARCHAR(36)", "PRIMARY KEY", "Unique shipment identifier"),
                     ("route_id", "VARCHAR(36)", "FOREIGN KEY → routes", "Route used for shipment"),
@@ -126,6 +136,8 @@ SCHEMAS = {
             },
             "deliveries": {
                 "description": "Delivery completion records",
+                "cluster_by": ["shipment_id"],
+                "categorical": ["delivery_status"],
                 "columns": [
                     ("delivery_id", "VARCHAR(36)", "PRIMARY KEY", "Unique delivery identifier"),
                     ("shipment_id", "VARCHAR(36)", "FOREIGN KEY → shipments", "Associated shipment"),
@@ -149,6 +161,7 @@ SCHEMAS = {
         "tables": {
             "patients": {
                 "description": "Patient demographic information",
+                "categorical": ["gender", "blood_type", "insurance_provider"],
                 "columns": [
                     ("patient_id", "VARCHAR(36)", "PRIMARY KEY", "Unique patient identifier"),
                     ("first_name", "VARCHAR(100)", "", "Patient first name"),
@@ -165,6 +178,8 @@ SCHEMAS = {
             },
             "visits": {
                 "description": "Patient visit records",
+                "cluster_by": ["visit_date"],
+                "categorical": ["visit_type", "department"],
                 "columns": [
                     ("visit_id", "VARCHAR(36)", "PRIMARY KEY", "Unique visit identifier"),
                     ("patient_id", "VARCHAR(36)", "FOREIGN KEY → patients", "Patient who visited"),
@@ -179,6 +194,8 @@ SCHEMAS = {
             },
             "diagnoses": {
                 "description": "Diagnosis codes and descriptions",
+                "cluster_by": ["visit_id"],
+                "categorical": ["icd_code", "diagnosis_name", "severity"],
                 "columns": [
                     ("diagnosis_id", "VARCHAR(36)", "PRIMARY KEY", "Unique diagnosis identifier"),
                     ("visit_id", "VARCHAR(36)", "FOREIGN KEY → visits", "Associated visit"),
@@ -190,6 +207,8 @@ SCHEMAS = {
             },
             "prescriptions": {
                 "description": "Medication prescriptions",
+                "cluster_by": ["visit_id"],
+                "categorical": ["medication_name", "dosage", "frequency"],
                 "columns": [
                     ("prescription_id", "VARCHAR(36)", "PRIMARY KEY", "Unique prescription identifier"),
                     ("visit_id", "VARCHAR(36)", "FOREIGN KEY → visits", "Associated visit"),
@@ -214,6 +233,7 @@ SCHEMAS = {
         "tables": {
             "customers": {
                 "description": "Customer account information",
+                "categorical": ["city", "state", "country", "customer_segment"],
                 "columns": [
                     ("customer_id", "VARCHAR(36)", "PRIMARY KEY", "Unique customer identifier"),
                     ("first_name", "VARCHAR(100)", "", "Customer first name"),
@@ -230,6 +250,7 @@ SCHEMAS = {
             },
             "products": {
                 "description": "Product catalog",
+                "categorical": ["category", "subcategory", "brand"],
                 "columns": [
                     ("product_id", "VARCHAR(36)", "PRIMARY KEY", "Unique product identifier"),
                     ("product_name", "VARCHAR(255)", "", "Product name"),
@@ -244,6 +265,8 @@ SCHEMAS = {
             },
             "orders": {
                 "description": "Customer orders",
+                "cluster_by": ["order_date"],
+                "categorical": ["status", "shipping_method", "payment_method"],
                 "columns": [
                     ("order_id", "VARCHAR(36)", "PRIMARY KEY", "Unique order identifier"),
                     ("customer_id", "VARCHAR(36)", "FOREIGN KEY → customers", "Customer who placed order"),
@@ -259,6 +282,7 @@ SCHEMAS = {
             },
             "order_items": {
                 "description": "Individual items within orders",
+                "cluster_by": ["order_id"],
                 "columns": [
                     ("item_id", "VARCHAR(36)", "PRIMARY KEY", "Unique item identifier"),
                     ("order_id", "VARCHAR(36)", "FOREIGN KEY → orders", "Parent order"),
@@ -341,7 +365,97 @@ def generate_markdown_schema(schema_def: dict) -> str:
         lines.append(f"| {from_table} | {from_col} | {to_table} | {to_col} |")
     
     lines.append("")
-    
+
+    return "\n".join(lines)
+
+
+def table_load_order(schema_def: dict) -> list:
+    """Order tables so every parent is created and loaded before its children."""
+    parents = {table: set() for table in schema_def['tables']}
+    for from_table, _, to_table, _ in schema_def['relationships']:
+        if from_table != to_table:
+            parents[from_table].add(to_table)
+
+    order = []
+    while len(order) < len(parents):
+        ready = [t for t in parents if t not in order and parents[t] <= set(order)]
+        if not ready:
+            raise ValueError("Circular relationships in schema definition")
+        order.extend(ready)
+    return order
+
+
+def partition_column(table_def: dict) -> str:
+    """Date column of a fact table's Hive-style layout (<table>/date=YYYY-MM-DD/), or None.
+
+    This is the table's leading clustering key when it is a DATE or TIMESTAMP,
+    so files are split along the same column the table is clustered on.
+    """
+    cluster_by = table_def.get('cluster_by', [])
+    col_types = {col[0]: col[1] for col in table_def['columns']}
+    if cluster_by and col_types[cluster_by[0]].startswith(("DATE", "TIMESTAMP")):
+        return cluster_by[0]
+    return None
+
+
+def generate_ddl(schema_def: dict, database: str = None, schema: str = None,
+                 search_optimization: bool = False) -> str:
+    """Generate typed CREATE TABLE DDL with clustering and search-optimization hints.
+
+    Tables are emitted in load order. Fact tables are clustered on their
+    dominant date column (or on the parent key for child facts) so date-
+    filtered dashboard queries can prune micro-partitions. Key constraints
+    are declared RELY so the optimizer may use them for join elimination.
+    """
+    prefix = f"{database}.{schema}." if database and schema else ""
+    load_order = table_load_order(schema_def)
+
+    lines = [
+        f"-- {schema_def['name']} - table definitions",
+        f"-- Load order: {', '.join(load_order)}",
+        "",
+    ]
+    if database and schema:
+        lines.extend([f"USE DATABASE {database};", f"USE SCHEMA {schema};", ""])
+
+    for table_name in load_order:
+        table_def = schema_def['tables'][table_name]
+        col_types = {col[0]: col[1] for col in table_def['columns']}
+        body = []
+        for col_name, col_type, constraint, _ in table_def['columns']:
+            not_null = " NOT NULL" if constraint == "PRIMARY KEY" else ""
+            body.append(f"    {col_name.upper()} {col_type}{not_null}")
+        for col_name, _, constraint, _ in table_def['columns']:
+            if constraint == "PRIMARY KEY":
+                body.append(f"    CONSTRAINT PK_{table_name.upper()} PRIMARY KEY ({col_name.upper()}) RELY")
+        for from_table, from_col, to_table, to_col in schema_def['relationships']:
+            if from_table == table_name:
+                body.append(
+                    f"    CONSTRAINT FK_{table_name.upper()}_{from_col.upper()} FOREIGN KEY ({from_col.upper()}) "
+                    f"REFERENCES {prefix}{to_table.upper()}({to_col.upper()}) RELY"
+                )
+
+        cluster_keys = [
+            f"TO_DATE({col.upper()})" if col_types[col] == "TIMESTAMP" else col.upper()
+            for col in table_def.get('cluster_by', [])
+        ]
+        lines.append(f"CREATE OR REPLACE TABLE {prefix}{table_name.upper()} (")
+        lines.append(",\n".join(body))
+        lines.append(")")
+        if cluster_keys:
+            lines.append(f"CLUSTER BY ({', '.join(cluster_keys)})")
+        comment = table_def['description'].replace("'", "''")
+        lines.append(f"COMMENT = '{comment}';")
+        lines.append("")
+
+        if search_optimization:
+            # Point lookups by ID (drill-down, FK resolution) skip full scans
+            id_cols = [col[0].upper() for col in table_def['columns'] if col[2]]
+            lines.append(
+                f"ALTER TABLE {prefix}{table_name.upper()} ADD SEARCH OPTIMIZATION ON EQUALITY({', '.join(id_cols)});"
+            )
+            lines.append("")
+
     return "\n".join(lines)
 
 
@@ -383,10 +497,20 @@ def main():
     # Also save schema definition as JSON for other scripts
     schema_json = output_dir / "schema.json"
     with open(schema_json, 'w') as f:
-        json.dump(schema_def, f, indent=2)
-    
+        json.dump({**schema_def, "load_order": table_load_order(schema_def)}, f, indent=2)
+
+    # Typed DDL with clustering keys, created in load order
+    sf_config = config.get("snowflake", {})
+    database = sf_config.get("database") or config.get("database", "DEMO_DB")
+    schema = sf_config.get("schema") or config.get("schema", "PUBLIC")
+    ddl = generate_ddl(schema_def, database, schema, config.get("search_optimization", False))
+    schema_sql = output_dir / "schema.sql"
+    with open(schema_sql, 'w') as f:
+        f.write(ddl)
+
     print(f"Schema documentation written to: {schema_file}")
     print(f"Schema definition written to: {schema_json}")
+    print(f"Table DDL written to: {schema_sql}")
     print("")
     print(markdown)
 
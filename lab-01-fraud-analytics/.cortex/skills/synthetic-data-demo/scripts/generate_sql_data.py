@@ -0,0 +1,748 @@
+#!/usr/bin/env python3
+"""
+generate_sql_data.py - Compile dataset definitions into in-warehouse SQL generators.
+
+Instead of generating CSVs locally and uploading them, this script turns a
+SCHEMAS entry plus the distribution settings below into
+INSERT ... SELECT FROM TABLE(GENERATOR(ROWCOUNT => n)) statements, so the data
+is produced by the warehouse itself at any scale.
+
+Randomness follows the bounded HASH/MOD pattern from
+scripts/generate_sample_data.sql. Keys are derived from (table, row number),
+which lets child tables compute valid foreign keys without joining their
+parents.
+
+Usage:
+    uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/generate_sql_data.py \
+        --config /tmp/synthetic_data_config.json \
+        --output-dir ./output
+
+    # Emit DuckDB SQL instead and run it in-memory to check the result locally
+    uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/generate_sql_data.py \
+        --config /tmp/synthetic_data_config.json \
+        --output-dir ./output \
+        --dialect duckdb --run-duckdb
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime
+from pathlib import Path
+
+from generate_schema import SCHEMAS, generate_ddl, table_load_order
+
+# =============================================================================
+# VALUE POOLS
+# Faker is not available inside the warehouse, so free-text columns are drawn
+# from bounded pools instead.
+# =============================================================================
+POOLS = {
+    "first_names": [
+        "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth",
+        "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+        "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Sandra", "Mark", "Ashley", "Steven", "Emily",
+    ],
+    "last_names": [
+        "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+        "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+        "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    ],
+    "cities": [
+        "New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Philadelphia", "San Antonio", "San Diego",
+        "Dallas", "San Jose", "Austin", "Jacksonville", "Columbus", "Charlotte", "Seattle", "Denver",
+        "Boston", "Nashville", "Portland", "Miami", "Atlanta", "Las Vegas", "Detroit", "Minneapolis",
+    ],
+    "states": [
+        "NY", "CA", "IL", "TX", "AZ", "PA", "FL", "OH", "NC", "WA", "CO", "MA", "TN", "OR", "GA", "NV", "MI", "MN",
+    ],
+    "countries": [
+        "United States", "Canada", "Mexico", "United Kingdom", "France", "Germany", "Spain", "Italy",
+        "Brazil", "Colombia", "Japan", "Australia", "India", "Singapore",
+    ],
+    "streets": ["Oak", "Maple", "Pine", "Cedar", "Elm", "Main", "Park", "Lake", "Hill", "Washington"],
+    "street_suffixes": ["Street", "Avenue", "Drive", "Boulevard", "Lane", "Road"],
+    "company_prefixes": [
+        "Quick", "Express", "Prime", "Super", "Mega", "Ultra", "Best", "First", "Top", "Royal",
+        "Golden", "Silver", "Blue", "Smart", "Elite", "Value",
+    ],
+    "company_suffixes": [
+        "Mart", "Shop", "Store", "Depot", "Hub", "Center", "Group", "Holdings", "Partners", "Solutions",
+    ],
+    "words": ["Nova", "Apex", "Vertex", "Pulse", "Echo", "Orbit", "Summit", "Zen", "Core", "Flex"],
+    "complaints": [
+        "Persistent cough and mild fever", "Lower back pain after lifting", "Follow up on blood pressure",
+        "Headache and dizziness for two days", "Routine annual physical exam", "Skin rash on both arms",
+        "Shortness of breath when exercising", "Knee pain while walking",
+    ],
+    "delivery_notes": [
+        "Package left at wrong address", "Recipient refused delivery", "Box crushed during transit",
+        "Item damaged by water exposure", "Customer requested return", "Address could not be located",
+    ],
+    "letters": list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
+}
+
+# =============================================================================
+# DISTRIBUTION SETTINGS
+# Row counts mirror generate_data.py:
+#   ("ratio", divisor, minimum)        max(minimum, num_records // divisor)
+#   ("records",)                       num_records
+#   ("per_parent", parent, min, max)   min..max rows for every parent row
+#   ("fraction", parent, pct)          one row for pct% of parent rows
+#
+# Column specs are nested tuples compiled by compile_spec(). Columns starting
+# with "_" are helper values that are not written to the table.
+# =============================================================================
+_NAME = ("sql", "{f} || ' ' || {l}", {"f": ("pool", "first_names"), "l": ("pool", "last_names")})
+_EMAIL = ("sql", "LOWER({f} || '.' || {l} || CAST({rn} AS VARCHAR) || '@example.com')",
+          {"f": ("pool", "first_names"), "l": ("pool", "last_names"), "rn": ("rn",)})
+_PERSON_EMAIL = ("sql", "LOWER({f} || '.' || {l} || CAST({rn} AS VARCHAR) || '@example.com')",
+                 {"f": ("col", "first_name"), "l": ("col", "last_name"), "rn": ("rn",)})
+_PHONE = ("sql", "'+1-' || CAST({a} AS VARCHAR) || '-' || CAST({b} AS VARCHAR) || '-' || CAST({c} AS VARCHAR)",
+          {"a": ("int", 200, 999), "b": ("int", 200, 999), "c": ("int", 1000, 9999)})
+_ADDRESS = ("sql", "CAST({n} AS VARCHAR) || ' ' || {s} || ' ' || {t}",
+            {"n": ("int", 100, 9999), "s": ("pool", "streets"), "t": ("pool", "street_suffixes")})
+
+DISTRIBUTIONS = {
+    "financial_fraud": {
+        "customers": {
+            "rows": ("ratio", 10, 100),
+            "columns": {
+                "customer_id": ("key",),
+                "first_name": ("pool", "first_names"),
+                "last_name": ("pool", "last_names"),
+                "email": _PERSON_EMAIL,
+                "phone": _PHONE,
+                "address": _ADDRESS,
+                "city": ("pool", "cities"),
+                "state": ("pool", "states"),
+                "country": ("pool", "countries"),
+                "account_created": ("timestamp", 3 * 365, 30),
+                "credit_score": ("int", 300, 850),
+            },
+        },
+        "merchants": {
+            "rows": ("ratio", 50, 50),
+            "columns": {
+                "merchant_id": ("key",),
+                "merchant_name": ("sql", "{p} || ' ' || {s}",
+                                  {"p": ("pool", "company_prefixes"), "s": ("pool", "company_suffixes")}),
+                "category": ("choice", ["retail", "food_dining", "travel", "entertainment",
+                                        "utilities", "healthcare", "gas_station", "online_shopping"]),
+                "city": ("pool", "cities"),
+                "country": ("pool", "countries"),
+                "risk_score": ("decimal", 0, 1, 2),
+            },
+        },
+        "transactions": {
+            "rows": ("records",),
+            "columns": {
+                "transaction_id": ("key",),
+                "customer_id": ("fk", "customers"),
+                "merchant_id": ("fk", "merchants"),
+                "_is_fraud": ("bernoulli", 3.0),  # 3% fraud rate
+                # Fraudulent transactions tend to be larger
+                "amount": ("sql", "CASE WHEN {f} THEN {hi} ELSE {lo} END",
+                           {"f": ("col", "_is_fraud"), "hi": ("decimal", 500, 5000, 2), "lo": ("decimal", 5, 500, 2)}),
+                "currency": ("const", "USD"),
+                "transaction_date": ("timestamp", 365, 0),
+                "transaction_type": ("choice", ["purchase", "refund", "transfer"]),
+                "channel": ("choice", ["online", "in_store", "mobile", "atm"]),
+                "device_type": ("choice", ["desktop", "mobile", "tablet", "pos"]),
+                "ip_address": ("sometimes", 70, ("sql", "CAST({a} AS VARCHAR) || '.' || CAST({b} AS VARCHAR) || '.' || CAST({c} AS VARCHAR) || '.' || CAST({d} AS VARCHAR)",
+                                                 {"a": ("int", 1, 223), "b": ("int", 0, 255), "c": ("int", 0, 255), "d": ("int", 1, 254)})),
+                "location_lat": ("decimal", -90, 90, 8),
+                "location_lon": ("decimal", -180, 180, 8),
+            },
+        },
+        "fraud_labels": {
+            "rows": ("per_parent", "transactions", 1, 1),
+            "columns": {
+                "label_id": ("key",),
+                "transaction_id": ("parent",),
+                "is_fraud": ("ref", "transaction_id", "_is_fraud"),
+                "fraud_type": ("sql", "CASE WHEN {f} THEN {t} END",
+                               {"f": ("col", "is_fraud"),
+                                "t": ("choice", ["card_theft", "account_takeover", "identity_fraud", "friendly_fraud"])}),
+                "confidence_score": ("sql", "CASE WHEN {f} THEN {hi} ELSE {lo} END",
+                                     {"f": ("col", "is_fraud"), "hi": ("decimal", 0.7, 0.99, 2), "lo": ("decimal", 0.01, 0.3, 2)}),
+                "flagged_date": ("sql", "CASE WHEN {f} THEN {d} END",
+                                 {"f": ("col", "is_fraud"),
+                                  "d": ("offset", ("ref", "transaction_id", "transaction_date"), "hour", ("int", 1, 72))}),
+            },
+        },
+    },
+    "logistics": {
+        "warehouses": {
+            "rows": ("ratio", 500, 10),
+            "columns": {
+                "warehouse_id": ("key",),
+                "warehouse_name": ("sql", "{c} || ' Distribution Center'", {"c": ("pool", "cities")}),
+                "address": _ADDRESS,
+                "city": ("pool", "cities"),
+                "state": ("pool", "states"),
+                "country": ("const", "USA"),
+                "capacity_sqft": ("int", 50000, 500000),
+                "manager_name": _NAME,
+            },
+        },
+        "routes": {
+            "rows": ("ratio", 100, 50),
+            "columns": {
+                "route_id": ("key",),
+                "origin_warehouse_id": ("fk", "warehouses"),
+                "destination_city": ("pool", "cities"),
+                "destination_country": ("pool", "countries"),
+                "distance_miles": ("decimal", 50, 3000, 2),
+                "estimated_days": ("int", 1, 14),
+                "transport_mode": ("choice", ["ground", "air", "sea", "rail"]),
+            },
+        },
+        "shipments": {
+            "rows": ("records",),
+            "columns": {
+                "shipment_id": ("key",),
+                "route_id": ("fk", "routes"),
+                "customer_name": _NAME,
+                "customer_email": _EMAIL,
+                "ship_date": ("timestamp", 180, 0),
+                "expected_delivery": ("offset", ("col", "ship_date"), "day",
+                                      ("sql", "GREATEST(1, {d} + {j})",
+                                       {"d": ("ref", "route_id", "estimated_days"), "j": ("int", -1, 2)})),
+                "weight_lbs": ("decimal", 0.5, 100, 2),
+                "dimensions": ("sql", "CAST({l} AS VARCHAR) || 'x' || CAST({w} AS VARCHAR) || 'x' || CAST({h} AS VARCHAR)",
+                               {"l": ("int", 5, 30), "w": ("int", 5, 30), "h": ("int", 5, 30)}),
+                "shipping_cost": ("decimal", 5, 200, 2),
+                "priority": ("choice", ["standard", "express", "overnight"]),
+            },
+        },
+        "deliveries": {
+            "rows": ("per_parent", "shipments", 1, 1),
+            "columns": {
+                "delivery_id": ("key",),
+                "shipment_id": ("parent",),
+                # 95% delivered, 3% returned, 1% lost, 1% damaged
+                "delivery_status": ("choice", ["delivered", "returned", "lost", "damaged"], [95, 3, 1, 1]),
+                "actual_delivery": ("sql", "CASE {s} WHEN 'lost' THEN NULL WHEN 'delivered' THEN {on_time} "
+                                           "WHEN 'returned' THEN {returned} ELSE {damaged} END",
+                                    {"s": ("col", "delivery_status"),
+                                     "on_time": ("offset", ("ref", "shipment_id", "expected_delivery"), "day", ("int", -2, 3)),
+                                     "returned": ("offset", ("ref", "shipment_id", "expected_delivery"), "day", ("int", 5, 15)),
+                                     "damaged": ("offset", ("ref", "shipment_id", "expected_delivery"), "day", ("int", 0, 5))}),
+                "recipient_name": ("sql", "CASE WHEN {s} = 'delivered' THEN {n} END",
+                                   {"s": ("col", "delivery_status"), "n": _NAME}),
+                "signature_captured": ("sql", "({s} = 'delivered' AND {r} < 80)",
+                                       {"s": ("col", "delivery_status"), "r": ("int", 0, 99)}),
+                "delivery_notes": ("sql", "CASE WHEN {s} IN ('returned', 'damaged') THEN {n} END",
+                                   {"s": ("col", "delivery_status"), "n": ("pool", "delivery_notes")}),
+            },
+        },
+    },
+    "healthcare": {
+        "patients": {
+            "rows": ("ratio", 5, 100),
+            "columns": {
+                "patient_id": ("key",),
+                "first_name": ("pool", "first_names"),
+                "last_name": ("pool", "last_names"),
+                "date_of_birth": ("date", 90 * 365, 365),
+                "gender": ("choice", ["Male", "Female", "Other"]),
+                "blood_type": ("choice", ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]),
+                "phone": _PHONE,
+                "email": _PERSON_EMAIL,
+                "address": ("sql", "{a} || ', ' || {c} || ', ' || {s}",
+                            {"a": _ADDRESS, "c": ("pool", "cities"), "s": ("pool", "states")}),
+                "insurance_provider": ("choice", ["BlueCross", "Aetna", "UnitedHealth", "Cigna", "Humana", "Kaiser"]),
+                "insurance_id": ("sql", "{a} || {b} || {c} || LPAD(CAST({n} AS VARCHAR), 8, '0')",
+                                 {"a": ("pool", "letters"), "b": ("pool", "letters"), "c": ("pool", "letters"),
+                                  "n": ("int", 0, 99999999)}),
+            },
+        },
+        "visits": {
+            "rows": ("records",),
+            "columns": {
+                "visit_id": ("key",),
+                "patient_id": ("fk", "patients"),
+                "visit_date": ("timestamp", 365, 0),
+                "visit_type": ("choice", ["routine", "emergency", "follow_up", "specialist"]),
+                "department": ("choice", ["Primary Care", "Emergency", "Cardiology", "Orthopedics",
+                                          "Dermatology", "Pediatrics"]),
+                "provider_name": ("sql", "'Dr. ' || {l}", {"l": ("pool", "last_names")}),
+                "chief_complaint": ("pool", "complaints"),
+                "visit_duration_min": ("int", 10, 90),
+                "copay_amount": ("choice", [0, 20, 25, 30, 50, 75]),
+            },
+        },
+        "diagnoses": {
+            # 1-3 diagnoses per visit
+            "rows": ("per_parent", "visits", 1, 3),
+            "columns": {
+                "diagnosis_id": ("key",),
+                "visit_id": ("parent",),
+                "_diagnosis": ("int", 0, 7),
+                "icd_code": ("index", "_diagnosis", ["J06.9", "M54.5", "I10", "E11.9", "J45.909", "F32.9",
+                                                     "K21.0", "M79.3"]),
+                "diagnosis_name": ("index", "_diagnosis", [
+                    "Acute upper respiratory infection", "Low back pain", "Essential hypertension",
+                    "Type 2 diabetes mellitus", "Unspecified asthma", "Major depressive disorder",
+                    "Gastroesophageal reflux disease", "Panniculitis, unspecified",
+                ]),
+                "severity": ("choice", ["mild", "moderate", "severe"]),
+                "is_primary": ("sql", "({k} = 0)", {"k": ("k",)}),
+            },
+        },
+        "prescriptions": {
+            # 60% chance of prescription
+            "rows": ("fraction", "visits", 60),
+            "columns": {
+                "prescription_id": ("key",),
+                "visit_id": ("parent",),
+                "medication_name": ("choice", ["Lisinopril", "Metformin", "Omeprazole", "Amoxicillin",
+                                               "Ibuprofen", "Atorvastatin", "Albuterol", "Sertraline"]),
+                "dosage": ("sql", "CAST({d} AS VARCHAR) || 'mg'", {"d": ("choice", [5, 10, 20, 50, 100, 250, 500])}),
+                "frequency": ("choice", ["Once daily", "Twice daily", "Three times daily", "As needed"]),
+                "duration_days": ("choice", [7, 14, 30, 60, 90]),
+                "refills_allowed": ("int", 0, 5),
+                "prescribed_date": ("sql", "CAST({d} AS DATE)", {"d": ("ref", "visit_id", "visit_date")}),
+            },
+        },
+    },
+    "ecommerce": {
+        "customers": {
+            "rows": ("ratio", 5, 100),
+            "columns": {
+                "customer_id": ("key",),
+                "first_name": ("pool", "first_names"),
+                "last_name": ("pool", "last_names"),
+                "email": _PERSON_EMAIL,
+                "phone": _PHONE,
+                "address": _ADDRESS,
+                "city": ("pool", "cities"),
+                "state": ("pool", "states"),
+                "country": ("pool", "countries"),
+                "registration_date": ("timestamp", 2 * 365, 30),
+                "customer_segment": ("choice", ["new", "returning", "vip"]),
+            },
+        },
+        "products": {
+            "rows": ("ratio", 20, 50),
+            "columns": {
+                "product_id": ("key",),
+                "_category": ("int", 0, 3),
+                "category": ("index", "_category", ["Electronics", "Clothing", "Home", "Sports"]),
+                "subcategory": ("sql", "CASE {c} WHEN 0 THEN {e} WHEN 1 THEN {cl} WHEN 2 THEN {h} ELSE {s} END",
+                                {"c": ("col", "_category"),
+                                 "e": ("choice", ["Smartphones", "Laptops", "Headphones", "Cameras"]),
+                                 "cl": ("choice", ["Shirts", "Pants", "Dresses", "Shoes"]),
+                                 "h": ("choice", ["Furniture", "Decor", "Kitchen", "Bedding"]),
+                                 "s": ("choice", ["Fitness", "Outdoor", "Team Sports", "Water Sports"])}),
+                "product_name": ("sql", "{w} || ' ' || {s} || ' ' || CAST({n} AS VARCHAR)",
+                                 {"w": ("pool", "words"), "s": ("col", "subcategory"), "n": ("int", 100, 999)}),
+                "brand": ("choice", ["TechPro", "StyleCo", "HomeEssentials", "SportMax", "ValueBrand", "PremiumLine"]),
+                "price": ("decimal", 10, 500, 2),
+                "cost": ("sql", "ROUND({p} * {r}, 2)", {"p": ("col", "price"), "r": ("decimal", 0.4, 0.7, 2)}),
+                "stock_quantity": ("int", 0, 500),
+                "rating": ("decimal", 2.5, 5.0, 1),
+            },
+        },
+        "orders": {
+            "rows": ("records",),
+            "columns": {
+                "order_id": ("key",),
+                "customer_id": ("fk", "customers"),
+                "order_date": ("timestamp", 365, 0),
+                "status": ("choice", ["pending", "shipped", "delivered", "cancelled"], [10, 20, 65, 5]),
+                "shipping_method": ("choice", ["standard", "express", "overnight", "pickup"]),
+                "_subtotal": ("rollup", "order_items", "line_total"),
+                "shipping_cost": ("decimal", 0, 25, 2),
+                "tax_amount": ("sql", "ROUND({s} * 0.08, 2)", {"s": ("col", "_subtotal")}),
+                "discount_amount": ("sql", "CASE WHEN {r} < 30 THEN ROUND({s} * {p}, 2) ELSE 0 END",
+                                    {"r": ("int", 0, 99), "s": ("col", "_subtotal"), "p": ("decimal", 0, 0.2, 2)}),
+                "total_amount": ("sql", "ROUND({s} + {sh} + {t} - {d}, 2)",
+                                 {"s": ("col", "_subtotal"), "sh": ("col", "shipping_cost"),
+                                  "t": ("col", "tax_amount"), "d": ("col", "discount_amount")}),
+                "payment_method": ("choice", ["credit_card", "debit_card", "paypal", "apple_pay", "google_pay"]),
+            },
+        },
+        "order_items": {
+            # 1-5 distinct products per order
+            "rows": ("per_parent", "orders", 1, 5),
+            "columns": {
+                "item_id": ("key",),
+                "order_id": ("parent",),
+                "product_id": ("fk", "products", "distinct"),
+                "quantity": ("int", 1, 3),
+                "unit_price": ("ref", "product_id", "price"),
+                "line_total": ("sql", "ROUND({p} * {q}, 2)", {"p": ("col", "unit_price"), "q": ("col", "quantity")}),
+            },
+        },
+    },
+}
+
+
+# =============================================================================
+# DIALECTS
+# =============================================================================
+class SnowflakeDialect:
+    """SQL fragments for Snowflake."""
+
+    name = "snowflake"
+
+    def row_source(self, n: int) -> str:
+        # SEQ8() may contain gaps, ROW_NUMBER() gives dense 0..n-1 row numbers
+        return f"(SELECT ROW_NUMBER() OVER (ORDER BY SEQ8()) - 1 AS rn FROM TABLE(GENERATOR(ROWCOUNT => {n})))"
+
+    def bucket(self, rn: str, salt: str, m: int) -> str:
+        return f"ABS(MOD(HASH(CAST({rn} AS BIGINT), '{salt}'), {m}))"
+
+    def mod(self, a: str, m: int) -> str:
+        return f"MOD({a}, {m})"
+
+    def add(self, unit: str, amount: str, base: str) -> str:
+        return f"DATEADD({unit.upper()}, {amount}, {base})"
+
+    def table_name(self, database: str, schema: str, table: str) -> str:
+        return f"{database}.{schema}.{table.upper()}"
+
+
+class DuckDBDialect(SnowflakeDialect):
+    """SQL fragments for DuckDB, used to test generated SQL locally."""
+
+    name = "duckdb"
+
+    def row_source(self, n: int) -> str:
+        return f"(SELECT range AS rn FROM range({n}))"
+
+    def bucket(self, rn: str, salt: str, m: int) -> str:
+        return f"CAST(hash(CAST({rn} AS BIGINT), '{salt}') % {m} AS BIGINT)"
+
+    def mod(self, a: str, m: int) -> str:
+        return f"({a} % {m})"
+
+    def add(self, unit: str, amount: str, base: str) -> str:
+        return f"({base} + to_{unit}s(CAST({amount} AS BIGINT)))"
+
+    def table_name(self, database: str, schema: str, table: str) -> str:
+        return table.upper()
+
+
+DIALECTS = {
+    "snowflake": SnowflakeDialect(),
+    "duckdb": DuckDBDialect(),
+}
+
+
+# =============================================================================
+# COMPILER
+# =============================================================================
+def table_row_counts(dataset_type: str, num_records: int) -> dict:
+    """Number of generated rows per table (upper bound for per_parent/fraction tables)."""
+    counts = {}
+    for table, dist in DISTRIBUTIONS[dataset_type].items():
+        rule = dist["rows"]
+        if rule[0] == "ratio":
+            counts[table] = max(rule[2], num_records // rule[1])
+        elif rule[0] == "records":
+            counts[table] = num_records
+        elif rule[0] == "per_parent":
+            counts[table] = counts[rule[1]] * rule[3]
+        elif rule[0] == "fraction":
+            counts[table] = counts[rule[1]]
+    return counts
+
+
+def sql_literal(value) -> str:
+    """Render a Python value as a SQL literal."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class _Context:
+    """Row context a column expression is compiled in."""
+
+    def __init__(self, compiler, table: str, rn: str):
+        self.compiler = compiler
+        self.table = table
+        self.rn = rn
+        rule = DISTRIBUTIONS[compiler.dataset_type][table]["rows"]
+        self.parent = None
+        self.parent_rn = None
+        self.k = None
+        if rule[0] == "per_parent":
+            self.parent = rule[1]
+            if rule[3] == 1:
+                self.parent_rn, self.k = rn, "0"
+            else:
+                self.parent_rn = f"CAST(FLOOR({rn} / {rule[3]}) AS BIGINT)"
+                self.k = compiler.dialect.mod(rn, rule[3])
+        elif rule[0] == "fraction":
+            self.parent, self.parent_rn = rule[1], rn
+
+
+class DatasetCompiler:
+    """Compile one dataset type into INSERT ... SELECT statements."""
+
+    def __init__(self, dataset_type: str, num_records: int, dialect, seed: int,
+                 database: str = "DEMO_DB", schema: str = "PUBLIC", anchor: datetime = None):
+        self.dataset_type = dataset_type
+        self.dialect = dialect
+        self.seed = seed
+        self.database = database
+        self.schema = schema
+        self.counts = table_row_counts(dataset_type, num_records)
+        anchor = (anchor or datetime.now()).replace(microsecond=0)
+        self.anchor = f"CAST('{anchor.isoformat(sep=' ')}' AS TIMESTAMP)"
+        self._rollups = None
+
+    def salt(self, table: str, column: str) -> str:
+        return f"{self.seed}:{table}.{column}"
+
+    def key(self, table: str, rn: str) -> str:
+        """Deterministic UUID-formatted key for row `rn` of `table`."""
+        h = f"MD5('{self.seed}:{table}:' || CAST(CAST({rn} AS BIGINT) AS VARCHAR))"
+        parts = [(1, 8), (9, 4), (13, 4), (17, 4), (21, 12)]
+        return " || '-' || ".join(f"SUBSTR({h}, {start}, {length})" for start, length in parts)
+
+    def column(self, ctx: _Context, name: str) -> str:
+        spec = DISTRIBUTIONS[self.dataset_type][ctx.table]["columns"][name]
+        return self.compile_spec(spec, ctx, self.salt(ctx.table, name))
+
+    def referenced_row(self, ctx: _Context, fk_column: str):
+        """Return (table, row number SQL) of the row a foreign key column points to."""
+        spec = DISTRIBUTIONS[self.dataset_type][ctx.table]["columns"][fk_column]
+        salt = self.salt(ctx.table, fk_column)
+        if spec[0] == "parent":
+            return ctx.parent, ctx.parent_rn
+        if spec[0] == "fk":
+            parent = spec[1]
+            if DISTRIBUTIONS[self.dataset_type][parent]["rows"][0] in ("per_parent", "fraction"):
+                raise ValueError(f"{ctx.table}.{fk_column}: foreign keys must point at a dense table")
+            n = self.counts[parent]
+            if len(spec) > 2 and spec[2] == "distinct":
+                # Consecutive rows from a per-parent start keep siblings distinct
+                start = self.dialect.bucket(ctx.parent_rn, salt, n)
+                return parent, self.dialect.mod(f"({start} + {ctx.k})", n)
+            return parent, self.dialect.bucket(ctx.rn, salt, n)
+        raise ValueError(f"{ctx.table}.{fk_column} is not a foreign key")
+
+    def compile_spec(self, spec: tuple, ctx: _Context, salt: str) -> str:
+        kind = spec[0]
+        d = self.dialect
+        if kind == "key":
+            return self.key(ctx.table, ctx.rn)
+        if kind in ("fk", "parent"):
+            column = salt.rsplit(".", 1)[1]
+            table, rn = self.referenced_row(ctx, column)
+            return self.key(table, rn)
+        if kind == "ref":
+            table, rn = self.referenced_row(ctx, spec[1])
+            return self.column(_Context(self, table, rn), spec[2])
+        if kind == "col":
+            return f"({self.column(ctx, spec[1])})"
+        if kind == "rn":
+            return ctx.rn
+        if kind == "k":
+            return ctx.k
+        if kind == "const":
+            return sql_literal(spec[1])
+        if kind == "null":
+            return "NULL"
+        if kind == "int":
+            lo, hi = spec[1], spec[2]
+            return f"({lo} + {d.bucket(ctx.rn, salt, hi - lo + 1)})"
+        if kind == "decimal":
+            lo, hi, scale = spec[1], spec[2], spec[3]
+            factor = 10 ** scale
+            span = int(round((hi - lo) * factor)) + 1
+            return f"ROUND({lo} + {d.bucket(ctx.rn, salt, span)} / {factor}.0, {scale})"
+        if kind == "bernoulli":
+            return f"({d.bucket(ctx.rn, salt, 10000)} < {int(round(spec[1] * 100))})"
+        if kind == "sometimes":
+            inner = self.compile_spec(spec[2], ctx, salt + "/v")
+            return f"CASE WHEN {d.bucket(ctx.rn, salt, 100)} < {spec[1]} THEN {inner} END"
+        if kind in ("choice", "pool"):
+            values = spec[1] if kind == "choice" else POOLS[spec[1]]
+            weights = spec[2] if len(spec) > 2 else None
+            if not weights:
+                b = d.bucket(ctx.rn, salt, len(values))
+                whens = " ".join(f"WHEN {i} THEN {sql_literal(v)}" for i, v in enumerate(values[:-1]))
+                return f"CASE {b} {whens} ELSE {sql_literal(values[-1])} END"
+            total = sum(weights)
+            b = d.bucket(ctx.rn, salt, total)
+            whens, cumulative = [], 0
+            for value, weight in zip(values[:-1], weights[:-1]):
+                cumulative += weight
+                whens.append(f"WHEN {b} < {cumulative} THEN {sql_literal(value)}")
+            return f"CASE {' '.join(whens)} ELSE {sql_literal(values[-1])} END"
+        if kind == "index":
+            index = self.column(ctx, spec[1])
+            whens = " ".join(f"WHEN {i} THEN {sql_literal(v)}" for i, v in enumerate(spec[2][:-1]))
+            return f"CASE {index} {whens} ELSE {sql_literal(spec[2][-1])} END"
+        if kind == "timestamp":
+            start_days, end_days = spec[1], spec[2]
+            span = (start_days - end_days) * 86400
+            return d.add("second", f"-({end_days * 86400} + {d.bucket(ctx.rn, salt, span)})", self.anchor)
+        if kind == "date":
+            return f"CAST({self.compile_spec(('timestamp', spec[1], spec[2]), ctx, salt)} AS DATE)"
+        if kind == "offset":
+            base = self.compile_spec(spec[1], ctx, salt + "/base")
+            amount = self.compile_spec(spec[3], ctx, salt + "/amount")
+            return d.add(spec[2], amount, base)
+        if kind == "sql":
+            bound = {name: self.compile_spec(sub, ctx, f"{salt}/{name}") for name, sub in spec[2].items()}
+            return "(" + spec[1].format(**bound) + ")"
+        if kind == "rollup":
+            return self.rollup(ctx, spec[1], spec[2])
+        raise ValueError(f"Unknown column spec: {spec!r}")
+
+    def rollup(self, ctx: _Context, child: str, column: str) -> str:
+        """Sum a child column per parent row through a joined aggregate subquery."""
+        key = (child, column)
+        if key not in self._rollups:
+            alias = f"r{len(self._rollups)}"
+            child_ctx = _Context(self, child, "g.rn")
+            value = self.column(child_ctx, column)
+            source, where = self.row_source(child)
+            self._rollups[key] = (alias, (
+                f"LEFT JOIN (SELECT {child_ctx.parent_rn} AS prn, SUM({value}) AS val "
+                f"FROM {source} g{where} GROUP BY 1) {alias} ON {alias}.prn = g.rn"
+            ))
+        return f"COALESCE({self._rollups[key][0]}.val, 0)"
+
+    def row_source(self, table: str):
+        """Return (FROM source, WHERE clause) producing row numbers for `table`."""
+        rule = DISTRIBUTIONS[self.dataset_type][table]["rows"]
+        source = self.dialect.row_source(self.counts[table])
+        ctx = _Context(self, table, "g.rn")
+        salt = self.salt(table, "#rows")
+        where = ""
+        if rule[0] == "per_parent" and rule[2] != rule[3]:
+            per_parent = f"{rule[2]} + {self.dialect.bucket(ctx.parent_rn, salt, rule[3] - rule[2] + 1)}"
+            where = f" WHERE {ctx.k} < {per_parent}"
+        elif rule[0] == "fraction":
+            where = f" WHERE {self.dialect.bucket('g.rn', salt, 100)} < {rule[2]}"
+        return source, where
+
+    def compile_table(self, table: str) -> str:
+        """Compile one INSERT ... SELECT statement."""
+        self._rollups = {}
+        ctx = _Context(self, table, "g.rn")
+        columns = [col[0] for col in SCHEMAS[self.dataset_type]["tables"][table]["columns"]]
+        selects = [f"    {self.column(ctx, col)} AS {col.upper()}" for col in columns]
+        source, where = self.row_source(table)
+        lines = [
+            f"INSERT INTO {self.dialect.table_name(self.database, self.schema, table)}",
+            f"({', '.join(col.upper() for col in columns)})",
+            "SELECT",
+            ",\n".join(selects),
+            f"FROM {source} g",
+        ]
+        lines.extend(join for _, join in self._rollups.values())
+        if where:
+            lines.append(where.strip())
+        cluster_by = SCHEMAS[self.dataset_type]["tables"][table].get("cluster_by")
+        if cluster_by:
+            # Insert in clustering-key order so micro-partitions start out well clustered
+            lines.append(f"ORDER BY {', '.join(col.upper() for col in cluster_by)}")
+        return "\n".join(lines) + ";"
+
+    def compile(self) -> str:
+        """Compile the full script: table creation followed by one INSERT per table."""
+        schema_def = SCHEMAS[self.dataset_type]
+        lines = [
+            f"-- {schema_def['name']} - in-warehouse data generation",
+            f"-- Dialect: {self.dialect.name}, seed: {self.seed}",
+            "",
+        ]
+        if self.dialect.name == "snowflake":
+            lines.append(generate_ddl(schema_def, self.database, self.schema))
+        else:
+            for table in table_load_order(schema_def):
+                name = self.dialect.table_name(self.database, self.schema, table)
+                columns = schema_def["tables"][table]["columns"]
+                cols = ",\n".join(f"    {col[0].upper()} {col[1]}" for col in columns)
+                lines.extend([f"CREATE TABLE IF NOT EXISTS {name} (\n{cols}\n);", ""])
+        for table in table_load_order(schema_def):
+            lines.extend([
+                f"-- {table}: ~{self.counts[table]:,} rows",
+                self.compile_table(table),
+                "",
+            ])
+        return "\n".join(lines)
+
+
+def compile_dataset_sql(dataset_type: str, num_records: int, dialect: str = "snowflake", seed: int = None,
+                        database: str = "DEMO_DB", schema: str = "PUBLIC") -> str:
+    """Compile a SCHEMAS entry and its distribution settings into a SQL generator script."""
+    if seed is None:
+        seed = random.randint(0, 2**31 - 1)
+    compiler = DatasetCompiler(dataset_type, num_records, DIALECTS[dialect], seed, database, schema)
+    return compiler.compile()
+
+
+def run_duckdb(sql: str, dataset_type: str):
+    """Execute DuckDB SQL in-memory and print row counts and orphaned foreign keys."""
+    import duckdb
+
+    con = duckdb.connect()
+    con.execute(sql)
+    print("Row counts:")
+    for table in SCHEMAS[dataset_type]["tables"]:
+        count = con.execute(f"SELECT COUNT(*) FROM {table.upper()}").fetchone()[0]
+        print(f"  {table}: {count}")
+    print("Orphaned foreign keys:")
+    for from_table, from_col, to_table, to_col in SCHEMAS[dataset_type]["relationships"]:
+        orphans = con.execute(
+            f"SELECT COUNT(*) FROM {from_table.upper()} c "
+            f"LEFT JOIN {to_table.upper()} p ON c.{from_col.upper()} = p.{to_col.upper()} "
+            f"WHERE p.{to_col.upper()} IS NULL"
+        ).fetchone()[0]
+        print(f"  {from_table}.{from_col} -> {to_table}.{to_col}: {orphans}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile in-warehouse SQL data generators")
+    parser.add_argument("--config", required=True, help="Path to config JSON file")
+    parser.add_argument("--output-dir", required=True, help="Output directory")
+    parser.add_argument("--dialect", choices=sorted(DIALECTS), default="snowflake", help="SQL dialect to emit")
+    parser.add_argument("--run-duckdb", action="store_true", help="Execute the DuckDB SQL in-memory and report")
+    args = parser.parse_args()
+
+    # Load config
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+
+    dataset_type = config.get('dataset_type', 'ecommerce')
+    if dataset_type not in DISTRIBUTIONS:
+        dataset_type = 'ecommerce'
+    num_records = config.get('num_records', config.get('record_count', 1000))
+    sf_config = config.get("snowflake", {})
+    database = sf_config.get("database") or config.get("database", "DEMO_DB")
+    schema = sf_config.get("schema") or config.get("schema", "PUBLIC")
+
+    sql = compile_dataset_sql(dataset_type, num_records, args.dialect, config.get("seed"), database, schema)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    suffix = "" if args.dialect == "snowflake" else f".{args.dialect}"
+    sql_file = output_dir / f"generate_data{suffix}.sql"
+    with open(sql_file, 'w') as f:
+        f.write(sql)
+
+    print(f"Compiled {dataset_type} generator for {num_records} records ({args.dialect})")
+    print(f"  Written: {sql_file}")
+
+    if args.run_duckdb:
+        if args.dialect != "duckdb":
+            parser.error("--run-duckdb requires --dialect duckdb")
+        print("")
+        run_duckdb(sql, dataset_type)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,100 +10,572 @@ Usage:
 
 import argparse
 import json
+import pprint
 from pathlib import Path
 
+from generate_schema import SCHEMAS, generate_ddl, partition_column, table_load_order
+
 DASHBOARD_TEMPLATES = {
+    # KPIs:   (label, icon, source, aggregate, format)
+    # Charts: (name, type, title, source, spec)
+    #
+    # A source is a base table followed by the tables LEFT JOINed to it along
+    # the SCHEMAS relationships. Aggregates are ("count",), ("count_if", cond),
+    # ("count_distinct", col), ("sum", col), ("avg", col) or ("rate", cond),
+    # where a cond is a boolean column or a (column, value) equality.
+    #
+    # Filters (and the date_filter range) become WHERE predicates on every
+    # KPI and chart query whose source includes the filtered table.
+    #
+    # Watermarks name the ever-growing date column of each fact table. Queries
+    # over a source whose base table has one are refreshed incrementally.
+    #
+    # Map charts bin rows into lat/lon grid cells in Snowflake. Each zoom level
+    # is (label, cell degrees, view span in degrees or None for the globe); a
+    # level with no cell size shows up to "points" sampled rows instead.
     "financial_fraud": {
         "title": "Financial Fraud Detection Dashboard",
+        "sources": {
+            "transactions": ["transactions", "fraud_labels"],
+        },
         "kpis": [
-            ("Total Transactions", "len(transactions_df)", "📊"),
-            ("Fraud Rate", "f\"{(fraud_df['IS_FRAUD'].sum() / len(fraud_df) * 100):.2f}%\"", "🚨"),
-            ("Total Amount", "f\"${transactions_df['AMOUNT'].sum():,.2f}\"", "💰"),
-            ("Flagged Transactions", "fraud_df['IS_FRAUD'].sum()", "⚠️"),
+            ("Total Transactions", "📊", "transactions", ("count",), "{:,.0f}"),
+            ("Fraud Rate", "🚨", "transactions", ("rate", "fraud_labels.is_fraud"), "{:.2f}%"),
+            ("Total Amount", "💰", "transactions", ("sum", "transactions.amount"), "${:,.2f}"),
+            ("Flagged Transactions", "⚠️", "transactions", ("count_if", "fraud_labels.is_fraud"), "{:,.0f}"),
         ],
         "charts": [
-            ("fraud_by_type", "bar", "Fraud by Type", "fraud_df[fraud_df['IS_FRAUD']==True].groupby('FRAUD_TYPE').size()"),
-            ("amount_distribution", "histogram", "Transaction Amount Distribution", "transactions_df['AMOUNT']"),
-            ("transactions_by_channel", "pie", "Transactions by Channel", "transactions_df['CHANNEL'].value_counts()"),
-            ("fraud_over_time", "line", "Fraud Incidents Over Time", "fraud_df[fraud_df['IS_FRAUD']==True].groupby(pd.to_datetime(fraud_df['FLAGGED_DATE']).dt.strftime('%Y-%m')).size()"),
+            ("fraud_by_type", "bar", "Fraud by Type", "transactions",
+             {"dimension": "fraud_labels.fraud_type", "where": "fraud_labels.is_fraud"}),
+            ("amount_distribution", "histogram", "Transaction Amount Distribution", "transactions",
+             {"column": "transactions.amount", "range": (0, 5000), "bins": 10}),
+            ("transactions_by_channel", "pie", "Transactions by Channel", "transactions",
+             {"dimension": "transactions.channel"}),
+            ("fraud_over_time", "line", "Fraud Incidents Over Time", "transactions",
+             {"time": "fraud_labels.flagged_date", "where": "fraud_labels.is_fraud"}),
+            ("fraud_map", "map", "Fraud Rate by Location", "transactions",
+             {"lat": "transactions.location_lat", "lon": "transactions.location_lon",
+              "aggregate": ("rate", "fraud_labels.is_fraud"), "y_label": "Fraud Rate (%)",
+              "levels": [("World", 10, None), ("Region", 2, (30, 60)), ("Local", 0.5, (6, 12)),
+                         ("Points", None, (2, 4))],
+              "points": 2000}),
         ],
-        "filters": ["transaction_type", "channel", "date_range"],
+        "filters": ["transactions.transaction_type", "transactions.channel", "transactions.device_type"],
+        "date_filter": "transactions.transaction_date",
+        "watermarks": {"transactions": "transaction_date"},
         "tables": ["transactions", "customers", "merchants", "fraud_labels"],
     },
     "logistics": {
         "title": "Logistics & Shipping Dashboard",
+        "sources": {
+            "shipments": ["shipments", "routes", "deliveries"],
+            "routes": ["routes"],
+        },
         "kpis": [
-            ("Total Shipments", "len(shipments_df)", "📦"),
-            ("On-Time Delivery Rate", "f\"{(deliveries_df['DELIVERY_STATUS']=='delivered').sum() / len(deliveries_df) * 100:.1f}%\"", "✅"),
-            ("Avg Transit Days", "f\"{routes_df['ESTIMATED_DAYS'].mean():.1f} days\"", "🕐"),
-            ("Total Shipping Revenue", "f\"${shipments_df['SHIPPING_COST'].sum():,.2f}\"", "💵"),
+            ("Total Shipments", "📦", "shipments", ("count",), "{:,.0f}"),
+            ("On-Time Delivery Rate", "✅", "shipments", ("rate", ("deliveries.delivery_status", "delivered")), "{:.1f}%"),
+            ("Avg Transit Days", "🕐", "routes", ("avg", "routes.estimated_days"), "{:.1f} days"),
+            ("Total Shipping Revenue", "💵", "shipments", ("sum", "shipments.shipping_cost"), "${:,.2f}"),
         ],
         "charts": [
-            ("deliveries_by_status", "pie", "Deliveries by Status", "deliveries_df['DELIVERY_STATUS'].value_counts()"),
-            ("shipments_by_priority", "bar", "Shipments by Priority", "shipments_df['PRIORITY'].value_counts()"),
-            ("weight_distribution", "histogram", "Package Weight Distribution", "shipments_df['WEIGHT_LBS']"),
-            ("shipments_over_time", "line", "Shipments Over Time", "shipments_df.groupby(pd.to_datetime(shipments_df['SHIP_DATE']).dt.strftime('%Y-%m')).size()"),
+            ("deliveries_by_status", "pie", "Deliveries by Status", "shipments",
+             {"dimension": "deliveries.delivery_status"}),
+            ("shipments_by_priority", "bar", "Shipments by Priority", "shipments",
+             {"dimension": "shipments.priority"}),
+            ("weight_distribution", "histogram", "Package Weight Distribution", "shipments",
+             {"column": "shipments.weight_lbs", "range": (0, 100), "bins": 10}),
+            ("shipments_over_time", "line", "Shipments Over Time", "shipments",
+             {"time": "shipments.ship_date"}),
         ],
-        "filters": ["priority", "transport_mode", "date_range"],
+        "filters": ["shipments.priority", "routes.transport_mode"],
+        "date_filter": "shipments.ship_date",
+        "watermarks": {"shipments": "ship_date"},
         "tables": ["shipments", "deliveries", "routes", "warehouses"],
     },
     "healthcare": {
         "title": "Healthcare Analytics Dashboard",
+        "sources": {
+            "visits": ["visits"],
+            "patients": ["patients"],
+            "diagnoses": ["diagnoses", "visits"],
+            "prescriptions": ["prescriptions", "visits"],
+        },
         "kpis": [
-            ("Total Patients", "len(patients_df)", "👥"),
-            ("Total Visits", "len(visits_df)", "🏥"),
-            ("Avg Visit Duration", "f\"{visits_df['VISIT_DURATION_MIN'].mean():.0f} min\"", "⏱️"),
-            ("Prescriptions Issued", "len(prescriptions_df)", "💊"),
+            ("Total Patients", "👥", "patients", ("count",), "{:,.0f}"),
+            ("Total Visits", "🏥", "visits", ("count",), "{:,.0f}"),
+            ("Avg Visit Duration", "⏱️", "visits", ("avg", "visits.visit_duration_min"), "{:.0f} min"),
+            ("Prescriptions Issued", "💊", "prescriptions", ("count",), "{:,.0f}"),
         ],
         "charts": [
-            ("visits_by_type", "pie", "Visits by Type", "visits_df['VISIT_TYPE'].value_counts()"),
-            ("visits_by_department", "bar", "Visits by Department", "visits_df['DEPARTMENT'].value_counts()"),
-            ("diagnoses_by_severity", "bar", "Diagnoses by Severity", "diagnoses_df['SEVERITY'].value_counts()"),
-            ("visits_over_time", "line", "Visits Over Time", "visits_df.groupby(pd.to_datetime(visits_df['VISIT_DATE']).dt.strftime('%Y-%m')).size()"),
+            ("visits_by_type", "pie", "Visits by Type", "visits",
+             {"dimension": "visits.visit_type"}),
+            ("visits_by_department", "bar", "Visits by Department", "visits",
+             {"dimension": "visits.department"}),
+            ("diagnoses_by_severity", "bar", "Diagnoses by Severity", "diagnoses",
+             {"dimension": "diagnoses.severity"}),
+            ("visits_over_time", "line", "Visits Over Time", "visits",
+             {"time": "visits.visit_date"}),
         ],
-        "filters": ["visit_type", "department", "date_range"],
+        "filters": ["visits.visit_type", "visits.department"],
+        "date_filter": "visits.visit_date",
+        "watermarks": {"visits": "visit_date"},
         "tables": ["patients", "visits", "diagnoses", "prescriptions"],
     },
     "ecommerce": {
         "title": "E-commerce Analytics Dashboard",
+        "sources": {
+            "orders": ["orders"],
+            "customers": ["customers"],
+            "order_items": ["order_items", "orders", "products"],
+        },
         "kpis": [
-            ("Total Revenue", "f\"${orders_df['TOTAL_AMOUNT'].sum():,.2f}\"", "💰"),
-            ("Total Orders", "len(orders_df)", "🛒"),
-            ("Avg Order Value", "f\"${orders_df['TOTAL_AMOUNT'].mean():,.2f}\"", "📈"),
-            ("Total Customers", "len(customers_df)", "👥"),
+            ("Total Revenue", "💰", "orders", ("sum", "orders.total_amount"), "${:,.2f}"),
+            ("Total Orders", "🛒", "orders", ("count",), "{:,.0f}"),
+            ("Avg Order Value", "📈", "orders", ("avg", "orders.total_amount"), "${:,.2f}"),
+            ("Total Customers", "👥", "customers", ("count",), "{:,.0f}"),
         ],
         "charts": [
-            ("orders_by_status", "pie", "Orders by Status", "orders_df['STATUS'].value_counts()"),
-            ("revenue_by_category", "bar", "Revenue by Product Category", "order_items_df.merge(products_df, on='PRODUCT_ID').groupby('CATEGORY')['LINE_TOTAL'].sum()"),
-            ("orders_over_time", "line", "Orders Over Time", "orders_df.groupby(pd.to_datetime(orders_df['ORDER_DATE']).dt.strftime('%Y-%m')).size()"),
-            ("payment_methods", "bar", "Payment Methods", "orders_df['PAYMENT_METHOD'].value_counts()"),
+            ("orders_by_status", "pie", "Orders by Status", "orders",
+             {"dimension": "orders.status"}),
+            ("revenue_by_category", "bar", "Revenue by Product Category", "order_items",
+             {"dimension": "products.category", "aggregate": ("sum", "order_items.line_total"), "y_label": "Revenue"}),
+            ("orders_over_time", "line", "Orders Over Time", "orders",
+             {"time": "orders.order_date"}),
+            ("payment_methods", "bar", "Payment Methods", "orders",
+             {"dimension": "orders.payment_method"}),
         ],
-        "filters": ["status", "payment_method", "date_range"],
+        "filters": ["orders.status", "orders.payment_method"],
+        "date_filter": "orders.order_date",
+        "watermarks": {"orders": "order_date"},
         "tables": ["orders", "customers", "products", "order_items"],
     },
 }
 
 
+# =============================================================================
+# QUERY COMPILER
+# KPIs and charts are compiled into aggregate SQL at generation time, so only
+# aggregated result sets travel from Snowflake to the app. Every aggregate is
+# split into additive measures (counts and sums) that the app combines into
+# the displayed value.
+# =============================================================================
+def _column_sql(ref: str) -> str:
+    """Turn a "table.column" reference into SQL."""
+    table, column = ref.split(".")
+    return f"{table.upper()}.{column.upper()}"
+
+
+def _condition_sql(cond) -> str:
+    """Turn a boolean column or (column, value) equality into SQL."""
+    if isinstance(cond, (tuple, list)):
+        column, value = cond
+        value_sql = "'" + str(value).replace("'", "''") + "'" if isinstance(value, str) else str(value)
+        return f"{_column_sql(column)} = {value_sql}"
+    return _column_sql(cond)
+
+
+def compile_source(dataset_type: str, tables: list, prefix: str = "") -> str:
+    """Compile a source (base table + joined tables) into a FROM clause."""
+    relationships = SCHEMAS.get(dataset_type, SCHEMAS["ecommerce"])["relationships"]
+    base = tables[0]
+    sql = f"{prefix}{base.upper()} AS {base.upper()}"
+    joined = [base]
+    for table in tables[1:]:
+        on = None
+        for from_table, from_col, to_table, to_col in relationships:
+            if from_table == table and to_table in joined:
+                on = f"{table}.{from_col}", f"{to_table}.{to_col}"
+            elif to_table == table and from_table in joined:
+                on = f"{table}.{to_col}", f"{from_table}.{from_col}"
+            if on:
+                break
+        if not on:
+            raise ValueError(f"No relationship joins {table} to {', '.join(joined)}")
+        sql += f" LEFT JOIN {prefix}{table.upper()} AS {table.upper()} ON {_column_sql(on[0])} = {_column_sql(on[1])}"
+        joined.append(table)
+    return sql
+
+
+def _add_measure(measures: list, sql: str) -> str:
+    """Register an additive measure once and return its result column name."""
+    if sql not in measures:
+        measures.append(sql)
+    return f"M{measures.index(sql)}"
+
+
+def compile_aggregate(aggregate: tuple, measures: list) -> list:
+    """Compile an aggregate into measures and return how to combine them.
+
+    Returns ["value", col] or ["ratio", numerator, denominator, scale].
+    """
+    kind = aggregate[0]
+    if kind == "count":
+        return ["value", _add_measure(measures, "COUNT(*)")]
+    if kind == "count_if":
+        return ["value", _add_measure(measures, f"SUM(CASE WHEN {_condition_sql(aggregate[1])} THEN 1 ELSE 0 END)")]
+    if kind == "count_distinct":
+        return ["value", _add_measure(measures, f"COUNT(DISTINCT {_column_sql(aggregate[1])})")]
+    if kind == "sum":
+        return ["value", _add_measure(measures, f"CAST(SUM({_column_sql(aggregate[1])}) AS DOUBLE)")]
+    if kind == "avg":
+        column = _column_sql(aggregate[1])
+        total = _add_measure(measures, f"CAST(SUM({column}) AS DOUBLE)")
+        return ["ratio", total, _add_measure(measures, f"COUNT({column})"), 1]
+    if kind == "rate":
+        hits = _add_measure(measures, f"SUM(CASE WHEN {_condition_sql(aggregate[1])} THEN 1 ELSE 0 END)")
+        return ["ratio", hits, _add_measure(measures, "COUNT(*)"), 100]
+    raise ValueError(f"Unknown aggregate: {aggregate!r}")
+
+
+def _select_sql(dimensions: list, measures: list, source_sql: str, where: list, order_by: str = None,
+                filterable: bool = True) -> str:
+    """Build an aggregate query; the app replaces {filters} with the sidebar predicates."""
+    select = dimensions + [f"{sql} AS M{i}" for i, sql in enumerate(measures)]
+    sql = f"SELECT {', '.join(select)} FROM {source_sql}"
+    where = where + ["{filters}"] if filterable else where
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if dimensions:
+        sql += " GROUP BY " + ", ".join(str(i + 1) for i in range(len(dimensions)))
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    return sql
+
+
+def _watermark(template: dict, source: str, measures: list, prefix: str):
+    """Describe the high-water mark of a query, or None if it cannot be refreshed incrementally."""
+    base = template["sources"][source][0]
+    column = template.get("watermarks", {}).get(base)
+    # Deltas can only be merged into measures that add up (counts and sums)
+    if not column or any("DISTINCT" in measure for measure in measures):
+        return None
+    return {"table": base, "relation": f"{prefix}{base.upper()} AS {base.upper()}",
+            "column": _column_sql(f"{base}.{column}")}
+
+
+def _summary_column(ref: str) -> str:
+    """Name the column a "table.column" filter is stored under in a summary table."""
+    return ref.replace(".", "_").upper()
+
+
+def query_filters(template: dict, tables: list, summary: bool = False) -> dict:
+    """Map each sidebar filter that applies to the given tables onto the column it constrains."""
+    filters = {}
+    for ref in template.get("filters", []):
+        if ref.split(".")[0] in tables:
+            filters[ref] = _summary_column(ref) if summary else _column_sql(ref)
+    date_ref = template.get("date_filter")
+    if date_ref and date_ref.split(".")[0] in tables:
+        filters["date"] = "DAY" if summary else _column_sql(date_ref)
+    return filters
+
+
+def _cube(dimensions: list, measures: list, filters: dict, source_sql: str, where: list, table: str = None,
+          watermark: dict = None) -> dict:
+    """Describe the in-memory cube answering a query: its measures per dimension, filter value and month.
+
+    The cube is read from the query's summary table when there is one, or
+    aggregated from the source tables otherwise. A source cube with a
+    watermark keeps a {filters} slot for the app's delta predicates.
+    """
+    aliases = [alias for _, alias in dimensions]
+    columns = {ref: "MONTH" if ref == "date" else _summary_column(ref) for ref in filters}
+    if table:
+        keys = aliases + [column for ref, column in columns.items() if ref != "date"]
+        if "date" in columns:
+            keys.append("DATE_TRUNC('MONTH', DAY) AS MONTH")
+        sql = _select_sql(keys, [f"SUM(M{i})" for i in range(len(measures))], table, [], filterable=False)
+    else:
+        keys = [f"{expr} AS {alias}" for expr, alias in dimensions]
+        keys += [f"{filters[ref]} AS {column}" for ref, column in columns.items() if ref != "date"]
+        if "date" in columns:
+            keys.append(f"DATE_TRUNC('MONTH', {filters['date']}) AS MONTH")
+        sql = _select_sql(keys, measures, source_sql, where, filterable=watermark is not None)
+    return {"sql": sql, "dimensions": aliases, "filters": columns, "measures": len(measures),
+            "watermark": None if table else watermark}
+
+
+def _compile_query(template: dict, source: str, source_sql: str, dimensions: list, measures: list,
+                   where: list, order_by: str, summary_name: str, prefix: str, summaries: bool) -> dict:
+    """Compile one KPI or chart query, optionally against a pre-aggregated summary table.
+
+    dimensions are (expression, alias) pairs. A summary table keeps the
+    dimensions plus every applicable filter column and the filter date at day
+    grain, so the app can still filter it and re-aggregate the additive measures.
+    Additive queries also describe a month-grain cube (see _cube).
+    """
+    tables = template["sources"][source]
+    additive = not any("DISTINCT" in measure for measure in measures)
+    filters = query_filters(template, tables)
+    if not (summaries and additive):
+        query = {"sql": _select_sql([f"{expr} AS {alias}" for expr, alias in dimensions], measures,
+                                    source_sql, where, order_by),
+                 "filters": filters,
+                 "watermark": _watermark(template, source, measures, prefix)}
+        if additive:
+            query["cube"] = _cube(dimensions, measures, filters, source_sql, where, watermark=query["watermark"])
+        return query
+
+    keys = [f"{expr} AS {alias}" for expr, alias in dimensions]
+    keys += [f"{column} AS {_summary_column(ref)}" for ref, column in filters.items() if ref != "date"]
+    if "date" in filters:
+        keys.append(f"CAST({filters['date']} AS DATE) AS DAY")
+    definition = _select_sql(keys, measures, source_sql, where, filterable=False)
+
+    table = f"{prefix}{summary_name}"
+    select = [alias for _, alias in dimensions] + [f"SUM(M{i}) AS M{i}" for i in range(len(measures))]
+    sql = f"SELECT {', '.join(select)} FROM {table} WHERE {{filters}}"
+    if dimensions:
+        sql += " GROUP BY " + ", ".join(str(i + 1) for i in range(len(dimensions)))
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    return {"sql": sql, "filters": query_filters(template, tables, summary=True), "watermark": None,
+            "summary": {"table": table, "sql": definition},
+            "cube": _cube(dimensions, measures, filters, source_sql, where, table)}
+
+
+def compile_map(dataset_type: str, template: dict, source: str, source_sql: str, spec: dict,
+                measures: list, where: list) -> dict:
+    """Compile a map chart into one grid query per zoom level.
+
+    Grid levels group rows by FLOOR(coordinate / cell) and return the additive
+    measures per cell; zoomed-in levels are restricted to a view of `span`
+    degrees around a center the app binds as parameters. A view spans at
+    most span // cell + 2 cells per axis, so a result has at most
+    (lat_span // cell + 2) * (lon_span // cell + 2) rows (max_rows) however
+    many rows the table holds.
+    The points level returns a deterministic hash sample of raw rows.
+    """
+    lat, lon = _column_sql(spec["lat"]), _column_sql(spec["lon"])
+    count = _add_measure(measures, "COUNT(*)")
+    where = where + [f"{lat} IS NOT NULL", f"{lon} IS NOT NULL"]
+    filters = query_filters(template, template["sources"][source])
+    aggregate = spec.get("aggregate", ("count",))
+    flag = (f"CASE WHEN {_condition_sql(aggregate[1])} THEN 1 ELSE 0 END"
+            if aggregate[0] in ("rate", "count_if") else "0")
+
+    levels = []
+    for label, cell, span in spec["levels"]:
+        level = {"label": label, "cell": cell, "span": list(span) if span else None}
+        if cell is None:
+            base = template["sources"][source][0]
+            columns = SCHEMAS.get(dataset_type, SCHEMAS["ecommerce"])["tables"][base]["columns"]
+            key = next((col[0] for col in columns if col[2] == "PRIMARY KEY"), columns[0][0])
+            level["sql"] = (
+                f"SELECT CAST({lat} AS DOUBLE) AS LAT, CAST({lon} AS DOUBLE) AS LON, {flag} AS FLAGGED "
+                f"FROM {source_sql} WHERE {' AND '.join(where + ['{filters}'])} "
+                f"ORDER BY HASH({_column_sql(f'{base}.{key}')}) LIMIT {spec['points']}"
+            )
+            level["max_rows"] = spec["points"]
+        else:
+            dimensions = [f"FLOOR({lat} / {cell}) AS LAT_BIN", f"FLOOR({lon} / {cell}) AS LON_BIN"]
+            level["sql"] = _select_sql(dimensions, measures, source_sql, where)
+            lat_span, lon_span = span or (180, 360)
+            level["max_rows"] = int((lat_span // cell + 2) * (lon_span // cell + 2))
+        levels.append(level)
+    # The whole-globe level doubles as the chart's own query
+    return {"lat": lat, "lon": lon, "count": count, "levels": levels,
+            "sql": levels[0]["sql"], "filters": filters, "watermark": None}
+
+
+def compile_dashboard(dataset_type: str, database: str, schema: str, summaries: bool = False) -> dict:
+    """Compile a DASHBOARD_TEMPLATES entry into aggregate queries.
+
+    With summaries=True the app queries read pre-aggregated summary tables
+    (see generate_summary_sql) instead of the raw fact tables.
+    """
+    template = DASHBOARD_TEMPLATES.get(dataset_type, DASHBOARD_TEMPLATES["ecommerce"])
+    prefix = f"{database}.{schema}."
+    sources = {name: compile_source(dataset_type, tables, prefix) for name, tables in template["sources"].items()}
+
+    # One query per source answers all of its KPIs in a single round trip
+    kpi_measures = {}
+    kpis = []
+    for label, icon, source, aggregate, fmt in template["kpis"]:
+        measures = kpi_measures.setdefault(source, [])
+        kpis.append({"label": label, "icon": icon, "query": source,
+                     "value": compile_aggregate(aggregate, measures), "format": fmt})
+    kpi_queries = {source: _compile_query(template, source, sources[source], [], measures, [], None,
+                                          f"SUMMARY_{source.upper()}_KPIS", prefix, summaries)
+                   for source, measures in kpi_measures.items()}
+
+    charts = []
+    for name, chart_type, title, source, spec in template["charts"]:
+        measures = []
+        value = compile_aggregate(spec.get("aggregate", ("count",)), measures)
+        where = [_condition_sql(spec["where"])] if "where" in spec else []
+        chart = {"name": name, "type": chart_type, "title": title, "value": value,
+                 "y_label": spec.get("y_label", "Count")}
+        if chart_type == "map":
+            # Grid cells are already small results; maps always read the raw tables
+            chart.update(compile_map(dataset_type, template, source, sources[source], spec, measures, where))
+            charts.append(chart)
+            continue
+        if chart_type == "histogram":
+            column = _column_sql(spec["column"])
+            low, high = spec["range"]
+            bins = spec["bins"]
+            dimension = (f"LEAST(GREATEST(WIDTH_BUCKET({column}, {low}, {high}, {bins}), 1), {bins})", "BUCKET")
+            chart.update({"range": [low, high], "bins": bins, "x_label": spec["column"].split(".")[1].upper()})
+            where, order_by = where + [f"{column} IS NOT NULL"], "1"
+        elif chart_type == "line":
+            column = _column_sql(spec["time"])
+            dimension = (f"DATE_TRUNC('MONTH', {column})", "PERIOD")
+            where, order_by = where + [f"{column} IS NOT NULL"], "1"
+        else:
+            dimension = (_column_sql(spec["dimension"]), "LABEL")
+            order_by = "2 DESC"
+        chart.update(_compile_query(template, source, sources[source], [dimension], measures, where, order_by,
+                                    f"SUMMARY_{name.upper()}", prefix, summaries))
+        charts.append(chart)
+
+    # Filter options come from a summary table that carries the column, if any
+    filters = []
+    for ref in template.get("filters", []):
+        table, column = ref.split(".")
+        options_sql = (f"SELECT DISTINCT {column.upper()} AS VALUE FROM {prefix}{table.upper()} "
+                       f"WHERE {column.upper()} IS NOT NULL ORDER BY 1")
+        for query in kpi_queries.values():
+            if query.get("summary") and ref in query["filters"]:
+                options_sql = (f"SELECT DISTINCT {query['filters'][ref]} AS VALUE FROM {query['summary']['table']} "
+                               f"WHERE {query['filters'][ref]} IS NOT NULL ORDER BY 1")
+                break
+        filters.append({"key": ref, "label": column.replace("_", " ").title(), "options_sql": options_sql})
+    date_filter = {"label": "Date Range"} if template.get("date_filter") else None
+
+    return {"kpi_queries": kpi_queries, "kpis": kpis, "charts": charts,
+            "filters": filters, "date_filter": date_filter}
+
+
+def generate_summary_sql(dataset_type: str, config: dict) -> str:
+    """Generate dynamic tables that pre-aggregate every KPI and chart of the dashboard."""
+    sf_config = config.get("snowflake", {})
+    database = sf_config.get("database") or config.get("database", "DEMO_DB")
+    schema = sf_config.get("schema") or config.get("schema", "PUBLIC")
+    warehouse = sf_config.get("warehouse") or config.get("warehouse", "COMPUTE_WH")
+    target_lag = config.get("summary_target_lag", "1 hour")
+    template = DASHBOARD_TEMPLATES.get(dataset_type, DASHBOARD_TEMPLATES["ecommerce"])
+    compiled = compile_dashboard(dataset_type, database, schema, summaries=True)
+
+    sql_lines = [
+        f"-- Summary tables for the {template['title']}",
+        f"-- Database: {database}, Schema: {schema}",
+        "-- Dynamic tables keep one row per dimension, filter value and day, refreshed",
+        "-- incrementally by Snowflake, so the dashboard never scans the fact tables.",
+        "",
+    ]
+    queries = [(f"KPIs: {source}", query) for source, query in compiled["kpi_queries"].items()]
+    queries += [(chart["title"], chart) for chart in compiled["charts"]]
+    for title, query in queries:
+        if not query.get("summary"):
+            continue
+        sql_lines.extend([
+            f"-- {title}",
+            f"CREATE OR REPLACE DYNAMIC TABLE {query['summary']['table']}",
+            f"    TARGET_LAG = '{target_lag}'",
+            f"    WAREHOUSE = {warehouse}",
+            "AS",
+            f"{query['summary']['sql']};",
+            "",
+        ])
+    return "\n".join(sql_lines)
+
+
+def typed_select(column: str, sql_type: str) -> str:
+    """Select a column cast so it arrives in pandas already typed.
+
+    Snowpark returns NUMBER(p,s) as Python Decimal objects and DATE as Python
+    date objects; casting in the query yields float64 and datetime64 columns.
+    """
+    base_type = sql_type.split("(")[0].upper()
+    if base_type == "DECIMAL":
+        return f"CAST({column} AS DOUBLE) AS {column}"
+    if base_type in ("DATE", "TIMESTAMP"):
+        return f"CAST({column} AS TIMESTAMP) AS {column}"
+    return column
+
+
+def compact_dtype(schema_def: dict, table: str, column: str, sql_type: str):
+    """Pick the smallest pandas dtype that holds a column, from its SCHEMAS definition.
+
+    Enum-like columns listed under "categorical" and foreign keys into root
+    (dimension) tables repeat a few values, so they become categories. Other
+    strings (UUIDs, names) become Arrow-backed strings; numbers are downcast.
+    """
+    base_type = sql_type.split("(")[0].upper()
+    if column in schema_def["tables"][table].get("categorical", []):
+        return "category"
+    children = {rel[0] for rel in schema_def["relationships"]}
+    if any(rel[0] == table and rel[1] == column and rel[2] not in children for rel in schema_def["relationships"]):
+        return "category"
+    if base_type == "VARCHAR":
+        return "string[pyarrow]"
+    if base_type == "DECIMAL":
+        # float32 keeps 7 significant digits
+        precision = int(sql_type.split("(")[1].split(",")[0])
+        return "float32" if precision <= 7 else "float64"
+    if base_type == "INTEGER":
+        return "integer"
+    if base_type == "BOOLEAN":
+        return "boolean"
+    return None
+
+
+def compile_tables(dataset_type: str, tables: list, database: str, schema: str) -> dict:
+    """Describe the Data Exploration tables: qualified name, typed column selects, dtypes and primary key."""
+    schema_def = SCHEMAS.get(dataset_type, SCHEMAS["ecommerce"])
+    explore = {}
+    for table in tables:
+        columns = schema_def["tables"][table]["columns"]
+        key = next((col[0] for col in columns if col[2] == "PRIMARY KEY"), columns[0][0])
+        explore[table] = {
+            "table": f"{database}.{schema}.{table.upper()}",
+            "columns": [col[0].upper() for col in columns],
+            "select": {col[0].upper(): typed_select(col[0].upper(), col[1]) for col in columns},
+            "dtypes": {col[0].upper(): dtype for col in columns
+                       if (dtype := compact_dtype(schema_def, table, col[0], col[1]))},
+            "key": key.upper(),
+            "filters": query_filters(DASHBOARD_TEMPLATES.get(dataset_type, DASHBOARD_TEMPLATES["ecommerce"]), [table]),
+        }
+    return explore
+
+
+def _py_literal(value) -> str:
+    """Render compiled query metadata as a Python literal for the generated app."""
+    return pprint.pformat(value, width=110, sort_dicts=False)
+
+
 def generate_streamlit_app(dataset_type: str, config: dict, output_dir: Path):
     """Generate the main Streamlit application file."""
-    
+
     template = DASHBOARD_TEMPLATES.get(dataset_type, DASHBOARD_TEMPLATES["ecommerce"])
     # Check both nested and top-level config for database/schema
     sf_config = config.get("snowflake", {})
     database = sf_config.get("database") or config.get("database", "DEMO_DB")
     schema = sf_config.get("schema") or config.get("schema", "PUBLIC")
-    
+    compiled = compile_dashboard(dataset_type, database, schema, summaries=config.get("summary_tables", True))
+
     # Build the app code
     app_code = f'''"""
 {template["title"]}
 Auto-generated Streamlit dashboard for synthetic data visualization.
 """
 
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from snowflake.snowpark.context import get_active_session
+
+from data_access import connect, section
 
 # Page configuration
 st.set_page_config(
@@ -112,183 +584,835 @@ st.set_page_config(
     layout="wide"
 )
 
-# Get Snowflake session
+# Get Snowflake session (or the local DuckDB session, see data_access.py)
 @st.cache_resource
 def get_session():
-    return get_active_session()
+    return connect()
 
 session = get_session()
 
-# Load data from Snowflake
-@st.cache_data(ttl=600)
-def load_data():
-    """Load all tables from Snowflake."""
-    data = {{}}
-'''
-    
-    # Add table loading
-    for table in template["tables"]:
-        app_code += f'''    data["{table}"] = session.table("{database}.{schema}.{table.upper()}").to_pandas()
+# Aggregate queries compiled from DASHBOARD_TEMPLATES by generate_streamlit.py.
+# KPI values and chart points are combined from additive measure columns M0..Mn;
+# {{filters}} is replaced with the sidebar predicates for the query's tables.
+KPI_QUERIES = {_py_literal(compiled["kpi_queries"])}
+
+KPIS = {_py_literal(compiled["kpis"])}
+
+CHARTS = {_py_literal(compiled["charts"])}
+
+FILTERS = {_py_literal(compiled["filters"])}
+
+DATE_FILTER = {_py_literal(compiled["date_filter"])}
+
+TABLES = {_py_literal(compile_tables(dataset_type, template["tables"], database, schema))}
+
+PERFORMANCE_PANEL = {config.get("performance_panel", True)!r}
+
+CUBE = {config.get("cube", True)!r}
 '''
-    
-    app_code += '''    return data
-
-data = load_data()
-
-# Convert Decimal types to float for Plotly compatibility
-# Snowflake NUMBER types become Python Decimal which Plotly cannot render properly
-for table_name, df in data.items():
-    for col in df.select_dtypes(include=['object']).columns:
-        try:
-            df[col] = pd.to_numeric(df[col], errors='ignore')
-        except:
-            pass
+
+    app_code += '''
+# Performance tracing: every fetch and chart build can be timed and shown in
+# the sidebar's Performance panel. It is off unless the panel is switched on
+# (or DASHBOARD_TRACE=1 is set, which logs each event as a JSON line), and
+# costs a single flag check per call while off.
+TRACE_LOGS = os.environ.get("DASHBOARD_TRACE") == "1"
+tracing = TRACE_LOGS or st.session_state.get("performance_panel", False)
+trace_events = []
+trace_local = threading.local()
+trace_logger = logging.getLogger("dashboard.trace")
+if TRACE_LOGS and not trace_logger.handlers:
+    trace_logger.addHandler(logging.StreamHandler())
+    trace_logger.setLevel(logging.INFO)
+
+
+def trace(kind: str, name: str, start: float, **fields):
+    """Record a timed event for the performance panel and the structured log."""
+    event = {"kind": kind, "name": name, "ms": round((time.perf_counter() - start) * 1000, 1), **fields}
+    trace_events.append(event)
+    trace_logger.info(json.dumps(event, default=str))
+
+
+def frame_stats(df: pd.DataFrame) -> dict:
+    return {"rows": len(df), "bytes": int(df.memory_usage(deep=True).sum())}
+
+
+def fetch(sql: str, params: tuple = ()) -> pd.DataFrame:
+    """Run SQL in Snowflake; every round trip of the app goes through here."""
+    start = time.perf_counter()
+    df = session.sql(sql, params=list(params)).to_pandas() if params else session.sql(sql).to_pandas()
+    if tracing:
+        trace_local.fetches = getattr(trace_local, "fetches", 0) + 1
+        trace("query", sql, start, cache="miss", **frame_stats(df))
+    return df
+
+
+def cached(name: str, loader, *args) -> pd.DataFrame:
+    """Call a cached loader, tracing a cache hit when it returned without fetching."""
+    if not tracing:
+        return loader(*args)
+    fetches = getattr(trace_local, "fetches", 0)
+    start = time.perf_counter()
+    df = loader(*args)
+    if getattr(trace_local, "fetches", 0) == fetches:
+        trace("query", name, start, cache="hit", **frame_stats(df))
+    return df
+
+
+@st.cache_data(ttl=600, max_entries=256)
+def cached_query(sql: str, params: tuple = ()) -> pd.DataFrame:
+    """Results are cached per SQL text and bound filter values, so switching back
+    to a previous filter combination does not re-run the query."""
+    return fetch(sql, params)
+
+
+def run_query(sql: str, params: tuple = ()) -> pd.DataFrame:
+    """Run an aggregate query in Snowflake and return the (small) result set."""
+    return cached(sql, cached_query, sql, params)
+
+
+def apply_filters(query: dict, extra: list = ()) -> tuple:
+    """Replace {filters} in a query with the active sidebar predicates it supports.
+
+    query["filters"] maps each filter key to the column it constrains in that
+    query (a raw table column or a summary table column).
+    """
+    predicates, params = [], []
+    for key, values in active_filters:
+        column = query["filters"].get(key)
+        if column is None:
+            continue
+        if key == "date":
+            predicates.append(f"{column} >= ? AND {column} < ?")
+        else:
+            predicates.append(f"{column} IN ({', '.join(['?'] * len(values))})")
+        params.extend(values)
+    for predicate, values in extra:
+        predicates.append(predicate)
+        params.extend(values)
+    return query["sql"].replace("{filters}", " AND ".join(predicates) or "TRUE"), tuple(params)
+
+
+# Incremental refresh: fact tables only grow past their high-water mark, so
+# cached aggregates are topped up with the delta beyond it instead of being
+# recomputed. A schema change or rows appearing at or below the mark bump the
+# table's version, which forces a full reload of every query that reads it.
+REFRESH_SECONDS = 600
+MAX_INCREMENTAL_RESULTS = 256
+DIMENSIONS = ["LABEL", "BUCKET", "PERIOD"]
+
+
+@st.cache_resource
+def incremental_state() -> dict:
+    """Watermarks per fact table and merged results and cubes per query, shared across sessions."""
+    return {"lock": threading.Lock(), "tables": {}, "results": OrderedDict(), "cubes": OrderedDict()}
+
+
+def sync_watermark(watermark: dict) -> dict:
+    """Advance a fact table's high-water mark at most once per REFRESH_SECONDS."""
+    state = incremental_state()
+    with state["lock"]:
+        table = state["tables"].setdefault(
+            watermark["table"], {"version": 0, "columns": None, "high": None, "rows": 0, "checked": 0.0}
+        )
+        if time.time() - table["checked"] < REFRESH_SECONDS:
+            return dict(table)
+
+        relation, column = watermark["relation"], watermark["column"]
+        columns = tuple(fetch(f"SELECT * FROM {relation} LIMIT 0").columns)
+        mark = fetch(
+            f"SELECT MAX({column}) AS HIGH_WATER_MARK, COUNT({column}) AS ROW_COUNT FROM {relation}"
+        ).iloc[0]
+        changed = table["columns"] is not None and columns != table["columns"]
+        if not changed and table["high"] is not None:
+            history = fetch(
+                f"SELECT COUNT(*) AS HISTORY_ROWS FROM {relation} WHERE {column} <= ?", (table["high"],)
+            ).iloc[0]["HISTORY_ROWS"]
+            changed = int(history) != table["rows"]
+        if changed:
+            table["version"] += 1
+
+        high = mark["HIGH_WATER_MARK"]
+        table.update({
+            "columns": columns,
+            "high": None if pd.isna(high) else str(high),
+            "rows": int(mark["ROW_COUNT"]),
+            "checked": time.time(),
+        })
+        return dict(table)
+
+
+def merge_measures(frames: list) -> pd.DataFrame:
+    """Add up the measure columns of aggregate results that share dimensions."""
+    merged = pd.concat(frames, ignore_index=True)
+    dimensions = [col for col in DIMENSIONS if col in merged.columns]
+    measures = [col for col in merged.columns if col not in dimensions]
+    merged[measures] = merged[measures].fillna(0).astype(float)
+    if not dimensions:
+        return merged[measures].sum().to_frame().T
+    merged = merged.groupby(dimensions, as_index=False, dropna=False)[measures].sum()
+    if dimensions == ["LABEL"]:
+        return merged.sort_values(measures[0], ascending=False, ignore_index=True)
+    return merged.sort_values(dimensions, ignore_index=True)
+
+
+def run_incremental(query: dict) -> pd.DataFrame:
+    """Run a query over a fact table, fetching only rows past the cached high-water mark."""
+    watermark = query["watermark"]
+    table = sync_watermark(watermark)
+    key = apply_filters(query)
+    state = incremental_state()
+    with state["lock"]:
+        cached = state["results"].get(key)
+        if cached is not None:
+            state["results"].move_to_end(key)
+
+    if cached is not None and cached["version"] == table["version"] and cached["high"] == table["high"]:
+        return cached["df"]
+
+    column = watermark["column"]
+    if table["high"] is None:
+        df = merge_measures([run_query(*key)])
+    elif cached is not None and cached["version"] == table["version"] and cached["high"] is not None:
+        delta = (f"{column} > ? AND {column} <= ?", [cached["high"], table["high"]])
+        delta_df = run_query(*apply_filters(query, [delta]))
+        df = merge_measures([cached["df"], delta_df])
+    else:
+        full = (f"{column} <= ?", [table["high"]])
+        df = merge_measures([run_query(*apply_filters(query, [full]))])
+
+    with state["lock"]:
+        state["results"][key] = {"version": table["version"], "high": table["high"], "df": df}
+        state["results"].move_to_end(key)
+        while len(state["results"]) > MAX_INCREMENTAL_RESULTS:
+            state["results"].popitem(last=False)
+    return df
+
+
+# In-memory cubes: an additive KPI or chart query is answered from its cube,
+# i.e. its measures per dimension, filter value and month, fetched once and
+# shared by all sessions. A filter change then costs NumPy work over the
+# cube's cells instead of a warehouse round trip. Date ranges that do not
+# cover whole months need day precision and are pushed down to Snowflake.
+# Cubes over watermarked fact tables are topped up with the rows past the
+# high-water mark like run_incremental's results, and reloaded in full only
+# when the table's version changes. Cubes over summary tables (dynamic tables
+# Snowflake refreshes itself) and over other sources are re-read every
+# CUBE_SECONDS.
+CUBE_SECONDS = 600
+
+
+@st.cache_resource(ttl=CUBE_SECONDS, max_entries=64)
+def load_cube(sql: str, measures: int) -> dict:
+    """Fetch a cube and encode it as NumPy arrays."""
+    return encode_cube(fetch(sql), measures)
+
+
+def incremental_cube(spec: dict) -> dict:
+    """Fetch a fact-table cube, merging only the cells of rows past the cached high-water mark."""
+    watermark = spec["watermark"]
+    table = sync_watermark(watermark)
+    state = incremental_state()
+    with state["lock"]:
+        cached = state["cubes"].get(spec["sql"])
+        if cached is not None:
+            state["cubes"].move_to_end(spec["sql"])
+
+    if cached is not None and cached["version"] == table["version"] and cached["high"] == table["high"]:
+        return cached["cube"]
+
+    column = watermark["column"]
+    if table["high"] is None:
+        df = fetch(spec["sql"].replace("{filters}", "TRUE"))
+    elif cached is not None and cached["version"] == table["version"] and cached["high"] is not None:
+        delta = fetch(spec["sql"].replace("{filters}", f"{column} > ? AND {column} <= ?"),
+                      (cached["high"], table["high"]))
+        merged = pd.concat([cached["df"], delta], ignore_index=True)
+        names = [f"M{i}" for i in range(spec["measures"])]
+        keys = [col for col in merged.columns if col not in names]
+        merged[names] = merged[names].fillna(0).astype(float)
+        if keys:
+            df = merged.groupby(keys, as_index=False, dropna=False)[names].sum()
+        else:
+            df = merged[names].sum().to_frame().T
+    else:
+        df = fetch(spec["sql"].replace("{filters}", f"{column} <= ?"), (table["high"],))
+
+    cube = encode_cube(df, spec["measures"])
+    with state["lock"]:
+        state["cubes"][spec["sql"]] = {"version": table["version"], "high": table["high"], "df": df, "cube": cube}
+        state["cubes"].move_to_end(spec["sql"])
+        while len(state["cubes"]) > MAX_INCREMENTAL_RESULTS:
+            state["cubes"].popitem(last=False)
+    return cube
+
+
+def encode_cube(df: pd.DataFrame, measures: int) -> dict:
+    """Encode a cube as NumPy arrays: codes per key column plus a measure matrix."""
+    names = [f"M{i}" for i in range(measures)]
+    cube = {"rows": len(df), "measures": df[names].fillna(0).to_numpy(dtype="float64"), "columns": {}}
     for col in df.columns:
-        if df[col].dtype == 'object':
+        if col in names:
+            continue
+        if col == "MONTH":
+            cube["month"] = pd.to_datetime(df[col]).to_numpy(dtype="datetime64[D]")
+        else:
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+            # Sidebar selections are strings, so filters match against the string labels
+            cube["columns"][col] = (codes, np.asarray(uniques.astype(str)), uniques)
+    return cube
+
+
+def month_range(values: list):
+    """Return a date filter's [start, end) as dates if it covers whole months, else None."""
+    start, end = (np.datetime64(value, "D") for value in values)
+    if start == start.astype("datetime64[M]") and end == end.astype("datetime64[M]"):
+        return start, end
+    return None
+
+
+def run_cube(query: dict):
+    """Answer a compiled query from its cube, or return None if a filter needs the warehouse."""
+    spec = query["cube"]
+    filters = [(key, spec["filters"][key], values) for key, values in active_filters if key in spec["filters"]]
+    if any(key == "date" and month_range(values) is None for key, _, values in filters):
+        return None
+
+    cube = incremental_cube(spec) if spec.get("watermark") else load_cube(spec["sql"], spec["measures"])
+    mask = np.ones(cube["rows"], dtype=bool)
+    for key, column, values in filters:
+        if key == "date":
+            start, end = month_range(values)
+            mask &= (cube["month"] >= start) & (cube["month"] < end)
+        else:
+            codes, labels, _ = cube["columns"][column]
+            mask &= np.isin(codes, np.flatnonzero(np.isin(labels, values)))
+    measures = cube["measures"][mask]
+    names = [f"M{i}" for i in range(spec["measures"])]
+    dimensions = spec["dimensions"]
+    if not dimensions:
+        return pd.DataFrame([measures.sum(axis=0)], columns=names)
+
+    # Sum the measures per combination of dimension codes
+    codes = [cube["columns"][dim][0][mask] for dim in dimensions]
+    sizes = [len(cube["columns"][dim][2]) for dim in dimensions]
+    groups, inverse = np.unique(np.ravel_multi_index(codes, sizes), return_inverse=True)
+    df = pd.DataFrame({
+        dim: cube["columns"][dim][2][dim_codes]
+        for dim, dim_codes in zip(dimensions, np.unravel_index(groups, sizes))
+    })
+    for i, name in enumerate(names):
+        df[name] = np.bincount(inverse, weights=measures[:, i], minlength=len(groups))
+    if dimensions == ["LABEL"]:
+        return df.sort_values(names[0], ascending=False, ignore_index=True)
+    return df.sort_values(dimensions, ignore_index=True)
+
+
+def run_filtered(query: dict) -> pd.DataFrame:
+    """Run a compiled KPI or chart query with the sidebar filters applied."""
+    if CUBE and query.get("cube"):
+        start = time.perf_counter()
+        df = run_cube(query)
+        if df is not None:
+            if tracing:
+                trace("query", query["cube"]["sql"], start, cache="cube", **frame_stats(df))
+            return df
+    if query.get("watermark"):
+        return run_incremental(query)
+    return run_query(*apply_filters(query))
+
+
+# Cold loads submit every query of a section at once, so latency is that of
+# the slowest query rather than the sum. Snowpark sessions accept concurrent
+# queries from several threads; cached results return immediately.
+QUERY_WORKERS = 8
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+    add_script_run_ctx = get_script_run_ctx = None
+
+
+def run_concurrently(queries: list, return_exceptions: bool = False) -> list:
+    """Run compiled queries on a thread pool and collect results as they finish."""
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+
+    def run(query):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return run_filtered(query)
+
+    results = [None] * len(queries)
+    with ThreadPoolExecutor(max_workers=max(1, min(QUERY_WORKERS, len(queries)))) as pool:
+        futures = {pool.submit(run, query): i for i, query in enumerate(queries)}
+        for future in as_completed(futures):
             try:
-                # Check if it's a Decimal type
-                if hasattr(df[col].iloc[0], 'as_tuple'):
-                    df[col] = df[col].astype(float)
-            except:
-                pass
-'''
-    
-    # Assign dataframes
-    for table in template["tables"]:
-        app_code += f'''{table}_df = data["{table}"]
-'''
-    
-    app_code += f'''
+                results[futures[future]] = future.result()
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[futures[future]] = e
+    return results
 
-# Dashboard Title
-st.title("{template["title"]}")
-st.markdown("---")
 
-# KPI Row
-st.subheader("Key Performance Indicators")
-kpi_cols = st.columns({len(template["kpis"])})
+def measure(row, column: str) -> float:
+    """Read a measure; SUM over no rows comes back as NULL."""
+    return 0.0 if pd.isna(row[column]) else float(row[column])
 
-'''
-    
-    # Add KPIs
-    for i, (name, formula, icon) in enumerate(template["kpis"]):
-        app_code += f'''with kpi_cols[{i}]:
-    st.metric(
-        label="{icon} {name}",
-        value={formula}
+
+def measure_value(row, value) -> float:
+    """Combine a result row's additive measures into the displayed value."""
+    if value[0] == "ratio":
+        denominator = measure(row, value[2])
+        return measure(row, value[1]) * value[3] / denominator if denominator else 0.0
+    return measure(row, value[1])
+
+
+def render_map(chart: dict):
+    """Draw a map chart from grid cells aggregated in Snowflake, or sampled points when zoomed in."""
+    levels = {level["label"]: level for level in chart["levels"]}
+    level = levels[st.selectbox("Zoom", list(levels), key=f"{chart['name']}_zoom")]
+    bounds = None
+    if level["span"] is None:
+        df = run_filtered(chart)
+    else:
+        # Centers are clamped so the view never crosses the poles or the date line
+        half_lat, half_lon = level["span"][0] / 2, level["span"][1] / 2
+        center_cols = st.columns(2)
+        with center_cols[0]:
+            center_lat = st.slider("Center latitude", -90.0 + half_lat, 90.0 - half_lat, 0.0,
+                                   key=f"{chart['name']}_lat")
+        with center_cols[1]:
+            center_lon = st.slider("Center longitude", -180.0 + half_lon, 180.0 - half_lon, 0.0,
+                                   key=f"{chart['name']}_lon")
+        bounds = [center_lat - half_lat, center_lat + half_lat, center_lon - half_lon, center_lon + half_lon]
+        view = (f"{chart['lat']} BETWEEN ? AND ? AND {chart['lon']} BETWEEN ? AND ?", bounds)
+        df = run_query(*apply_filters({"sql": level["sql"], "filters": chart["filters"]}, [view]))
+
+    start = time.perf_counter()
+    if level["cell"] is None:
+        flagged = df["FLAGGED"].astype(int) == 1
+        fig = go.Figure([
+            go.Scattergeo(lat=df.loc[mask, "LAT"].tolist(), lon=df.loc[mask, "LON"].tolist(), mode="markers",
+                          name=name, marker=dict(size=5, color=color))
+            for name, mask, color in [("Other", ~flagged, "#9aa5b1"), ("Flagged", flagged, "#d62728")]
+        ])
+        shown = f"{len(df):,} sampled rows"
+    else:
+        cell = level["cell"]
+        values = [measure_value(row, chart["value"]) for _, row in df.iterrows()]
+        counts = df[chart["count"]].astype(float)
+        sizes = (4 + 16 * (counts / max(counts.max(), 1)) ** 0.5).tolist() if len(df) else []
+        fig = go.Figure(go.Scattergeo(
+            lat=((df["LAT_BIN"].astype(float) + 0.5) * cell).tolist(),
+            lon=((df["LON_BIN"].astype(float) + 0.5) * cell).tolist(),
+            mode="markers",
+            text=[f"{value:,.2f} ({count:,.0f} rows)" for value, count in zip(values, counts)],
+            marker=dict(size=sizes, color=values, colorscale="Reds", showscale=True,
+                        colorbar=dict(title=chart["y_label"])),
+        ))
+        shown = f"{len(df):,} cells of {cell}°"
+    if bounds:
+        fig.update_geos(lataxis_range=bounds[:2], lonaxis_range=bounds[2:])
+    fig.update_layout(margin=dict(l=0, r=0, t=0, b=0))
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{shown} (at most {level['max_rows']:,})")
+    if tracing:
+        trace("render", chart["name"], start, points=len(df))
+
+
+def render_chart(chart: dict, df: pd.DataFrame = None):
+    """Draw the aggregated chart data with Plotly graph objects, querying it unless df is given."""
+    if chart["type"] == "map":
+        return render_map(chart)
+    if df is None:
+        df = run_filtered(chart)
+    start = time.perf_counter()
+    values = [measure_value(row, chart["value"]) for _, row in df.iterrows()]
+
+    if chart["type"] == "pie":
+        fig = go.Figure(go.Pie(labels=df["LABEL"].astype(str).tolist(), values=values, hole=0.4))
+    elif chart["type"] == "bar":
+        fig = go.Figure(go.Bar(x=df["LABEL"].astype(str).tolist(), y=values))
+        fig.update_layout(xaxis_title="", yaxis_title=chart["y_label"])
+    elif chart["type"] == "histogram":
+        # Bins come from WIDTH_BUCKET in the query; fill in empty buckets
+        low, high = chart["range"]
+        width = (high - low) / chart["bins"]
+        counts = dict(zip(df["BUCKET"].astype(int).tolist(), values))
+        labels = [f"{low + i * width:.0f}-{low + (i + 1) * width:.0f}" for i in range(chart["bins"])]
+        fig = go.Figure(go.Bar(x=labels, y=[counts.get(i + 1, 0) for i in range(chart["bins"])]))
+        fig.update_layout(xaxis_title=chart["x_label"], yaxis_title="Frequency")
+    else:
+        periods = pd.to_datetime(df["PERIOD"]).dt.strftime("%Y-%m").tolist()
+        fig = go.Figure(go.Scatter(x=periods, y=values, mode="lines+markers"))
+        fig.update_layout(xaxis_title="Period", yaxis_title=chart["y_label"])
+    st.plotly_chart(fig, use_container_width=True)
+    if tracing:
+        trace("render", chart["name"], start, points=len(df))
+
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def compact_frame(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Convert fetched columns to the compact dtypes derived from SCHEMAS."""
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        if dtype == "integer":
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def estimate_table_bytes(page_df: pd.DataFrame, total_rows: int) -> float:
+    """Extrapolate a page's memory to total_rows rows.
+
+    Per-row costs scale with the row count; a category column's dictionary is
+    counted once, since the whole table would share a single one. Dictionary
+    values missing from the page are not counted.
+    """
+    rows = max(len(page_df), 1)
+    total = 0.0
+    for col in page_df.columns:
+        series = page_df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            total += series.cat.codes.nbytes / rows * total_rows
+            total += series.cat.categories.memory_usage(deep=True)
+        else:
+            total += series.memory_usage(deep=True, index=False) / rows * total_rows
+    return total
+
+
+@st.cache_data(ttl=600, max_entries=64)
+def load_page(name: str, columns: tuple, sort_column: str, descending: bool, page: int, page_size: int,
+              where: str, params: tuple) -> pd.DataFrame:
+    """Fetch one page of a table; filtering, column selection, sorting and paging run in Snowflake."""
+    table = TABLES[name]
+    # Columns are cast from their SCHEMAS types, so no conversion is needed after fetching
+    columns = [table["select"][col] for col in columns if col in table["columns"]] or list(table["select"].values())
+    direction = "DESC" if descending else "ASC"
+    order_by = f"{sort_column} {direction}"
+    if sort_column != table["key"]:
+        # Tie-break on the primary key so rows never repeat or vanish between pages
+        order_by += f", {table['key']} {direction}"
+    sql = (
+        f"SELECT {', '.join(columns)} FROM {table['table']} AS {name.upper()} WHERE {where} "
+        f"ORDER BY {order_by} LIMIT {int(page_size)} OFFSET {(int(page) - 1) * int(page_size)}"
     )
+    return compact_frame(fetch(sql, params), table["dtypes"])
 
-'''
-    
-    app_code += '''st.markdown("---")
 
-# Filters Sidebar
-st.sidebar.header("Filters")
-'''
-    
-    # Add date filter
-    app_code += '''
-# Date range filter (if applicable)
-date_col = st.sidebar.date_input(
-    "Date Range",
-    value=[],
-    help="Filter data by date range"
-)
+# Sections are fragments: interacting with a widget inside one reruns only
+# that section. st.fragment needs Streamlit 1.37+; older runtimes (including
+# Snowflake's) fall back to experimental_fragment or a plain function call.
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
 
-st.markdown("---")
 
-# Charts Section
-st.subheader("Analytics")
+@fragment
+def kpi_section():
+    """Key performance indicators; fetches only the KPI aggregates."""
+    with section("kpis"):
+        results = run_concurrently(list(KPI_QUERIES.values()))
+        start = time.perf_counter()
+        kpi_results = {source: df.iloc[0] for source, df in zip(KPI_QUERIES, results)}
+        kpi_cols = st.columns(len(KPIS))
+        for kpi_col, kpi in zip(kpi_cols, KPIS):
+            with kpi_col:
+                st.metric(
+                    label=f"{kpi['icon']} {kpi['label']}",
+                    value=kpi["format"].format(measure_value(kpi_results[kpi["query"]], kpi["value"]))
+                )
+        if tracing:
+            trace("render", "kpis", start, points=len(KPIS))
 
-'''
-    
-    # Add charts in 2-column layout
-    charts = template["charts"]
-    for i in range(0, len(charts), 2):
-        app_code += f'''chart_cols_{i//2} = st.columns(2)
 
+@fragment
+def chart_group(charts: list):
+    """A row of up to two charts; fetches only their aggregates, concurrently."""
+    with section("charts:" + ",".join(chart["name"] for chart in charts)):
+        # Maps query the zoom level they show, so they fetch while rendering
+        queried = [chart for chart in charts if chart["type"] != "map"]
+        frames = dict(zip([chart["name"] for chart in queried],
+                          run_concurrently(queried, return_exceptions=True)))
+        chart_cols = st.columns(2)
+        for chart_col, chart in zip(chart_cols, charts):
+            with chart_col:
+                st.markdown(f"**{chart['title']}**")
+                df = frames.get(chart["name"])
+                try:
+                    if isinstance(df, Exception):
+                        raise df
+                    render_chart(chart, df)
+                except Exception as e:
+                    st.error(f"Error loading chart: {e}")
+
+
+@fragment
+def exploration_section():
+    """Paged table browser; paging and sorting rerun only this section."""
+    with section("exploration"):
+        table_selection = st.selectbox(
+            "Select a table to explore",
+            options=list(TABLES.keys())
+        )
+        if not table_selection:
+            return
+
+        table = TABLES[table_selection]
+        where, params = apply_filters({"sql": "{filters}", "filters": table["filters"]})
+        count_sql = f"SELECT COUNT(*) AS ROW_COUNT FROM {table['table']} AS {table_selection.upper()} WHERE {where}"
+        total_rows = int(run_query(count_sql, params).iloc[0]["ROW_COUNT"])
+
+        option_cols = st.columns([3, 2, 1, 1])
+        with option_cols[0]:
+            selected_columns = st.multiselect("Columns", options=table["columns"], default=table["columns"])
+        with option_cols[1]:
+            sort_column = st.selectbox("Sort by", options=table["columns"], index=table["columns"].index(table["key"]))
+        with option_cols[2]:
+            descending = st.checkbox("Descending", value=False)
+        with option_cols[3]:
+            page_size = st.selectbox("Rows per page", options=PAGE_SIZES, index=2)
+
+        page_count = max(1, -(-total_rows // page_size))
+        page = int(st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1))
+
+        page_df = cached(f"{table_selection} page {page}", load_page, table_selection, tuple(selected_columns),
+                         sort_column, descending, page, page_size, where, params)
+        start = time.perf_counter()
+        st.dataframe(page_df, use_container_width=True)
+        if tracing:
+            trace("render", f"{table_selection} page {page}", start, points=len(page_df))
+        first_row = min((page - 1) * page_size + 1, total_rows)
+        last_row = min(page * page_size, total_rows)
+        st.caption(f"Showing rows {first_row:,}-{last_row:,} of {total_rows:,} total rows (page {page} of {page_count})")
+
+        page_bytes = int(page_df.memory_usage(deep=True).sum())
+        table_bytes = estimate_table_bytes(page_df, total_rows)
+        st.caption(f"Memory: {page_bytes / 1024:,.1f} KB for this page; all {total_rows:,} rows estimated "
+                   f"from this page at ~{table_bytes / 1024 ** 2:,.1f} MB")
+
+
+# Dashboard Title
 '''
-        for j, chart_idx in enumerate([i, i+1]):
-            if chart_idx < len(charts):
-                chart_name, chart_type, chart_title, chart_data = charts[chart_idx]
-                
-                app_code += f'''with chart_cols_{i//2}[{j}]:
-    st.markdown("**{chart_title}**")
-    try:
-        chart_data_{chart_name} = {chart_data}
+
+    app_code += f'''st.title("{template["title"]}")
+st.markdown("---")
 '''
-                
-                if chart_type == "pie":
-                    app_code += f'''        fig = px.pie(
-            values=chart_data_{chart_name}.values,
-            names=chart_data_{chart_name}.index,
-            hole=0.4
+
+    app_code += '''
+# Filters Sidebar
+st.sidebar.header("Filters")
+active_filters = []
+with section("filters"):
+    filter_options = run_concurrently([{"sql": flt["options_sql"], "filters": {}} for flt in FILTERS])
+    for flt, options in zip(FILTERS, filter_options):
+        selected = st.sidebar.multiselect(
+            flt["label"],
+            options=options["VALUE"].astype(str).tolist()
         )
-        st.plotly_chart(fig, use_container_width=True)
-'''
-                elif chart_type == "bar":
-                    app_code += f'''        fig = px.bar(
-            x=chart_data_{chart_name}.index,
-            y=chart_data_{chart_name}.values
+        if selected:
+            # Sorted so the same selection always hits the same cache entry
+            active_filters.append((flt["key"], sorted(selected)))
+
+    if DATE_FILTER:
+        date_range = st.sidebar.date_input(
+            DATE_FILTER["label"],
+            value=[],
+            help="Filter data by date range"
         )
-        fig.update_layout(xaxis_title="", yaxis_title="Count")
-        st.plotly_chart(fig, use_container_width=True)
-'''
-                elif chart_type == "histogram":
-                    # Use manual binning with bar chart - px.histogram doesn't work well with Snowflake Decimal types
-                    col_match = chart_data.split("['")[-1].split("']")[0] if "['" in chart_data else "value"
-                    df_name = chart_data.split("[")[0]
-                    app_code += f'''        # Convert to float and bin manually for Plotly compatibility
-        col_data = {df_name}['{col_match}'].astype(float)
-        min_val, max_val = col_data.min(), col_data.max()
-        bin_edges = [min_val + i * (max_val - min_val) / 5 for i in range(6)]
-        bin_labels = [f"{{bin_edges[i]:.0f}}-{{bin_edges[i+1]:.0f}}" for i in range(5)]
-        binned = pd.cut(col_data, bins=bin_edges, labels=bin_labels, include_lowest=True)
-        bin_counts = binned.value_counts().sort_index()
-        fig = px.bar(x=bin_counts.index.astype(str), y=bin_counts.values)
-        fig.update_layout(xaxis_title="{col_match}", yaxis_title="Frequency")
-        st.plotly_chart(fig, use_container_width=True)
-'''
-                elif chart_type == "line":
-                    app_code += f'''        monthly_df = chart_data_{chart_name}.reset_index(name='count')
-        monthly_df.columns = ['period', 'count']
-        monthly_df = monthly_df.sort_values('period')
-        fig = px.line(monthly_df, x='period', y='count', markers=True)
-        fig.update_layout(xaxis_title="Period", yaxis_title="Count")
-        st.plotly_chart(fig, use_container_width=True)
-'''
-                
-                app_code += f'''    except Exception as e:
-        st.error(f"Error loading chart: {{e}}")
+        if len(date_range) == 2:
+            active_filters.append(("date", [date_range[0].isoformat(), (date_range[1] + timedelta(days=1)).isoformat()]))
 
-'''
-    
-    # Add data exploration section
-    app_code += '''st.markdown("---")
+# KPI Row
+st.subheader("Key Performance Indicators")
+kpi_section()
 
-# Data Exploration
-st.subheader("Data Exploration")
+st.markdown("---")
 
-table_selection = st.selectbox(
-    "Select a table to explore",
-    options=list(data.keys())
-)
+# Charts and Data Exploration are separate views. st.tabs would run (and
+# fetch for) every tab on each run, so only the selected view is executed.
+view = st.radio("View", ["📈 Analytics", "🔍 Data Exploration"], horizontal=True,
+                label_visibility="collapsed", key="view")
 
-if table_selection:
-    st.dataframe(
-        data[table_selection].head(100),
-        use_container_width=True
-    )
-    st.caption(f"Showing first 100 rows of {len(data[table_selection])} total rows")
+if view == "📈 Analytics":
+    for i in range(0, len(CHARTS), 2):
+        chart_group(CHARTS[i:i + 2])
+else:
+    exploration_section()
+
+# Performance panel: the events recorded during this run, slowest first.
+# Fragment reruns record into the same list but do not redraw the panel.
+if PERFORMANCE_PANEL:
+    with st.sidebar.expander("⏱️ Performance"):
+        st.checkbox("Record query and render timings", key="performance_panel")
+        if tracing and trace_events:
+            events = pd.DataFrame(trace_events)
+            queries = events[events["kind"] == "query"]
+            fetched = queries[queries["cache"] == "miss"]
+            st.caption(
+                f"{len(queries)} queries ({len(fetched)} fetched, {len(queries) - len(fetched)} from cache or cube), "
+                f"{int(fetched['rows'].sum()):,} rows / {fetched['bytes'].sum() / 1024:,.1f} KB fetched, "
+                f"{(events['kind'] == 'render').sum()} renders"
+            )
+            st.dataframe(events.sort_values("ms", ascending=False), use_container_width=True)
 
 # Footer
 st.markdown("---")
 st.caption("Dashboard powered by Snowflake & Streamlit")
 '''
-    
+
     return app_code
 
 
+def duckdb_type(sql_type: str) -> str:
+    """Map a SCHEMAS column type onto the DuckDB type used to read generated files."""
+    base_type = sql_type.split("(")[0].upper()
+    if base_type == "VARCHAR":
+        return "VARCHAR"
+    if base_type == "INTEGER":
+        return "BIGINT"
+    return sql_type.upper()
+
+
+def generate_data_access(dataset_type: str, config: dict) -> str:
+    """Generate data_access.py: the Snowflake session, or a local DuckDB stand-in."""
+    template = DASHBOARD_TEMPLATES.get(dataset_type, DASHBOARD_TEMPLATES["ecommerce"])
+    schema_def = SCHEMAS.get(dataset_type, SCHEMAS["ecommerce"])
+    sf_config = config.get("snowflake", {})
+    database = sf_config.get("database") or config.get("database", "DEMO_DB")
+    schema = sf_config.get("schema") or config.get("schema", "PUBLIC")
+
+    tables = {table: {col[0]: duckdb_type(col[1]) for col in schema_def["tables"][table]["columns"]}
+              for table in table_load_order(schema_def)}
+    summaries = {}
+    if config.get("summary_tables", True):
+        compiled = compile_dashboard(dataset_type, database, schema, summaries=True)
+        for query in list(compiled["kpi_queries"].values()) + compiled["charts"]:
+            if query.get("summary"):
+                summaries[query["summary"]["table"]] = query["summary"]["sql"]
+
+    code = f'''"""
+Data access for the {template["title"]}.
+
+Auto-generated by generate_streamlit.py. The dashboard runs every query
+through connect(): inside Snowflake that is the active Snowpark session; with
+DASHBOARD_BACKEND=duckdb it is a local DuckDB session over the files
+generate_data.py wrote, so the same KPI and chart SQL runs offline.
+
+Local usage:
+    DASHBOARD_BACKEND=duckdb streamlit run streamlit_app.py
+
+DASHBOARD_DATA_DIR overrides the data directory (default: ../data).
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+BACKEND = os.environ.get("DASHBOARD_BACKEND", "snowflake").lower()
+DATA_DIR = Path(os.environ.get("DASHBOARD_DATA_DIR", Path(__file__).resolve().parent.parent / "data"))
+
+DATABASE = "{database}"
+SCHEMA = "{schema}"
+
+# Column types from SCHEMAS, used when reading CSV files
+TABLES = {_py_literal(tables)}
+
+# Summary tables (summary_tables.sql) built locally from the loaded data
+SUMMARY_TABLES = {_py_literal(summaries)}
+'''
+
+    code += '''
+
+def source_sql(table: str, columns: dict, data_dir: Path = DATA_DIR) -> tuple:
+    """Return (kind, SQL reading the table's files): a Parquet view or a CSV load."""
+    parquet = data_dir / f"{table}.parquet"
+    if parquet.exists():
+        return "VIEW", f"SELECT * FROM read_parquet('{parquet.as_posix()}')"
+    directory = data_dir / table
+    # Directories of parts, e.g. the date=YYYY-MM-DD partitions of fact tables;
+    # the partition key is not added as a column, the files carry the date already
+    if directory.is_dir() and any(directory.rglob("*.parquet")):
+        return "VIEW", f"SELECT * FROM read_parquet('{directory.as_posix()}/**/*.parquet', hive_partitioning = false)"
+    csv = data_dir / f"{table}.csv"
+    if directory.is_dir():
+        csv, options = directory / "**" / "*.csv", ", hive_partitioning = false"
+    elif csv.exists():
+        options = ""
+    else:
+        raise FileNotFoundError(f"No data for {table} in {data_dir} (expected {table}.csv or {table}.parquet)")
+    types = ", ".join(f"'{col}': '{sql_type}'" for col, sql_type in columns.items())
+    # CSV is parsed once into a DuckDB table; Parquet is scanned in place
+    return "TABLE", f"SELECT * FROM read_csv('{csv.as_posix()}', header = true, types = {{{types}}}{options})"
+
+
+class LocalResult:
+    """Deferred query result, mirroring the Snowpark DataFrame methods the app calls."""
+
+    def __init__(self, connection, sql: str, params: list = None):
+        self._connection = connection
+        self._sql = sql
+        self._params = params or []
+
+    def to_pandas(self):
+        # A cursor per call lets the dashboard's worker threads query concurrently
+        return self._connection.cursor().execute(self._sql, self._params).df()
+
+
+class LocalSession:
+    """The subset of the Snowpark Session API the dashboard uses, backed by DuckDB."""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        import duckdb
+
+        self._connection = duckdb.connect()
+        # Attach a database named like the Snowflake one so qualified names resolve unchanged
+        self._connection.execute(f"ATTACH ':memory:' AS {DATABASE}")
+        self._connection.execute(f"CREATE SCHEMA IF NOT EXISTS {DATABASE}.{SCHEMA}")
+        # DuckDB has no WIDTH_BUCKET; callers clamp out-of-range buckets
+        self._connection.execute(
+            "CREATE MACRO WIDTH_BUCKET(x, lo, hi, n) AS CAST(FLOOR((x - lo) * n / (hi - lo)) AS BIGINT) + 1"
+        )
+        for table, columns in TABLES.items():
+            kind, sql = source_sql(table, columns, data_dir)
+            self._connection.execute(f"CREATE {kind} {DATABASE}.{SCHEMA}.{table.upper()} AS {sql}")
+        for name, sql in SUMMARY_TABLES.items():
+            self._connection.execute(f"CREATE TABLE {name} AS {sql}")
+
+    def sql(self, query: str, params: list = None) -> LocalResult:
+        return LocalResult(self._connection, query, params)
+
+    def table(self, name: str) -> LocalResult:
+        return LocalResult(self._connection, f"SELECT * FROM {name}")
+
+
+# Section probe installed by benchmark_streamlit.py; None in normal runs
+PROBE = None
+
+
+@contextmanager
+def section(name: str):
+    """Mark a dashboard section so an installed probe can time it and attribute its fetches."""
+    if PROBE is None:
+        yield
+        return
+    with PROBE.section(name):
+        yield
+
+
+def connect():
+    """Return the session the dashboard queries: Snowpark, or DuckDB when running locally."""
+    if BACKEND == "duckdb":
+        return LocalSession()
+    from snowflake.snowpark.context import get_active_session
+    return get_active_session()
+'''
+    return code
+
+
 def generate_snowflake_yml(dataset_type: str, config: dict, output_dir: Path):
     """Generate snowflake.yml deployment manifest."""
     
@@ -313,6 +1437,7 @@ entities:
     main_file: streamlit_app.py
     artifacts:
       - streamlit_app.py
+      - data_access.py
       - environment.yml
 '''
     
@@ -332,6 +1457,7 @@ dependencies = [
     "pandas>=2.0.0",
     "plotly>=5.18.0",
     "snowflake-snowpark-python>=1.40.0",
+    "duckdb>=1.0.0",
 ]
 '''
 
@@ -345,18 +1471,71 @@ channels:
 dependencies:
   - plotly
   - pandas
+  - pyarrow
 '''
 
 
+# Stage path of every part file in a Hive-style date layout (generate_data.py --layout hive)
+PARTITION_PATTERN = "date=[0-9]{{4}}-[0-9]{{2}}-[0-9]{{2}}/part-[0-9]+[.]{ext}"
+
+
+def partitioned_load_sql(table: str, table_def: dict, column: str, file_format: str,
+                         external_stage: str = None) -> list:
+    """COPY INTO with a PATTERN over <table>/date=YYYY-MM-DD/ files, plus an optional external table.
+
+    Each date partition is its own set of files, so loads can be split by
+    period (one PATTERN per month, say) and run in parallel. An external table
+    over an external stage exposes the date in the path as a partition column,
+    so queries filtered on it only read the matching files.
+    """
+    pattern = PARTITION_PATTERN.format(ext=file_format)
+    copy_options = "\n    MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE" if file_format == "parquet" else ""
+    lines = [
+        f"-- Load {table} ({table}/date=YYYY-MM-DD/part-N.{file_format}, partitioned by {column.upper()})",
+        f"-- Upload keeping the date= directories, e.g.:",
+        f"-- snow stage copy <PATH_TO_DATA>/{table} @synthetic_data_stage/{table}/ --recursive",
+        f"-- To load one period, narrow the pattern, e.g. PATTERN = '.*date=2025-06-[0-9]{{2}}/.*'",
+        f"COPY INTO {table.upper()} FROM @synthetic_data_stage/{table}/",
+        f"    PATTERN = '.*{pattern}'",
+        f"    FILE_FORMAT = (FORMAT_NAME = {file_format}_format){copy_options};",
+        "",
+    ]
+    if not external_stage:
+        return lines
+
+    columns = ["    PARTITION_DATE DATE AS TO_DATE(SPLIT_PART(SPLIT_PART(METADATA$FILENAME, 'date=', 2), '/', 1))"]
+    for i, (col_name, col_type, _, _) in enumerate(table_def['columns'], start=1):
+        field = f"c{i}" if file_format == "csv" else col_name
+        columns.append(f"    {col_name.upper()} {col_type} AS (VALUE:{field}::{col_type})")
+    lines.extend([
+        f"-- Partition-pruned external table over the same layout on {external_stage}",
+        f"CREATE OR REPLACE EXTERNAL TABLE {table.upper()}_EXT (",
+        ",\n".join(columns),
+        ")",
+        "PARTITION BY (PARTITION_DATE)",
+        f"LOCATION = @{external_stage}/{table}/",
+        f"PATTERN = '.*{pattern}'",
+        f"FILE_FORMAT = (FORMAT_NAME = {file_format}_format)",
+        "AUTO_REFRESH = FALSE;",
+        "",
+    ])
+    return lines
+
+
 def generate_load_data_sql(dataset_type: str, config: dict, output_dir: Path):
-    """Generate SQL to load CSV data into Snowflake."""
+    """Generate SQL to load CSV or Parquet data into Snowflake.
+
+    Follows the config's `file_format` and `layout` (see generate_data.py);
+    with the hive layout, fact tables are loaded from their date partitions.
+    """
     
     # Check both nested and top-level config for database/schema
     sf_config = config.get("snowflake", {})
     database = sf_config.get("database") or config.get("database", "DEMO_DB")
     schema = sf_config.get("schema") or config.get("schema", "PUBLIC")
     
-    template = DASHBOARD_TEMPLATES.get(dataset_type, DASHBOARD_TEMPLATES["ecommerce"])
+    file_format = config.get("file_format", "csv")
+    layout = config.get("layout", "flat")
     
     sql_lines = [
         f"-- Load synthetic data into Snowflake",
@@ -365,27 +1544,50 @@ def generate_load_data_sql(dataset_type: str, config: dict, output_dir: Path):
         f"USE DATABASE {database};",
         f"USE SCHEMA {schema};",
         "",
-        "-- Create file format for CSV",
-        "CREATE OR REPLACE FILE FORMAT csv_format",
-        "    TYPE = 'CSV'",
-        "    FIELD_OPTIONALLY_ENCLOSED_BY = '\"'",
-        "    SKIP_HEADER = 1",
-        "    NULL_IF = ('', 'NULL');",
-        "",
+    ]
+    if file_format == "parquet":
+        sql_lines.extend([
+            "-- Create file format for Parquet",
+            "CREATE OR REPLACE FILE FORMAT parquet_format",
+            "    TYPE = 'PARQUET';",
+            "",
+        ])
+    else:
+        sql_lines.extend([
+            "-- Create file format for CSV",
+            "CREATE OR REPLACE FILE FORMAT csv_format",
+            "    TYPE = 'CSV'",
+            "    FIELD_OPTIONALLY_ENCLOSED_BY = '\"'",
+            "    SKIP_HEADER = 1",
+            "    NULL_IF = ('', 'NULL');",
+            "",
+        ])
+    sql_lines.extend([
         "-- Create stage for data loading",
         f"CREATE OR REPLACE STAGE synthetic_data_stage",
-        "    FILE_FORMAT = csv_format;",
+        f"    FILE_FORMAT = {file_format}_format;",
         "",
-    ]
+    ])
     
-    for table in template["tables"]:
+    # Typed tables with clustering keys (see generate_schema.py), parents first
+    schema_def = SCHEMAS.get(dataset_type, SCHEMAS["ecommerce"])
+    sql_lines.append(generate_ddl(schema_def, search_optimization=config.get("search_optimization", False)))
+
+    copy_options = " MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE" if file_format == "parquet" else ""
+    for table in table_load_order(schema_def):
+        table_def = schema_def['tables'][table]
+        column = partition_column(table_def) if layout == "hive" else None
+        if column:
+            sql_lines.extend(partitioned_load_sql(table, table_def, column, file_format, config.get("external_stage")))
+            continue
         sql_lines.extend([
             f"-- Load {table}",
-            f"-- PUT file://<PATH_TO_DATA>/{table}.csv @synthetic_data_stage/{table}/;",
-            f"-- CREATE OR REPLACE TABLE {table.upper()} AS SELECT * FROM @synthetic_data_stage/{table}/ (FILE_FORMAT => csv_format);",
+            f"-- PUT file://<PATH_TO_DATA>/{table}.{file_format} @synthetic_data_stage/{table}/;",
+            f"COPY INTO {table.upper()} FROM @synthetic_data_stage/{table}/ "
+            f"FILE_FORMAT = (FORMAT_NAME = {file_format}_format){copy_options};",
             "",
         ])
-    
+
     return "\n".join(sql_lines)
 
 
@@ -421,6 +1623,10 @@ def main():
     with open(streamlit_dir / "streamlit_app.py", 'w') as f:
         f.write(app_code)
     print(f"  Written: streamlit_app.py")
+
+    with open(streamlit_dir / "data_access.py", 'w') as f:
+        f.write(generate_data_access(dataset_type, config))
+    print(f"  Written: data_access.py")
     
     with open(streamlit_dir / "snowflake.yml", 'w') as f:
         f.write(yml_content)
@@ -437,14 +1643,27 @@ def main():
     with open(output_dir / "load_data.sql", 'w') as f:
         f.write(sql_content)
     print(f"  Written: load_data.sql")
+
+    summary_tables = config.get("summary_tables", True)
+    if summary_tables:
+        with open(output_dir / "summary_tables.sql", 'w') as f:
+            f.write(generate_summary_sql(dataset_type, config))
+        print(f"  Written: summary_tables.sql")
     
     print("")
     print("Streamlit app generated successfully!")
     print(f"  Location: {streamlit_dir}")
     print("")
+    print("To run locally against the generated files (no Snowflake connection):")
+    print("  cd streamlit_app && DASHBOARD_BACKEND=duckdb streamlit run streamlit_app.py")
+    print("")
     print("Next steps:")
     print("  1. Load CSV data into Snowflake using load_data.sql")
-    print("  2. Deploy the app: cd streamlit_app && snow streamlit deploy --replace")
+    if summary_tables:
+        print("  2. Create the dashboard summary tables using summary_tables.sql")
+        print("  3. Deploy the app: cd streamlit_app && snow streamlit deploy --replace")
+    else:
+        print("  2. Deploy the app: cd streamlit_app && snow streamlit deploy --replace")
 
 
 if __name__ == "__main__":
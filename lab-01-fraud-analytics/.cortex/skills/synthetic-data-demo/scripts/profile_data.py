@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+profile_data.py - Single-pass sketch profiles of generated datasets.
+
+Streams every table of a generated dataset once (CSV from generate_data.py, or
+Parquet) and keeps, per column, sketches of constant size:
+
+    HyperLogLog   distinct count (2^14 registers, ~1% error)
+    KLL           quantiles of numeric and timestamp columns (~1% rank error)
+    exact counts  value frequencies while a column has at most EXACT_LIMIT
+                  distinct values (booleans, statuses, categories)
+
+plus exact row, null, min, max and mean. The profile is then checked against
+the distributions the dataset is meant to have. These are derived from the
+column specs in generate_sql_data.DISTRIBUTIONS, which generate_data.py follows
+as well: choice weights, bernoulli rates (the 3% fraud rate), value ranges,
+null rates and date spans. EXPECTATIONS adds checks for columns computed by
+SQL expressions, such as the fraud amount range.
+
+Usage:
+    uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/profile_data.py \
+        --config /tmp/synthetic_data_config.json \
+        --input-dir ./output
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from generate_schema import SCHEMAS, table_load_order
+from generate_sql_data import DISTRIBUTIONS
+from table_files import CHUNK_ROWS, find_table, read_chunks, typed_frame
+
+# Columns with more distinct values than this keep only sketches
+EXACT_LIMIT = 64
+
+QUANTILES = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+# Checks for columns whose distribution is not a plain spec in DISTRIBUTIONS
+EXPECTATIONS = {
+    "financial_fraud": {
+        # 500-5000 for fraud, 5-500 otherwise
+        "transactions": {"amount": {"range": (5, 5000)}},
+        "fraud_labels": {"confidence_score": {"range": (0.01, 0.99)}},
+    },
+    "logistics": {
+        "deliveries": {"signature_captured": {"true_rate": 0.95 * 0.8}},
+    },
+    "healthcare": {
+        "prescriptions": {"dosage": {"frequencies": {f"{d}mg": 1 / 7 for d in (5, 10, 20, 50, 100, 250, 500)}}},
+    },
+    "ecommerce": {
+        "order_items": {"line_total": {"range": (10, 1500)}},
+    },
+}
+
+
+# =============================================================================
+# SKETCHES
+# =============================================================================
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over 64-bit hashes."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray):
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Position of the first 1-bit; rest < 2**53 so float log2 is exact
+        length = np.zeros(len(rest))
+        nonzero = rest > 0
+        length[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))) + 1
+        np.maximum.at(self.registers, index, (width - length + 1).astype(np.uint8))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+
+class KLLSketch:
+    """KLL quantile sketch: compactor levels whose capacities shrink by c toward level 0."""
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: int = 0):
+        self.k = k
+        self.c = c
+        self.levels = [np.zeros(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level: int) -> int:
+        return max(2, int(math.ceil(self.k * self.c ** (len(self.levels) - level - 1))))
+
+    def add(self, values: np.ndarray):
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.zeros(0))
+                items = np.sort(items)
+                keep = items[len(items) - len(items) % 2:]
+                items = items[:len(items) - len(items) % 2]
+                # Every other item survives with twice the weight
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[self.rng.integers(2)::2]])
+                self.levels[level] = keep
+            level += 1
+
+    def quantiles(self, qs: list) -> list:
+        values = np.concatenate(self.levels)
+        if not len(values):
+            return [None] * len(qs)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        return values[order][np.minimum(index, len(values) - 1)].tolist()
+
+
+# =============================================================================
+# COLUMN PROFILES
+# =============================================================================
+
+def column_kind(sql_type: str) -> str:
+    sql_type = sql_type.upper()
+    if sql_type.startswith(("DECIMAL", "INTEGER", "FLOAT", "DOUBLE", "NUMBER")):
+        return "numeric"
+    if sql_type.startswith(("TIMESTAMP", "DATE")):
+        return "timestamp"
+    if sql_type == "BOOLEAN":
+        return "boolean"
+    return "string"
+
+
+class ColumnProfile:
+    """Exact counters plus HLL and KLL sketches for one column."""
+
+    def __init__(self, sql_type: str):
+        self.kind = column_kind(sql_type)
+        self.rows = 0
+        self.nulls = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.counts = Counter()
+        self.distinct = HyperLogLog()
+        self.quantile_sketch = KLLSketch() if self.kind in ("numeric", "timestamp") else None
+
+    def update(self, values: pd.Series):
+        self.rows += len(values)
+        nulls = values.isna().to_numpy()
+        if self.kind == "string":
+            nulls = nulls | (values == "").to_numpy()
+        self.nulls += int(nulls.sum())
+        present = values[~nulls]
+        if not len(present):
+            return
+
+        if self.kind == "timestamp":
+            present = present.astype("datetime64[ns]").astype("int64") / 1e9
+        if self.kind in ("numeric", "timestamp"):
+            numbers = present.to_numpy("float64")
+            self.total += float(numbers.sum())
+            low, high = float(numbers.min()), float(numbers.max())
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+            self.quantile_sketch.add(numbers)
+            self.distinct.add(pd.util.hash_array(numbers))
+        else:
+            self.distinct.add(pd.util.hash_array(present.astype(str).to_numpy(dtype=object)))
+
+        if self.counts is not None:
+            self.counts.update(present.value_counts().to_dict())
+            if len(self.counts) > EXACT_LIMIT:
+                self.counts = None
+
+    @property
+    def present(self) -> int:
+        return self.rows - self.nulls
+
+    def quantiles(self) -> dict:
+        if self.quantile_sketch is None:
+            return {}
+        return dict(zip(QUANTILES, self.quantile_sketch.quantiles(QUANTILES)))
+
+    def summary(self) -> dict:
+        """JSON-ready description of the column."""
+        def show(value):
+            if value is None:
+                return None
+            if self.kind == "timestamp":
+                return pd.Timestamp(value, unit="s").isoformat()
+            return round(value, 6) if isinstance(value, float) else value
+
+        result = {"kind": self.kind, "rows": self.rows, "nulls": self.nulls,
+                  "null_rate": round(self.nulls / self.rows, 6) if self.rows else None,
+                  "distinct": len(self.counts) if self.counts is not None else self.distinct.count()}
+        if self.kind in ("numeric", "timestamp") and self.present:
+            result.update({"min": show(self.min), "max": show(self.max),
+                           "mean": show(self.total / self.present),
+                           "quantiles": {f"p{int(q * 100):02d}": show(v) for q, v in self.quantiles().items()}})
+        if self.counts is not None:
+            result["frequencies"] = {str(value): count for value, count in self.counts.most_common()}
+        return result
+
+
+def profile_table(path: Path, table_def: dict, chunk_rows: int) -> dict:
+    """One streaming pass over a table; returns {column: ColumnProfile}."""
+    profiles = {col[0]: ColumnProfile(col[1]) for col in table_def["columns"]}
+    for df in read_chunks(path, list(profiles), chunk_rows):
+        booleans = [name for name, profile in profiles.items() if profile.kind == "boolean" and name in df]
+        # typed_frame() maps missing booleans to False; keep them null here
+        missing = {name: (df[name].isna() | (df[name].astype(str) == "")).to_numpy() for name in booleans}
+        df = typed_frame(df, table_def)
+        for name, mask in missing.items():
+            df[name] = df[name].astype("boolean").mask(mask)
+        for name, profile in profiles.items():
+            if name in df.columns:
+                profile.update(df[name])
+    return profiles
+
+
+# =============================================================================
+# EXPECTED DISTRIBUTIONS
+# =============================================================================
+
+def spec_expectations(dataset_type: str, table: str, spec: tuple) -> dict:
+    """Checkable properties of a DISTRIBUTIONS column spec."""
+    kind = spec[0]
+    if kind == "bernoulli":
+        return {"true_rate": spec[1] / 100}
+    if kind == "choice":
+        values, weights = spec[1], (spec[2] if len(spec) > 2 else [1] * len(spec[1]))
+        return {"frequencies": {value: weight / sum(weights) for value, weight in zip(values, weights)}}
+    if kind == "index":
+        return {"frequencies": {value: 1 / len(spec[2]) for value in spec[2]}}
+    if kind == "const":
+        return {"frequencies": {spec[1]: 1.0}}
+    if kind in ("int", "decimal"):
+        return {"range": (spec[1], spec[2]), "median": (spec[1] + spec[2]) / 2}
+    if kind in ("timestamp", "date"):
+        # Both generators stay within the oldest offset; the recent end differs
+        # (Faker reads "-1m" as one minute)
+        return {"span_days": spec[1]}
+    if kind == "sometimes":
+        return {"null_rate": 1 - spec[1] / 100, **spec_expectations(dataset_type, table, spec[2])}
+    if kind == "ref":
+        # A referenced parent value keeps its range; other properties shift with FK sampling
+        dist = DISTRIBUTIONS[dataset_type][table]
+        fk = dist["columns"][spec[1]]
+        parent = fk[1] if fk[0] == "fk" else dist["rows"][1]
+        inherited = spec_expectations(dataset_type, parent, DISTRIBUTIONS[dataset_type][parent]["columns"][spec[2]])
+        return {name: value for name, value in inherited.items() if name in ("range", "true_rate", "span_days")}
+    return {}
+
+
+def dataset_expectations(dataset_type: str) -> dict:
+    """{table: {column: {check: expected}}} from DISTRIBUTIONS plus EXPECTATIONS."""
+    expected = {}
+    for table, table_def in SCHEMAS[dataset_type]["tables"].items():
+        specs = DISTRIBUTIONS.get(dataset_type, {}).get(table, {}).get("columns", {})
+        columns = {}
+        for col in table_def["columns"]:
+            checks = spec_expectations(dataset_type, table, specs[col[0]]) if col[0] in specs else {}
+            checks.update(EXPECTATIONS.get(dataset_type, {}).get(table, {}).get(col[0], {}))
+            if checks:
+                columns[col[0]] = checks
+        expected[table] = columns
+    return expected
+
+
+def rate_tolerance(p: float, n: int) -> float:
+    """Four standard errors of a sampled proportion, plus a small absolute slack."""
+    return 4 * math.sqrt(max(p * (1 - p), 1e-6) / max(n, 1)) + 0.002
+
+
+def check_column(profile: ColumnProfile, checks: dict) -> list:
+    """Compare a column profile with its expected properties."""
+    results = []
+
+    def record(check, expected, observed, passed):
+        results.append({"check": check, "expected": expected, "observed": observed, "passed": bool(passed)})
+
+    n = profile.present
+    for check, expected in checks.items():
+        if check == "null_rate":
+            observed = profile.nulls / profile.rows if profile.rows else 0.0
+            record(check, expected, round(observed, 6),
+                   abs(observed - expected) <= rate_tolerance(expected, profile.rows))
+        elif n == 0:
+            record(check, expected, None, False)
+        elif check == "true_rate":
+            observed = profile.counts.get(True, 0) / n if profile.counts is not None else None
+            record(check, expected, None if observed is None else round(observed, 6),
+                   observed is not None and abs(observed - expected) <= rate_tolerance(expected, n))
+        elif check == "frequencies":
+            if profile.counts is None:
+                record(check, "at most %d distinct values" % len(expected), profile.distinct.count(), False)
+                continue
+            observed = Counter()
+            for value, count in profile.counts.items():
+                # Numeric choices are compared as numbers; CSV and Parquet spell them differently
+                key = float(value) if profile.kind == "numeric" else value
+                observed[key] += count
+            for value, p in expected.items():
+                key = float(value) if profile.kind == "numeric" else value
+                share = observed.pop(key, 0) / n
+                record(f"frequency[{value}]", round(p, 6), round(share, 6), abs(share - p) <= rate_tolerance(p, n))
+            unexpected = sum(observed.values())
+            if unexpected:
+                record("unexpected values", 0, {str(v): c for v, c in observed.most_common(5)}, False)
+        elif check == "range":
+            low, high = expected
+            record(check, [low, high], [profile.min, profile.max],
+                   profile.min is not None and profile.min >= low - 1e-9 and profile.max <= high + 1e-9)
+        elif check == "median":
+            low, high = checks["range"]
+            median = profile.quantiles()[0.5]
+            # Uniform median: four standard errors plus the sketch's rank error,
+            # and one step for integer values whose median falls between two
+            tolerance = (high - low) * (2 / math.sqrt(n) + 0.02)
+            if isinstance(low, int) and isinstance(high, int):
+                tolerance += 1
+            record(check, expected, median, median is not None and abs(median - expected) <= tolerance)
+        elif check == "span_days":
+            span = (profile.max - profile.min) / 86400
+            # Faker years are 365.25 days
+            record(check, f"<= {expected}", round(span, 2), span <= expected * 1.001 + 1)
+    return results
+
+
+def profile_dataset(dataset_type: str, input_dir: Path, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Profile every table of the dataset and check it against the expected distributions."""
+    schema_def = SCHEMAS[dataset_type]
+    expected = dataset_expectations(dataset_type)
+    report = {"dataset_type": dataset_type, "input_dir": str(input_dir), "tables": {}, "failures": []}
+    for table in table_load_order(schema_def):
+        start = time.perf_counter()
+        try:
+            path = find_table(input_dir, table)
+        except FileNotFoundError as e:
+            report["failures"].append(str(e))
+            continue
+        profiles = profile_table(path, schema_def["tables"][table], chunk_rows)
+        rows = next(iter(profiles.values())).rows if profiles else 0
+        checks = []
+        for column, column_checks in expected[table].items():
+            for result in check_column(profiles[column], column_checks):
+                checks.append({"column": column, **result})
+                if not result["passed"]:
+                    report["failures"].append(
+                        f"{table}.{column} {result['check']}: expected {result['expected']}, "
+                        f"observed {result['observed']}")
+        report["tables"][table] = {
+            "rows": rows,
+            "seconds": round(time.perf_counter() - start, 3),
+            "columns": {column: profile.summary() for column, profile in profiles.items()},
+            "checks": checks,
+        }
+        passed = sum(check["passed"] for check in checks)
+        print(f"  {table}: {rows:,} rows, {passed}/{len(checks)} checks passed "
+              f"({report['tables'][table]['seconds']:.2f}s)")
+    report["passed"] = not report["failures"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile generated data and check its distributions")
+    parser.add_argument("--config", required=True, help="Path to config JSON file")
+    parser.add_argument("--input-dir", required=True,
+                        help="generate_data.py output directory (or a directory of table CSV/Parquet files)")
+    parser.add_argument("--report", help="Report path (default: <input-dir>/profile_report.json)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows read per chunk")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    dataset_type = config.get('dataset_type', 'ecommerce')
+    if dataset_type not in SCHEMAS:
+        parser.error(f"No predefined schema for dataset type '{dataset_type}'")
+
+    input_dir = Path(args.input_dir)
+    print(f"Profiling {dataset_type} output in {input_dir}...")
+    report = profile_dataset(dataset_type, input_dir, args.chunk_rows)
+
+    report_file = Path(args.report) if args.report else input_dir / "profile_report.json"
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Written: {report_file}")
+
+    if report["failures"]:
+        print("")
+        print(f"FAILED - {len(report['failures'])} distribution check(s):")
+        for failure in report["failures"]:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("All distributions match.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+subset_data.py - Extract a small, foreign-key-closed sample of a generated dataset.
+
+Samples rows of the dataset's fact table (the one with num_records rows:
+transactions, shipments, visits or orders) and keeps everything those rows
+need to join:
+
+    down   rows of child tables that belong to a sampled row (fraud_labels,
+           deliveries, diagnoses, order_items, ...), when all of their links
+           into the subset resolve
+    up     every parent row referenced by a kept row, transitively
+           (customers, merchants, products, routes -> warehouses, ...)
+
+Sampling is stratified on a column of the fact table or of a direct child
+(SUBSET_STRATA, e.g. fraud_labels.is_fraud). Each stratum keeps the rows
+whose seeded key hash falls below `fraction`, plus its `min_per_stratum`
+lowest-hashing rows, so it keeps at least min_per_stratum rows (or all of
+them) and rare classes survive a 0.1% sample. The same seed reproduces the
+same subset.
+
+The source files are streamed in chunks, and only the keys of the subset (and
+a bounded heap of min_per_stratum candidates per stratum) are held in memory.
+Each table is read once, and the strata table twice (selection, then writing
+it out).
+
+Usage:
+    uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/subset_data.py \
+        --config /tmp/synthetic_data_config.json \
+        --input-dir ./output \
+        --output-dir ./output_sample \
+        --fraction 0.001
+"""
+
+import argparse
+import heapq
+import json
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from generate_schema import SCHEMAS, table_load_order
+from generate_sql_data import DISTRIBUTIONS
+from table_files import CHUNK_ROWS, csv_files, find_table, read_chunks
+from validate_output import null_mask, validate_dataset
+
+# Column the sample is stratified on, per dataset type (fact table or a direct child)
+SUBSET_STRATA = {
+    "financial_fraud": "fraud_labels.is_fraud",
+    "logistics": "deliveries.delivery_status",
+    "healthcare": "visits.visit_type",
+    "ecommerce": "orders.status",
+}
+
+MIN_PER_STRATUM = 20
+
+
+def fact_table(dataset_type: str) -> str:
+    """The table generated with num_records rows."""
+    return next(table for table, dist in DISTRIBUTIONS[dataset_type].items() if dist["rows"][0] == "records")
+
+
+def primary_key(table_def: dict) -> str:
+    return next(col[0] for col in table_def["columns"] if col[2] == "PRIMARY KEY")
+
+
+def sample_fractions(keys: pd.Series, seed: int) -> np.ndarray:
+    """Deterministic uniform [0, 1) value per key for the given seed."""
+    hashes = pd.util.hash_array(keys.astype(str).to_numpy(dtype=object), hash_key=f"{seed:016d}"[-16:])
+    return (hashes >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def stratum_values(values: pd.Series) -> pd.Series:
+    """Stratum labels as strings, so CSV text and typed Parquet values agree."""
+    labels = values.astype(str)
+    return labels.where(~null_mask(values), "(null)")
+
+
+class StratumMinimum:
+    """The keys of the min_per_stratum lowest-hashing rows of every stratum, in bounded heaps."""
+
+    def __init__(self, min_per_stratum: int):
+        self.size = min_per_stratum
+        self.heaps = {}  # stratum -> [(-fraction, key)], the largest kept fraction on top
+
+    def update(self, labels: pd.Series, fractions: np.ndarray, keys: pd.Series):
+        if self.size <= 0:
+            return
+        keys = keys.astype(str).to_numpy()
+        for value, rows in labels.groupby(labels, sort=False).indices.items():
+            # Only the chunk's own lowest hashes can enter the heap
+            if len(rows) > self.size:
+                rows = rows[np.argpartition(fractions[rows], self.size - 1)[:self.size]]
+            heap = self.heaps.setdefault(value, [])
+            for row in rows:
+                item = (-fractions[row], keys[row])
+                if len(heap) < self.size:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+    def keys(self) -> set:
+        return {key for heap in self.heaps.values() for _, key in heap}
+
+
+class TableWriter:
+    """Appends chunks to <output_dir>/data/<table>.csv or .parquet, matching the source format."""
+
+    def __init__(self, source: Path, output_dir: Path, table: str):
+        self.csv = bool(csv_files(source))
+        self.path = output_dir / "data" / f"{table}.{'csv' if self.csv else 'parquet'}"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.rows = 0
+        self._writer = None
+
+    def write(self, df: pd.DataFrame):
+        if self.csv:
+            df.to_csv(self.path, mode='w' if self._writer is None else 'a', header=self._writer is None,
+                      index=False)
+            self._writer = True
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        self.rows += len(df)
+
+    def close(self, empty: pd.DataFrame):
+        if self._writer is None:
+            self.write(empty)
+        if not self.csv:
+            self._writer.close()
+
+
+def extract_subset(dataset_type: str, input_dir: Path, output_dir: Path, fraction: float,
+                   strata: str = None, min_per_stratum: int = MIN_PER_STRATUM, seed: int = 42,
+                   chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Write an FK-closed subset to <output_dir>/data and return per-table row counts."""
+    schema_def = SCHEMAS[dataset_type]
+    tables = schema_def["tables"]
+    relationships = schema_def["relationships"]
+    order = table_load_order(schema_def)
+    paths = {table: find_table(input_dir, table) for table in order}
+    fact = fact_table(dataset_type)
+    fact_pk = primary_key(tables[fact])
+
+    # Tables below the fact table, in load order, with their links into the subset
+    down, links = [fact], {}
+    for table in order:
+        table_links = [(col, parent, to_col) for child, col, parent, to_col in relationships
+                       if child == table and parent in down]
+        if table != fact and table_links:
+            down.append(table)
+            links[table] = table_links
+
+    # Pass 1: pick fact keys, optionally through a stratified child
+    report = {"fact_table": fact, "fraction": fraction, "seed": seed, "strata": None, "rows": {}}
+    selected_facts = set()
+    if strata:
+        strata_table, strata_column = strata.split(".")
+        if strata_table == fact:
+            link_column = fact_pk
+        else:
+            link = [col for col, parent, _ in links.get(strata_table, []) if parent == fact]
+            if not link:
+                raise ValueError(f"{strata}: strata must be on {fact} or a table referencing it")
+            link_column = link[0]
+        row_key = primary_key(tables[strata_table])
+        rows, hashed_below = Counter(), Counter()
+        minimum = StratumMinimum(min_per_stratum)
+        for df in read_chunks(paths[strata_table], [row_key, strata_column, link_column], chunk_rows):
+            labels = stratum_values(df[strata_column])
+            fractions = sample_fractions(df[row_key], seed)
+            keep = fractions < fraction
+            selected_facts.update(df[link_column][keep].astype(str))
+            minimum.update(labels, fractions, df[link_column])
+            rows.update(labels.value_counts().to_dict())
+            hashed_below.update(labels[keep].value_counts().to_dict())
+        selected_facts.update(minimum.keys())
+        report["strata"] = {"column": strata, "strata": {
+            value: {"rows": count, "sampled": max(hashed_below[value], min(min_per_stratum, count))}
+            for value, count in rows.items()}}
+    else:
+        for df in read_chunks(paths[fact], [fact_pk], chunk_rows):
+            selected_facts.update(df[fact_pk][sample_fractions(df[fact_pk], seed) < fraction].astype(str))
+
+    # Values kept per referenced column, and parent values required by kept rows
+    selected = {(fact, fact_pk): selected_facts}
+    required = {}
+
+    def keep_rows(table: str, df: pd.DataFrame):
+        for child, col, parent, to_col in relationships:
+            if child == table and parent not in down:
+                values = df[col][~null_mask(df[col])]
+                required.setdefault((parent, to_col), set()).update(values.astype(str))
+        for child, col, parent, to_col in relationships:
+            if parent == table:
+                selected.setdefault((table, to_col), set()).update(df[to_col].astype(str))
+
+    def write_table(table: str, mask_of):
+        writer = TableWriter(paths[table], output_dir, table)
+        empty = None
+        for df in read_chunks(paths[table], chunk_rows=chunk_rows):
+            empty = df.iloc[:0]
+            df = df[mask_of(df)]
+            if len(df):
+                keep_rows(table, df)
+                writer.write(df)
+        writer.close(empty)
+        report["rows"][table] = writer.rows
+
+    # Pass 2: the fact table and its descendants, parents before children
+    write_table(fact, lambda df: df[fact_pk].astype(str).isin(selected_facts).to_numpy())
+    for table in down[1:]:
+        def in_subset(df, table_links=links[table]):
+            mask = np.ones(len(df), dtype=bool)
+            for col, parent, to_col in table_links:
+                mask &= df[col].astype(str).isin(selected.get((parent, to_col), set())).to_numpy()
+            return mask
+        write_table(table, in_subset)
+
+    # Pass 3: every ancestor row a kept row references, children before parents
+    for table in reversed(order):
+        if table in down:
+            continue
+        keys = [(to_col, values) for (parent, to_col), values in required.items() if parent == table]
+
+        def referenced(df, keys=keys):
+            mask = np.zeros(len(df), dtype=bool)
+            for to_col, values in keys:
+                mask |= df[to_col].astype(str).isin(values).to_numpy()
+            return mask
+        write_table(table, referenced)
+
+    report["rows"] = {table: report["rows"][table] for table in order}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract an FK-closed, stratified subset of generated data")
+    parser.add_argument("--config", required=True, help="Path to config JSON file")
+    parser.add_argument("--input-dir", required=True,
+                        help="generate_data.py output directory (or a directory of table CSV/Parquet files)")
+    parser.add_argument("--output-dir", required=True, help="Directory for the subset (written to data/)")
+    parser.add_argument("--fraction", type=float, default=0.001, help="Share of fact rows to sample (default: 0.001)")
+    parser.add_argument("--strata", help="table.column to stratify on (default: SUBSET_STRATA; 'none' to disable)")
+    parser.add_argument("--min-per-stratum", type=int, default=MIN_PER_STRATUM,
+                        help="Minimum rows sampled from each stratum")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the row selection")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows read per chunk")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    dataset_type = config.get('dataset_type', 'ecommerce')
+    if dataset_type not in SCHEMAS:
+        parser.error(f"No predefined schema for dataset type '{dataset_type}'")
+    strata = args.strata or SUBSET_STRATA.get(dataset_type)
+    if strata == "none":
+        strata = None
+
+    input_dir, output_dir = Path(args.input_dir), Path(args.output_dir)
+    print(f"Extracting a {args.fraction:.3%} subset of {dataset_type} from {input_dir}...")
+    report = extract_subset(dataset_type, input_dir, output_dir, args.fraction, strata,
+                            args.min_per_stratum, args.seed, args.chunk_rows)
+    if report["strata"]:
+        print(f"  Stratified on {strata}:")
+        for value, stratum in report["strata"]["strata"].items():
+            print(f"    {value}: {stratum['sampled']:,} of {stratum['rows']:,} rows sampled")
+    for table, rows in report["rows"].items():
+        print(f"  Written: {table} ({rows:,} rows)")
+
+    with open(output_dir / "subset_report.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    # The subset must join on its own
+    print("")
+    validation = validate_dataset(dataset_type, output_dir, args.chunk_rows)
+    orphans = [failure for failure in validation["failures"] if "orphaned" in failure]
+    if orphans:
+        print("FAILED - subset is not FK-closed:")
+        for failure in orphans:
+            print(f"  {failure}")
+        raise SystemExit(1)
+    print("All foreign keys in the subset resolve.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+table_files.py - Locate and stream the table files of a generated dataset.
+
+Shared by the scripts that read generated output back. A table is stored as
+`<table>.csv` (as written by generate_data.py), a `<table>.parquet` file or a
+`<table>/` directory of CSV or Parquet parts, either in the given directory or
+in its `data/` subdirectory.
+
+Tables are read in chunks of at most CHUNK_ROWS rows so that callers can
+process datasets larger than memory. Chunks keep raw values: CSV cells are
+strings with empty strings for nulls, Parquet columns keep their types
+(DECIMAL is read as float64). typed_frame() converts a chunk to the column
+types declared in SCHEMAS.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+CHUNK_ROWS = 1_000_000
+
+
+def find_table(path: Path, table: str = "transactions") -> Path:
+    """Resolve a table file, a directory of parts, or a generate_data.py output directory."""
+    path = Path(path)
+    if path.is_file() or path.suffix in (".csv", ".parquet"):
+        return path
+    for candidate in (path / f"{table}.parquet", path / f"{table}.csv",
+                      path / "data" / f"{table}.parquet", path / "data" / f"{table}.csv",
+                      path / table, path / "data" / table):
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(f"No {table} file under {path}")
+
+
+def csv_files(path: Path) -> list:
+    """The CSV files of a table, or [] when it is stored as Parquet."""
+    if path.is_dir():
+        return sorted(path.rglob("*.csv"))
+    return [path] if path.suffix == ".csv" else []
+
+
+def count_rows(path: Path) -> int:
+    """Row count from Parquet metadata, or by counting CSV lines."""
+    files = csv_files(path)
+    if not files:
+        import pyarrow.dataset as ds
+        return ds.dataset(path, format="parquet").count_rows()
+    rows = 0
+    for file in files:
+        lines = 0
+        with open(file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 24), b""):
+                lines += block.count(b"\n")
+        rows += max(lines - 1, 0)
+    return rows
+
+
+def read_chunks(path: Path, columns: list = None, chunk_rows: int = CHUNK_ROWS):
+    """Yield DataFrames of at most chunk_rows rows with lower-case column names.
+
+    `columns` (lower-case) limits the columns read; missing ones are skipped.
+    """
+    wanted = set(columns) if columns else None
+    files = csv_files(path)
+    # A partitioned table has at least one piece per part file (and Parquet row
+    # group); pieces are merged so callers see chunk_rows-row frames rather than
+    # many small ones
+    if files:
+        pending, pending_rows, yielded = [], 0, False
+        for file in files:
+            reader = pd.read_csv(file, dtype=str, keep_default_na=False, chunksize=chunk_rows,
+                                 usecols=(lambda c: c.lower() in wanted) if wanted else None)
+            for df in reader:
+                df.columns = df.columns.str.lower()
+                pending.append(df)
+                pending_rows += len(df)
+                if pending_rows >= chunk_rows:
+                    df = pd.concat(pending, ignore_index=True)
+                    yield df.iloc[:chunk_rows]
+                    pending = [df.iloc[chunk_rows:]]
+                    pending_rows -= chunk_rows
+                    yielded = True
+        # An empty table still yields one (empty) frame with its columns
+        if pending and (pending_rows or not yielded):
+            yield pd.concat(pending, ignore_index=True)
+        return
+
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="parquet")
+    names = [name for name in dataset.schema.names if wanted is None or name.lower() in wanted]
+    schema = pa.schema([dataset.schema.field(name) for name in names])
+    pending, pending_rows, yielded = [], 0, False
+    for batch in dataset.to_batches(columns=names, batch_size=chunk_rows):
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= chunk_rows:
+            table = pa.Table.from_batches(pending, schema=schema)
+            yield _arrow_frame(table.slice(0, chunk_rows))
+            pending = table.slice(chunk_rows).to_batches()
+            pending_rows -= chunk_rows
+            yielded = True
+    if pending_rows or not yielded:
+        yield _arrow_frame(pa.Table.from_batches(pending, schema=schema))
+
+
+def _arrow_frame(table) -> pd.DataFrame:
+    import pyarrow as pa
+
+    # Decimal columns would arrive as Python Decimal objects
+    arrays = [column.cast(pa.float64()) if pa.types.is_decimal(column.type) else column
+              for column in table.columns]
+    df = pa.Table.from_arrays(arrays, names=table.schema.names).to_pandas()
+    df.columns = df.columns.str.lower()
+    return df
+
+
+def typed_frame(df: pd.DataFrame, table_def: dict) -> pd.DataFrame:
+    """Convert a raw chunk's columns to pandas dtypes from the table's SCHEMAS column types."""
+    types = {col[0]: col[1].upper() for col in table_def["columns"]}
+    for name in df.columns:
+        sql_type = types.get(name, "VARCHAR")
+        if sql_type.startswith(("DECIMAL", "FLOAT", "DOUBLE")):
+            df[name] = pd.to_numeric(df[name], errors="coerce").astype("float64")
+        elif sql_type.startswith("INTEGER"):
+            df[name] = pd.to_numeric(df[name], errors="coerce").astype("Int64")
+        elif sql_type.startswith(("TIMESTAMP", "DATE")):
+            df[name] = pd.to_datetime(df[name].replace("", None), format="ISO8601")
+        elif sql_type == "BOOLEAN":
+            df[name] = df[name].map({True: True, False: False, "True": True, "False": False,
+                                     "true": True, "false": False}).fillna(False).astype(bool)
+        elif sql_type.startswith("VARCHAR"):
+            df[name] = df[name].fillna("").astype(str)
+    return df
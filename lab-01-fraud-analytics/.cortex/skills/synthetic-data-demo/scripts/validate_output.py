@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+validate_output.py - Streaming referential-integrity and constraint checks for generated output.
+
+Checks the table files of a generated dataset (CSV from generate_data.py, or
+Parquet) against SCHEMAS before loading them:
+
+    primary keys   unique and NOT NULL
+    foreign keys   every value in `relationships` resolves to a parent key
+    types          values conform to the declared column types (VARCHAR length,
+                   DECIMAL precision, INTEGER, BOOLEAN, DATE/TIMESTAMP)
+
+Tables are streamed in chunks in load order, parents first. Keys are held as
+64-bit hashes, never as strings:
+
+    - every referenced parent column is kept as a sorted uint64 array, which
+      child chunks probe with searchsorted
+    - primary keys nothing references (fact tables) only go through a Bloom
+      filter (about 10 bits per key)
+
+A hash or Bloom hit only marks a key as a duplicate candidate. Candidates are
+confirmed against the real values in one more pass over that table. Memory is
+therefore 8 bytes per referenced parent key, plus about 1.2 bytes per other
+primary key.
+
+Usage:
+    uv run --project <SKILL_DIR> python <SKILL_DIR>/scripts/validate_output.py \
+        --config /tmp/synthetic_data_config.json \
+        --input-dir ./output
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from generate_schema import SCHEMAS, table_load_order
+from table_files import CHUNK_ROWS, count_rows, find_table, read_chunks
+
+# Bloom filter false-positive rate for unreferenced primary keys
+BLOOM_ERROR_RATE = 0.01
+
+# Offending values kept per check in the report
+SAMPLES = 5
+
+BOOLEAN_VALUES = {"true", "false", "1", "0"}
+
+
+def key_hashes(values: pd.Series) -> np.ndarray:
+    """Stable 64-bit hashes of key values (as strings, so CSV and Parquet agree)."""
+    return pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+
+
+def null_mask(values: pd.Series) -> np.ndarray:
+    """Nulls in a raw chunk: missing values, or empty CSV cells."""
+    mask = values.isna().to_numpy()
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        mask = mask | (values.astype(str) == "").to_numpy()
+    return mask
+
+
+class BloomFilter:
+    """Bit-array Bloom filter over 64-bit hashes, probed with double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.probes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """Add unique hashes; return a mask of those that may have been added before."""
+        step = (hashes * np.uint64(0x9E3779B97F4A7C15)) | np.uint64(1)
+        seen = np.ones(len(hashes), dtype=bool)
+        positions = []
+        for probe in range(self.probes):
+            position = (hashes + np.uint64(probe) * step) % np.uint64(self.size)
+            byte, bit = position >> np.uint64(3), (position & np.uint64(7)).astype(np.uint8)
+            seen &= (self.bits[byte] >> bit) & 1 == 1
+            positions.append((byte, bit))
+        for byte, bit in positions:
+            np.bitwise_or.at(self.bits, byte, np.left_shift(np.uint8(1), bit))
+        return seen
+
+
+# =============================================================================
+# TYPE CONFORMANCE
+# =============================================================================
+
+def type_violations(values: pd.Series, sql_type: str) -> np.ndarray:
+    """Mask of non-null values that do not conform to a SCHEMAS column type."""
+    sql_type = sql_type.upper()
+    nulls = null_mask(values)
+    match = re.match(r"(\w+)(?:\((\d+)(?:,\s*(\d+))?\))?", sql_type)
+    base, size, scale = match.group(1), match.group(2), match.group(3)
+
+    if base == "VARCHAR":
+        if size is None or not (values.dtype == object or pd.api.types.is_string_dtype(values)):
+            return np.zeros(len(values), dtype=bool)
+        bad = values.astype(str).str.len().to_numpy() > int(size)
+    elif base in ("DECIMAL", "NUMBER", "INTEGER", "FLOAT", "DOUBLE"):
+        numbers = pd.to_numeric(values, errors="coerce").to_numpy("float64")
+        bad = np.isnan(numbers)
+        if base == "INTEGER":
+            bad |= numbers != np.round(numbers)
+        elif size is not None:
+            # Integer digits beyond precision - scale overflow the column
+            bad |= np.abs(numbers) >= 10.0 ** (int(size) - int(scale or 0))
+    elif base == "BOOLEAN":
+        if pd.api.types.is_bool_dtype(values):
+            return np.zeros(len(values), dtype=bool)
+        bad = ~values.astype(str).str.lower().isin(BOOLEAN_VALUES).to_numpy()
+    elif base in ("TIMESTAMP", "DATE"):
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return np.zeros(len(values), dtype=bool)
+        bad = pd.to_datetime(values.where(~nulls), format="ISO8601", errors="coerce").isna().to_numpy()
+    else:
+        return np.zeros(len(values), dtype=bool)
+    return bad & ~nulls
+
+
+def samples_of(values: pd.Series, mask: np.ndarray, kept: list):
+    if len(kept) < SAMPLES and mask.any():
+        kept.extend(values[mask].astype(str).head(SAMPLES - len(kept)).tolist())
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def confirm_duplicates(path: Path, column: str, candidates: np.ndarray, chunk_rows: int) -> tuple:
+    """Exact fallback: count real duplicate values among rows whose key hash is a candidate."""
+    candidates = np.unique(candidates)
+    counts = Counter()
+    for df in read_chunks(path, [column], chunk_rows):
+        values = df[column]
+        keep = np.isin(key_hashes(values), candidates) & ~null_mask(values)
+        counts.update(values[keep].astype(str).tolist())
+    duplicates = {value: count for value, count in counts.items() if count > 1}
+    return sum(count - 1 for count in duplicates.values()), list(duplicates)[:SAMPLES]
+
+
+def validate_table(table: str, table_def: dict, path: Path, parents: dict, referenced: set,
+                   relationships: list, chunk_rows: int) -> dict:
+    """Stream one table; check types, NOT NULL, PK uniqueness and FK resolution."""
+    types = {col[0]: col[1] for col in table_def["columns"]}
+    pk = next((col[0] for col in table_def["columns"] if col[2] == "PRIMARY KEY"), None)
+    fks = [rel for rel in relationships if rel[0] == table]
+
+    result = {"rows": 0, "missing_columns": [], "not_null": {}, "types": {}, "primary_key": None,
+              "foreign_keys": []}
+    type_stats = {col: {"violations": 0, "samples": []} for col in types}
+    fk_stats = [{"column": from_col, "references": f"{to_table}.{to_col}", "checked": 0,
+                 "nulls": 0, "orphans": 0, "samples": []} for _, from_col, to_table, to_col in fks]
+    pk_nulls = 0
+    keep_keys = {col for col in types if (table, col) in referenced}
+    key_arrays = {col: [] for col in keep_keys}
+    bloom = BloomFilter(count_rows(path)) if pk and pk not in keep_keys else None
+    candidates = []
+
+    for df in read_chunks(path, list(types), chunk_rows):
+        result["rows"] += len(df)
+        if result["rows"] == len(df):
+            result["missing_columns"] = [col for col in types if col not in df.columns]
+
+        for col, sql_type in types.items():
+            if col in df.columns:
+                bad = type_violations(df[col], sql_type)
+                type_stats[col]["violations"] += int(bad.sum())
+                samples_of(df[col], bad, type_stats[col]["samples"])
+
+        if pk and pk in df.columns:
+            nulls = null_mask(df[pk])
+            pk_nulls += int(nulls.sum())
+            hashes = key_hashes(df[pk][~nulls])
+            if bloom is not None:
+                unique, counts = np.unique(hashes, return_counts=True)
+                candidates.append(unique[counts > 1])
+                candidates.append(unique[bloom.add(unique)])
+
+        for col in keep_keys:
+            if col in df.columns:
+                key_arrays[col].append(key_hashes(df[col][~null_mask(df[col])]))
+
+        for stats, (_, from_col, to_table, to_col) in zip(fk_stats, fks):
+            if from_col not in df.columns:
+                continue
+            values = df[from_col]
+            nulls = null_mask(values)
+            parent = parents[(to_table, to_col)]
+            hashes = key_hashes(values[~nulls])
+            found = np.searchsorted(parent, hashes)
+            found[found == len(parent)] = 0
+            orphans = parent[found] != hashes if len(parent) else np.ones(len(hashes), dtype=bool)
+            stats["checked"] += len(hashes)
+            stats["nulls"] += int(nulls.sum())
+            stats["orphans"] += int(orphans.sum())
+            samples_of(values[~nulls], orphans, stats["samples"])
+
+    # Referenced columns become sorted parent key sets; duplicates are PK candidates
+    for col, arrays in key_arrays.items():
+        keys = np.sort(np.concatenate(arrays)) if arrays else np.zeros(0, dtype=np.uint64)
+        parents[(table, col)] = keys
+        if col == pk:
+            candidates.append(keys[1:][keys[1:] == keys[:-1]])
+
+    if pk:
+        candidates = np.concatenate(candidates) if candidates else np.zeros(0, dtype=np.uint64)
+        duplicates, samples = confirm_duplicates(path, pk, candidates, chunk_rows) if len(candidates) else (0, [])
+        result["primary_key"] = {"column": pk, "duplicates": duplicates, "candidates": int(len(np.unique(candidates))),
+                                 "samples": samples, "method": "bloom" if bloom is not None else "sorted hashes"}
+        result["not_null"][pk] = pk_nulls
+    result["types"] = {col: stats for col, stats in type_stats.items() if stats["violations"]}
+    result["foreign_keys"] = fk_stats
+    return result
+
+
+def table_failures(table: str, result: dict) -> list:
+    failures = []
+    if result["missing_columns"]:
+        failures.append(f"{table}: missing columns {', '.join(result['missing_columns'])}")
+    for col, nulls in result["not_null"].items():
+        if nulls:
+            failures.append(f"{table}.{col}: {nulls:,} NULL values in a NOT NULL column")
+    pk = result["primary_key"]
+    if pk and pk["duplicates"]:
+        failures.append(f"{table}.{pk['column']}: {pk['duplicates']:,} duplicate primary key values "
+                        f"(e.g. {', '.join(pk['samples'])})")
+    for col, stats in result["types"].items():
+        failures.append(f"{table}.{col}: {stats['violations']:,} values do not conform to the column type "
+                        f"(e.g. {', '.join(stats['samples'])})")
+    for fk in result["foreign_keys"]:
+        if fk["orphans"]:
+            failures.append(f"{table}.{fk['column']} -> {fk['references']}: {fk['orphans']:,} orphaned values "
+                            f"(e.g. {', '.join(fk['samples'])})")
+    return failures
+
+
+def validate_dataset(dataset_type: str, input_dir: Path, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Validate every table of the dataset and return the report."""
+    schema_def = SCHEMAS[dataset_type]
+    relationships = schema_def["relationships"]
+    referenced = {(to_table, to_col) for _, _, to_table, to_col in relationships}
+    parents, report = {}, {"dataset_type": dataset_type, "input_dir": str(input_dir), "tables": {}, "failures": []}
+
+    for table in table_load_order(schema_def):
+        start = time.perf_counter()
+        try:
+            path = find_table(input_dir, table)
+        except FileNotFoundError as e:
+            report["failures"].append(str(e))
+            for _, _, to_table, to_col in relationships:
+                if to_table == table:
+                    parents[(to_table, to_col)] = np.zeros(0, dtype=np.uint64)
+            continue
+        result = validate_table(table, schema_def["tables"][table], path, parents, referenced,
+                                relationships, chunk_rows)
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        report["tables"][table] = result
+        report["failures"].extend(table_failures(table, result))
+        print(f"  {table}: {result['rows']:,} rows in {result['seconds']:.2f}s")
+    report["passed"] = not report["failures"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate generated output against SCHEMAS")
+    parser.add_argument("--config", required=True, help="Path to config JSON file")
+    parser.add_argument("--input-dir", required=True,
+                        help="generate_data.py output directory (or a directory of table CSV/Parquet files)")
+    parser.add_argument("--report", help="Report path (default: <input-dir>/validation_report.json)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows read per chunk")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    dataset_type = config.get('dataset_type', 'ecommerce')
+    if dataset_type not in SCHEMAS:
+        parser.error(f"No predefined schema for dataset type '{dataset_type}'")
+
+    input_dir = Path(args.input_dir)
+    print(f"Validating {dataset_type} output in {input_dir}...")
+    report = validate_dataset(dataset_type, input_dir, args.chunk_rows)
+
+    report_file = Path(args.report) if args.report else input_dir / "validation_report.json"
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Written: {report_file}")
+
+    if report["failures"]:
+        print("")
+        print(f"FAILED - {len(report['failures'])} problem(s):")
+        for failure in report["failures"]:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("All keys resolve and all constraints hold.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+write_pipeline.py - Background encode and write stages for generated tables.
+
+Used by generate_data.py, which generates rows chunk by chunk on the calling
+thread and hands each finished chunk to a WritePipeline:
+
+    generate (caller) --queue--> encode (thread) --queue--> write (thread)
+
+The encode stage turns a chunk into file bytes: CSV text, or Parquet pages
+that pyarrow encodes and compresses. The write stage appends those bytes to
+their files. Each queue holds at most `queue_depth` items. With the default
+of 2, the generator fills the next chunk while the previous one is encoded
+and the one before it is written (double buffering). When a stage falls
+behind, the stages ahead of it block on the full queue (back-pressure), so
+memory stays bounded at a few chunks and throughput follows the slowest
+stage instead of the sum of all three. File I/O and pyarrow's encoding and
+compression release the GIL; CSV formatting shares it with generation.
+
+Per stage the pipeline records busy time, time blocked on a full downstream
+queue and time idle waiting for input; utilization is busy time over the
+pipeline's wall time.
+"""
+
+import io
+import queue
+import threading
+import time
+from pathlib import Path
+
+QUEUE_DEPTH = 2
+
+STAGES = ("generate", "encode", "write")
+
+
+class StageMetrics:
+    """Busy, blocked and idle seconds of one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.idle = 0.0
+        self.items = 0
+
+    def report(self, wall: float) -> dict:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy, 3),
+            "blocked_seconds": round(self.blocked, 3),
+            "idle_seconds": round(self.idle, 3),
+            "utilization": round(self.busy / wall, 3) if wall else 0.0,
+        }
+
+
+class ChunkSink(io.RawIOBase):
+    """In-memory file for a streaming writer (e.g. pyarrow's ParquetWriter), drained after each chunk."""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class WritePipeline:
+    """Encodes and writes submitted chunks on two background threads.
+
+    submit(encode) queues a callable that runs on the encode thread and returns
+    a list of (path, bytes, final) triples. The write thread appends the bytes
+    to the file, truncating it the first time it is written, and closes it
+    when `final` is set (all files are closed by close()). Encoders run in
+    submission order, so stateful encoders (a CSV header, an open Parquet
+    writer) see their chunks in order.
+    """
+
+    def __init__(self, queue_depth: int = QUEUE_DEPTH):
+        self.metrics = {name: StageMetrics(name) for name in STAGES}
+        self.bytes_written = 0
+        self._encode_queue = queue.Queue(maxsize=queue_depth)
+        self._write_queue = queue.Queue(maxsize=queue_depth)
+        self._error = None
+        self._start = time.perf_counter()
+        self._mark = self._start
+        self._threads = [threading.Thread(target=self._encode_loop, name="encode", daemon=True),
+                         threading.Thread(target=self._write_loop, name="write", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, encode):
+        """Queue a chunk's encoder; blocks while the encode stage is queue_depth chunks behind."""
+        generate = self.metrics["generate"]
+        generate.busy += time.perf_counter() - self._mark
+        generate.items += 1
+        if self._error:
+            raise self._error
+        self._put(self._encode_queue, encode, generate)
+        self._mark = time.perf_counter()
+
+    def close(self) -> dict:
+        """Flush both stages, close the files and return the stage metrics."""
+        self.metrics["generate"].busy += time.perf_counter() - self._mark
+        self._encode_queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._error:
+            raise self._error
+        wall = time.perf_counter() - self._start
+        bottleneck = max(STAGES, key=lambda name: self.metrics[name].busy)
+        return {
+            "seconds": round(wall, 3),
+            "bytes_written": self.bytes_written,
+            "bottleneck": bottleneck,
+            "stages": {name: self.metrics[name].report(wall) for name in STAGES},
+        }
+
+    def _put(self, target: queue.Queue, item, stage: StageMetrics):
+        start = time.perf_counter()
+        target.put(item)
+        stage.blocked += time.perf_counter() - start
+
+    def _get(self, source: queue.Queue, stage: StageMetrics):
+        start = time.perf_counter()
+        item = source.get()
+        stage.idle += time.perf_counter() - start
+        return item
+
+    def _encode_loop(self):
+        stage = self.metrics["encode"]
+        while True:
+            encode = self._get(self._encode_queue, stage)
+            if encode is None:
+                break
+            if self._error:
+                continue  # keep draining so a blocked submit() can return and raise
+            start = time.perf_counter()
+            try:
+                files = encode()
+            except Exception as e:
+                self._error = e
+                continue
+            stage.busy += time.perf_counter() - start
+            stage.items += 1
+            self._put(self._write_queue, files, stage)
+        self._write_queue.put(None)
+
+    def _write_loop(self):
+        stage = self.metrics["write"]
+        handles = {}
+        try:
+            while True:
+                files = self._get(self._write_queue, stage)
+                if files is None:
+                    break
+                if self._error:
+                    continue
+                start = time.perf_counter()
+                try:
+                    for path, data, final in files:
+                        handle = handles.get(path)
+                        if handle is None:
+                            Path(path).parent.mkdir(parents=True, exist_ok=True)
+                            handle = handles[path] = open(path, 'wb')
+                        handle.write(data)
+                        self.bytes_written += len(data)
+                        if final:
+                            handles.pop(path).close()
+                except Exception as e:
+                    self._error = e
+                    continue
+                stage.busy += time.perf_counter() - start
+                stage.items += 1
+        finally:
+            for handle in handles.values():
+                handle.close()
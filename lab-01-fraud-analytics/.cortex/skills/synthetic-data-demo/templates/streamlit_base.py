@@ -3,6 +3,15 @@ Base Streamlit Dashboard Template
 This template provides a starting point for custom dashboard modifications.
 """
 
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -18,6 +27,124 @@ st.set_page_config(
     layout="wide"
 )
 
+# =============================================================================
+# QUERY CACHE
+# Results are cached per normalized SQL text and bound parameters in an LRU
+# cache bounded by entry count and total bytes, shared by all sessions.
+# Results over MAX_RESULT_ROWS are refused or sampled before they are fetched.
+# Set CACHE_DIR to keep results on local disk across app restarts.
+# =============================================================================
+CACHE_TTL_SECONDS = 600
+CACHE_MAX_ENTRIES = 128
+CACHE_MAX_BYTES = 256 * 1024 ** 2
+CACHE_DIR = None  # e.g. Path(".query_cache")
+MAX_RESULT_ROWS = 100_000
+
+
+class ResultTooLarge(Exception):
+    """Raised when a query returns more than the allowed number of rows."""
+
+
+SQL_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*|/\*.*?\*/)""", re.DOTALL)
+
+
+def normalize_sql(sql: str) -> str:
+    """Cache-key form of a query: comments dropped, whitespace collapsed outside
+    string literals and quoted identifiers, trailing semicolon removed."""
+    parts = SQL_TOKENS.split(sql)
+    sql = "".join(" " if part.startswith(("--", "/*")) else part for part in parts)
+    parts = SQL_TOKENS.split(sql)
+    parts = [re.sub(r"\s+", " ", part) if i % 2 == 0 else part for i, part in enumerate(parts)]
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+class QueryCache:
+    """Thread-safe LRU cache of query results with entry and byte limits."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, cache_dir: Path = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries = OrderedDict()  # key -> (created, size, DataFrame)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(sql: str, params: tuple = ()) -> str:
+        text = json.dumps([normalize_sql(sql), list(params)], default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, key: str):
+        """Return a copy of a cached result, or None if absent or expired.
+
+        Callers get their own copy so they can modify it without changing the
+        frame shared with other sessions.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry[2].copy()
+                self._remove(key)
+        if self.cache_dir:
+            path = self.cache_dir / f"{key}.parquet"
+            try:
+                created = path.stat().st_mtime
+                if time.time() - created < self.ttl:
+                    df = pd.read_parquet(path)
+                    self._store(key, df, created)
+                    return df.copy()
+            except FileNotFoundError:
+                pass  # Pruned or replaced by another session
+        return None
+
+    def put(self, key: str, df: pd.DataFrame):
+        """Cache a result; results larger than the whole budget are not cached."""
+        if self._store(key, df, time.time()) and self.cache_dir:
+            # Write to a temporary file first so readers never see a partial file
+            tmp = self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+            df.to_parquet(tmp)
+            os.replace(tmp, self.cache_dir / f"{key}.parquet")
+            self._prune_dir()
+
+    def _store(self, key: str, df: pd.DataFrame, created: float) -> bool:
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (created, size, df)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _prune_dir(self):
+        """Keep the disk cache within the same limits, dropping the oldest files."""
+        files = []
+        for path in self.cache_dir.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by another session since the listing
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort(key=lambda file: file[0], reverse=True)
+        total = 0
+        for i, (_, size, path) in enumerate(files):
+            total += size
+            if i >= self.max_entries or total > self.max_bytes:
+                path.unlink(missing_ok=True)
+
+
 # =============================================================================
 # DATA LOADING
 # =============================================================================
@@ -26,11 +153,47 @@ def get_session():
     """Get Snowflake session."""
     return get_active_session()
 
-@st.cache_data(ttl=600)
-def load_table(table_name: str) -> pd.DataFrame:
-    """Load a table from Snowflake."""
-    session = get_session()
-    return session.table(table_name).to_pandas()
+@st.cache_resource
+def query_cache() -> QueryCache:
+    """The query cache shared by all sessions of the app."""
+    return QueryCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS, CACHE_DIR)
+
+def run_query(sql: str, params: tuple = (), max_rows: int = MAX_RESULT_ROWS, oversized: str = "sample") -> pd.DataFrame:
+    """Run a parameterized query in Snowflake through the bounded query cache.
+
+    Use ? placeholders for values so each combination is cached separately.
+    At most max_rows rows are fetched: a larger result raises ResultTooLarge
+    with oversized="refuse", or is replaced by a random sample of max_rows
+    rows with oversized="sample". Sampling runs the query a second time in
+    full (SAMPLE applies to the complete result), so an oversized query
+    costs about twice as much on a cache miss. A sampled result is flagged
+    in df.attrs["sampled"] (kept in the disk cache on pandas 2.1 and later)
+    so the warning is shown on cache hits too.
+    """
+    cache = query_cache()
+    key = QueryCache.key(sql, tuple(params) + (max_rows, oversized))
+    df = cache.get(key)
+    if df is None:
+        session = get_session()
+        # Run the caller's SQL as written; newlines keep a trailing -- comment out of the wrapper
+        sql = sql.strip().rstrip(";")
+        bind = {"params": list(params)} if params else {}
+        # Fetch one row past the limit to detect an oversized result cheaply
+        df = session.sql(f"SELECT * FROM (\n{sql}\n) LIMIT {int(max_rows) + 1}", **bind).to_pandas()
+        if len(df) > max_rows:
+            if oversized == "refuse":
+                raise ResultTooLarge(f"Query returned more than {max_rows:,} rows; aggregate or filter it in SQL")
+            df = session.sql(f"SELECT * FROM (\n{sql}\n) SAMPLE ({int(max_rows)} ROWS)", **bind).to_pandas()
+            df.attrs["sampled"] = True
+        cache.put(key, df)
+        df = df.copy()
+    if df.attrs.get("sampled"):
+        st.warning(f"Result has more than {max_rows:,} rows; showing a random sample of {len(df):,}.")
+    return df
+
+def load_table(table_name: str, max_rows: int = MAX_RESULT_ROWS) -> pd.DataFrame:
+    """Load a table from Snowflake (sampled if it has more than max_rows rows)."""
+    return run_query(f"SELECT * FROM {table_name}", max_rows=max_rows)
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -115,6 +278,12 @@ def main():
     # Uncomment and modify for your tables:
     # df = load_table("YOUR_DATABASE.YOUR_SCHEMA.YOUR_TABLE")
     # st.dataframe(df.head(100), use_container_width=True)
+    #
+    # Prefer aggregating in SQL with bound parameters:
+    # df = run_query(
+    #     "SELECT CATEGORY, COUNT(*) AS N FROM YOUR_DATABASE.YOUR_SCHEMA.YOUR_TABLE WHERE REGION = ? GROUP BY 1",
+    #     ("WEST",),
+    # )
     
     st.info("Connect to your Snowflake tables to explore data.")
     